@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+Compare the ``'coarse_to_fine'`` balance point search of
+:any:`eemeter.fit_caltrack_usage_per_day_model` against the exhaustive
+search on the bundled daily and billing samples.
+
+Usage::
+
+    python benchmarks/bench_balance_point_search.py [--step 3]
+
+For each sample this reports the number of candidates fit, the wall time,
+the selected model and the difference in adjusted R-squared between the
+two searches.
+"""
+import argparse
+import time
+
+import eemeter
+
+
+def _design_matrix(sample):
+    meter_data, temperature_data, metadata = eemeter.load_sample(sample)
+    baseline_meter_data, warnings = eemeter.get_baseline_data(
+        meter_data, end=metadata["blackout_start_date"], max_days=365
+    )
+    if "billing" in sample:
+        data = eemeter.create_caltrack_billing_design_matrix(
+            baseline_meter_data, temperature_data
+        )
+        kwargs = {"use_billing_presets": True, "weights_col": "n_days_kept"}
+    else:
+        data = eemeter.create_caltrack_daily_design_matrix(
+            baseline_meter_data, temperature_data
+        )
+        kwargs = {}
+    return data, kwargs
+
+
+def _fit(data, kwargs, **search_kwargs):
+    start = time.time()
+    model_results = eemeter.fit_caltrack_usage_per_day_model(
+        data, **dict(kwargs, **search_kwargs)
+    )
+    return model_results, time.time() - start
+
+
+def _describe(model_results):
+    model = model_results.model
+    if model is None:
+        return "NO MODEL"
+    balance_points = [
+        "{}={}".format(name[0], model.model_params[name])
+        for name in ["cooling_balance_point", "heating_balance_point"]
+        if name in model.model_params
+    ]
+    return " ".join([model.model_type] + balance_points)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Coarse-to-fine vs. exhaustive balance point search."
+    )
+    parser.add_argument("--step", type=int, default=3, help="coarse_balance_point_step")
+    args = parser.parse_args()
+
+    row = "{:<42} {:>6} {:>6} {:>7} {:>7} {:>10}  {}"
+    print(
+        row.format(
+            "sample", "fits", "fits'", "time", "time'", "d r2_adj", "model / model'"
+        )
+    )
+    for sample in eemeter.samples():
+        if "hourly" in sample:
+            continue
+        data, kwargs = _design_matrix(sample)
+        exhaustive, exhaustive_time = _fit(data, kwargs)
+        coarse, coarse_time = _fit(
+            data,
+            kwargs,
+            balance_point_search="coarse_to_fine",
+            coarse_balance_point_step=args.step,
+        )
+        if exhaustive.r_squared_adj is None or coarse.r_squared_adj is None:
+            r_squared_adj_difference = float("nan")
+        else:
+            r_squared_adj_difference = exhaustive.r_squared_adj - coarse.r_squared_adj
+        print(
+            row.format(
+                sample,
+                len(exhaustive.candidates),
+                len(coarse.candidates),
+                "{:.2f}s".format(exhaustive_time),
+                "{:.2f}s".format(coarse_time),
+                "{:.2e}".format(r_squared_adj_difference),
+                "{} / {}".format(_describe(exhaustive), _describe(coarse)),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
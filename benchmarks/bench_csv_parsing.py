@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+Compare the ``'coarse_to_fine'`` balance point search of
+Compare timestamp parsing in :any:`eemeter.temperature_data_from_csv` and
+:any:`eemeter.meter_data_from_csv` against the previous approach of parsing
+dates in :any:`pandas.read_csv` and converting them to UTC afterwards, on the
+bundled ``il-tempF.csv.gz`` and a synthetic 10-year hourly meter data file.
+
+Usage::
+
+    python benchmarks/bench_csv_parsing.py [--repeat 3]
+"""
+import argparse
+import gzip
+import io
+import time
+
+import numpy as np
+import pandas as pd
+from pkg_resources import resource_string
+
+import eemeter
+
+
+def _previous_from_csv(buffer, date_col, value_col, gzipped):
+    # the loader before single-pass parsing, without tz/freq handling
+    df = pd.read_csv(
+        buffer,
+        usecols=[date_col, value_col],
+        dtype={value_col: np.float64},
+        parse_dates=[date_col],
+        index_col=date_col,
+        compression="gzip" if gzipped else "infer",
+    )
+    df.index = pd.to_datetime(df.index, utc=True)
+    return df
+
+
+def _synthetic_hourly_csv(years=10):
+    index = pd.date_range(
+        "2010-01-01", periods=years * 365 * 24, freq="H", tz="US/Central"
+    )
+    values = np.random.RandomState(0).uniform(0, 10, len(index))
+    df = pd.DataFrame({"value": values}, index=index.rename("start"))
+    # ISO 8601 with UTC offsets that change with daylight saving time
+    buffer = io.StringIO()
+    df.to_csv(buffer, date_format="%Y-%m-%dT%H:%M:%S%z")
+    return buffer.getvalue().encode("utf-8")
+
+
+def _best_time(func, data, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        func(io.BytesIO(data))
+        times.append(time.time() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV timestamp parsing.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    temperature_csv = resource_string("eemeter.samples", "il-tempF.csv.gz")
+    meter_csv = _synthetic_hourly_csv()
+    cases = [
+        (
+            "il-tempF.csv.gz",
+            temperature_csv,
+            [
+                (
+                    "previous",
+                    lambda f: _previous_from_csv(f, "dt", "tempF", gzipped=True),
+                ),
+                (
+                    "default",
+                    lambda f: eemeter.temperature_data_from_csv(f, gzipped=True),
+                ),
+                (
+                    "date_format",
+                    lambda f: eemeter.temperature_data_from_csv(
+                        f, gzipped=True, date_format="%Y-%m-%dT%H:%M:%S%z"
+                    ),
+                ),
+            ],
+        ),
+        (
+            "synthetic 10-year hourly",
+            meter_csv,
+            [
+                (
+                    "previous",
+                    lambda f: _previous_from_csv(f, "start", "value", gzipped=False),
+                ),
+                ("default", lambda f: eemeter.meter_data_from_csv(f)),
+                (
+                    "date_format",
+                    lambda f: eemeter.meter_data_from_csv(
+                        f, date_format="%Y-%m-%dT%H:%M:%S%z"
+                    ),
+                ),
+            ],
+        ),
+    ]
+
+    row = "{:<26} {:>8} {:<12} {:>8} {:>8}"
+    print(row.format("file", "rows", "parser", "time", "speedup"))
+    for name, data, parsers in cases:
+        if name.endswith(".gz"):
+            n_rows = gzip.decompress(data).count(b"\n") - 1
+        else:
+            n_rows = data.count(b"\n") - 1
+        baseline = None
+        for parser_name, func in parsers:
+            elapsed = _best_time(func, data, args.repeat)
+            if baseline is None:
+                baseline = elapsed
+            print(
+                row.format(
+                    name,
+                    n_rows,
+                    parser_name,
+                    "{:.3f}s".format(elapsed),
+                    "{:.1f}x".format(baseline / elapsed),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
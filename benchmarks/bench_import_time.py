@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+Measure how long ``import eemeter`` takes in a fresh interpreter, using
+``python -X importtime``.
+
+Usage::
+
+    python benchmarks/bench_import_time.py [--repeat 5] [--top 15] [--budget 0.25]
+
+This reports the best wall time of ``import eemeter`` and of
+``import numpy, pandas`` for reference, the modules with the largest
+cumulative import times, and which heavy dependencies (statsmodels, scipy,
+patsy, matplotlib, pkg_resources) were loaded by the import. It exits with
+status 1 if ``import eemeter`` takes longer than ``--budget`` seconds on top
+of numpy and pandas, which any use of eemeter needs anyway.
+"""
+import argparse
+import subprocess
+import sys
+
+HEAVY_MODULES = ["matplotlib", "patsy", "pkg_resources", "scipy", "statsmodels"]
+
+# Seconds eemeter may spend importing on top of numpy and pandas.
+IMPORT_TIME_BUDGET = 0.25
+
+
+def _import_times(code):
+    # returns {module: (self seconds, cumulative seconds)} and loaded modules
+    code = code + "; import sys; print(' '.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        self_time = int(fields[0].split(":")[1]) / 1e6
+        # nested imports are indented by two spaces per level
+        name = fields[2][1:].rstrip()
+        times[name] = (self_time, int(fields[1]) / 1e6)
+    return times, set(result.stdout.split())
+
+
+def _total(times):
+    return sum(
+        cumulative
+        for name, (_, cumulative) in times.items()
+        if not name.startswith(" ")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="eemeter import time.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET)
+    args = parser.parse_args()
+
+    for label, code in [
+        ("numpy, pandas", "import numpy, pandas"),
+        ("eemeter", "import eemeter"),
+    ]:
+        runs = [_import_times(code) for _ in range(args.repeat)]
+        best_times, modules = min(runs, key=lambda run: _total(run[0]))
+        print("import {:<16} {:.3f}s".format(label, _total(best_times)))
+
+    print()
+    loaded = [module for module in HEAVY_MODULES if module in modules]
+    print(
+        "heavy dependencies loaded by import eemeter: {}".format(
+            ", ".join(loaded) or "none"
+        )
+    )
+    print()
+    print("{:>10} {:>10}  {}".format("self", "cumulative", "module"))
+    slowest = sorted(best_times.items(), key=lambda item: -item[1][1])
+    for name, (self_time, cumulative) in slowest[: args.top]:
+        print("{:>9.3f}s {:>9.3f}s  {}".format(self_time, cumulative, name.strip()))
+
+    print()
+    eemeter_time = min(
+        _import_times("import numpy, pandas; import eemeter")[0]["eemeter"][1]
+        for _ in range(args.repeat)
+    )
+    print(
+        "import eemeter after numpy, pandas: {:.3f}s (budget {:.3f}s)".format(
+            eemeter_time, args.budget
+        )
+    )
+    if eemeter_time > args.budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
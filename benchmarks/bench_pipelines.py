@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+Benchmark the daily, billing and hourly CalTRACK pipelines and the hot paths
+they share (:any:`eemeter.as_freq`, :any:`eemeter.compute_temperature_features`,
+:any:`eemeter.fit_caltrack_usage_per_day_model`,
+:any:`eemeter.fit_caltrack_hourly_model` and :any:`eemeter.metered_savings`)
+on meters from :any:`eemeter.iterate_synthetic_meters` driven by the bundled
+``il-tempF.csv.gz`` temperature data, so it runs offline.
+
+Usage::
+
+    python benchmarks/bench_pipelines.py [--meters 2] [--years 2]
+        [--intervals daily,billing,hourly] [--repeat 1] [--no-memory]
+        [--output results.json] [--compare previous.json] [--threshold 0.2]
+
+The synthetic data start on 2015-11-22 and span ``--years`` years, with the
+bundled temperature data repeated every 104 weeks. The baseline period is the
+365 days (at most) before the midpoint of the data and the reporting period
+is everything after it, so feature computation and savings scale with
+``--years`` while fits use at most one year of data.
+
+For each case this reports the best wall time over ``--repeat`` runs across
+all meters and, unless ``--no-memory`` is given, the peak memory traced by
+:any:`tracemalloc` in a separate run. Results can be saved with ``--output``
+and compared against a previous run with ``--compare``, which marks cases
+that got slower by more than ``--threshold`` as regressions.
+"""
+import argparse
+from datetime import timedelta
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+import eemeter
+
+
+_START = pd.Timestamp("2015-11-22 06:00", tz="UTC")
+
+# benchmark intervals and the synthetic meter data intervals used for them
+_INTERVALS = {"daily": "daily", "billing": "billing_monthly", "hourly": "hourly"}
+
+
+def _temperature_data(years):
+    # the bundled hourly temperature data, repeated to cover `years` years
+    end = _START + timedelta(hours=int(years * 365 * 24))
+    return eemeter.synthetic_temperature_data(_START, end)
+
+
+def _meters(n_meters, temperature_data, interval):
+    meters = eemeter.iterate_synthetic_meters(
+        n_meters, temperature_data, interval=_INTERVALS[interval]
+    )
+    return [meter_data for meter_id, meter_data in meters]
+
+
+def _split(meter_data):
+    midpoint = meter_data.index[0] + (meter_data.index[-1] - meter_data.index[0]) / 2
+    baseline_meter_data, warnings = eemeter.get_baseline_data(
+        meter_data, end=midpoint, max_days=365
+    )
+    reporting_meter_data, warnings = eemeter.get_reporting_data(
+        meter_data, start=midpoint
+    )
+    return baseline_meter_data, reporting_meter_data
+
+
+def _fit_usage_per_day(meter_data, temperature_data, interval):
+    if interval == "billing":
+        data = eemeter.create_caltrack_billing_design_matrix(
+            meter_data, temperature_data
+        )
+        return eemeter.fit_caltrack_usage_per_day_model(
+            data, use_billing_presets=True, weights_col="n_days_kept"
+        )
+    data = eemeter.create_caltrack_daily_design_matrix(meter_data, temperature_data)
+    return eemeter.fit_caltrack_usage_per_day_model(data)
+
+
+def _fit_hourly(meter_data, temperature_data):
+    preliminary_design_matrix = (
+        eemeter.create_caltrack_hourly_preliminary_design_matrix(
+            meter_data, temperature_data
+        )
+    )
+    segmentation = eemeter.segment_time_series(
+        preliminary_design_matrix.index, "three_month_weighted"
+    )
+    occupancy_lookup = eemeter.estimate_hour_of_week_occupancy(
+        preliminary_design_matrix, segmentation=segmentation
+    )
+    (
+        occupied_temperature_bins,
+        unoccupied_temperature_bins,
+    ) = eemeter.fit_temperature_bins(
+        preliminary_design_matrix,
+        segmentation=segmentation,
+        occupancy_lookup=occupancy_lookup,
+    )
+    segmented_design_matrices = (
+        eemeter.create_caltrack_hourly_segmented_design_matrices(
+            preliminary_design_matrix,
+            segmentation,
+            occupancy_lookup,
+            occupied_temperature_bins,
+            unoccupied_temperature_bins,
+        )
+    )
+    return eemeter.fit_caltrack_hourly_model(
+        segmented_design_matrices,
+        occupancy_lookup,
+        occupied_temperature_bins,
+        unoccupied_temperature_bins,
+    )
+
+
+def _cases(interval, meters, temperature_data):
+    # Returns (name, run) pairs. Each run() does one case for every meter.
+    splits = [_split(meter_data) for meter_data in meters]
+
+    if interval == "hourly":
+
+        def fit(baseline_meter_data):
+            return _fit_hourly(baseline_meter_data, temperature_data)
+
+    else:
+
+        def fit(baseline_meter_data):
+            return _fit_usage_per_day(baseline_meter_data, temperature_data, interval)
+
+    def run_as_freq():
+        for meter_data in meters:
+            eemeter.as_freq(meter_data.value, "D")
+
+    def run_temperature_features():
+        for meter_data in meters:
+            eemeter.compute_temperature_features(
+                meter_data.index,
+                temperature_data,
+                heating_balance_points=range(55, 66),
+                cooling_balance_points=range(65, 76),
+                data_quality=True,
+                degree_day_method="hourly" if interval == "hourly" else "daily",
+            )
+
+    def run_pipeline():
+        for baseline_meter_data, reporting_meter_data in splits:
+            fit(baseline_meter_data)
+
+    model_results = [fit(baseline) for baseline, reporting in splits]
+
+    def run_metered_savings():
+        for results, (baseline, reporting) in zip(model_results, splits):
+            eemeter.metered_savings(
+                results, reporting, temperature_data, with_disaggregated=True
+            )
+
+    cases = []
+    if interval == "hourly":
+        cases.append(("as_freq", run_as_freq))
+    if interval != "billing":
+        cases.append(("compute_temperature_features", run_temperature_features))
+    cases.append(("fit pipeline", run_pipeline))
+    cases.append(("metered_savings", run_metered_savings))
+    return [("{} {}".format(interval, name), run) for name, run in cases]
+
+
+def _time(run, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _peak_memory(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark CalTRACK pipelines on synthetic meters."
+    )
+    parser.add_argument("--meters", type=int, default=2, help="number of meters")
+    parser.add_argument("--years", type=float, default=2, help="years of data")
+    parser.add_argument(
+        "--intervals",
+        default="daily,billing,hourly",
+        help="comma separated intervals to benchmark",
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip peak memory measurement"
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from a previous --output")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative slowdown reported as a regression by --compare",
+    )
+    args = parser.parse_args()
+    if args.years < 1:
+        parser.error("--years must be at least 1")
+
+    previous = {}
+    if args.compare is not None:
+        with open(args.compare) as f:
+            previous = json.load(f)["results"]
+
+    temperature_data = _temperature_data(args.years)
+    results = {}
+    row = "{:<40} {:>10} {:>12} {:>12}  {}"
+    print(row.format("case", "time", "per meter", "peak memory", "vs. previous"))
+    for interval in args.intervals.split(","):
+        meters = _meters(args.meters, temperature_data, interval)
+        for name, run in _cases(interval, meters, temperature_data):
+            result = {"time": _time(run, args.repeat)}
+            if not args.no_memory:
+                result["peak_memory"] = _peak_memory(run)
+            results[name] = result
+
+            comparison = ""
+            if name in previous:
+                ratio = result["time"] / previous[name]["time"]
+                comparison = "{:.2f}x".format(ratio)
+                if ratio > 1 + args.threshold:
+                    comparison += " REGRESSION"
+            print(
+                row.format(
+                    name,
+                    "{:.3f}s".format(result["time"]),
+                    "{:.1f}ms".format(1000 * result["time"] / args.meters),
+                    "{:.1f}MB".format(result["peak_memory"] / 2 ** 20)
+                    if "peak_memory" in result
+                    else "-",
+                    comparison,
+                )
+            )
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "eemeter_version": eemeter.get_version(),
+                    "settings": {
+                        "meters": args.meters,
+                        "years": args.years,
+                        "repeat": args.repeat,
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -29,7 +29,9 @@ from .exceptions import *
 from .features import *
 from .io import *
 from .metrics import *
+from .profiling import *
 from .samples.load import *
+from .samples.synthetic import *
 from .segmentation import *
 from .transform import *
 from .visualization import *
@@ -20,3 +20,6 @@
 from .design_matrices import *
 from .hourly import *
 from .usage_per_day import *
+from .incremental import *
+from .cache import *
+from .serialization import *
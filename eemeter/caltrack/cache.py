@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from ..__version__ import __version__
+from .design_matrices import CalTRACKUsagePerDayDesignMatrix
+from .hourly import CalTRACKHourlyModelResults, fit_caltrack_hourly_model
+from .usage_per_day import (
+    CalTRACKUsagePerDayModelResults,
+    fit_caltrack_usage_per_day_model,
+)
+
+
+__all__ = ("FitResultCache",)
+
+
+def _update_hash(hasher, obj):
+    # Feed a design matrix (or a dict or list of them, or fit settings) into
+    # hasher. DataFrames are hashed by column names, dtypes, index and values.
+    if isinstance(obj, CalTRACKUsagePerDayDesignMatrix):
+        # degree day columns are derived from the daily mean temperatures, so
+        # hash those instead of computing every column.
+        hasher.update(b"CalTRACKUsagePerDayDesignMatrix")
+        _update_hash(
+            hasher,
+            [
+                obj.data,
+                obj._degree_day_positions,
+                obj._degree_day_temperatures,
+                obj.heating_balance_points,
+                obj.cooling_balance_points,
+            ],
+        )
+    elif isinstance(obj, (pd.DataFrame, pd.Series)):
+        if isinstance(obj, pd.Series):
+            obj = obj.to_frame()
+        header = [
+            [str(column) for column in obj.columns],
+            [str(dtype) for dtype in obj.dtypes],
+            str(obj.index.dtype),
+        ]
+        hasher.update(json.dumps(header).encode("utf-8"))
+        row_hashes = pd.util.hash_pandas_object(obj, index=True)
+        hasher.update(row_hashes.to_numpy().tobytes())
+    elif isinstance(obj, dict):
+        for key in sorted(obj, key=str):
+            hasher.update(json.dumps(str(key)).encode("utf-8"))
+            _update_hash(hasher, obj[key])
+    elif isinstance(obj, np.ndarray) and obj.dtype == object:
+        _update_hash(hasher, obj.tolist())
+    elif isinstance(obj, np.ndarray):
+        header = [str(obj.dtype), list(obj.shape)]
+        hasher.update(json.dumps(header).encode("utf-8"))
+        hasher.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple, range)):
+        for item in obj:
+            _update_hash(hasher, item)
+    elif isinstance(obj, np.generic):
+        _update_hash(hasher, obj.item())
+    elif obj is None or isinstance(obj, (str, int, float, bool)):
+        hasher.update(json.dumps(obj).encode("utf-8"))
+    else:
+        raise TypeError(
+            "Cannot compute a cache key for {!r} of type {}.".format(
+                obj, type(obj).__name__
+            )
+        )
+
+
+class FitResultCache(object):
+    """A disk-backed cache of serialized model fit results.
+
+    Entries are keyed by a hash of the method name, the full contents of the
+    design matrices, the fit settings and the eemeter version, so any change
+    to the data, the settings or the library produces a new key. Values are
+    the output of the results ``json()`` method, stored as one JSON file per
+    entry, and are loaded back with the matching ``from_json()``. Results
+    loaded from the cache therefore have the same limitations as results
+    loaded with ``from_json()`` (e.g., no fitted statsmodels objects).
+
+    When the total size of the entries exceeds ``max_size``, the least
+    recently used entries are removed.
+
+    Parameters
+    ----------
+    directory : :any:`str`
+        Directory in which to store cache entries. Created if it does not exist.
+    max_size : :any:`int`, optional
+        Maximum total size in bytes of the cache entries.
+
+    Examples
+    --------
+
+    >>> cache = FitResultCache('/tmp/eemeter-cache')  # doctest: +SKIP
+    >>> model_results = cache.fit_caltrack_usage_per_day_model(
+    ...     design_matrix, use_billing_presets=True, weights_col='n_days_kept'
+    ... )  # doctest: +SKIP
+    """
+
+    def __init__(self, directory, max_size=100 * 2 ** 20):
+        self.directory = directory
+        self.max_size = max_size
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def __repr__(self):
+        return "FitResultCache(directory='{}', max_size={})".format(
+            self.directory, self.max_size
+        )
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def _path(self, key):
+        return os.path.join(self.directory, "{}.json".format(key))
+
+    def key(self, method_name, data, settings=None):
+        """Return the cache key for a fit.
+
+        Parameters
+        ----------
+        method_name : :any:`str`
+            Name of the fitting method, e.g., ``'caltrack_usage_per_day'``.
+        data : :any:`pandas.DataFrame` or :any:`dict` of :any:`pandas.DataFrame`
+            The input data of the fit.
+        settings : :any:`dict`, optional
+            Keyword arguments given to the fit. Values must be strings,
+            numbers, booleans, None, arrays, or lists or dicts of those.
+
+        Returns
+        -------
+        key : :any:`str`
+            A hex digest identifying the fit.
+        """
+        hasher = hashlib.sha256()
+        _update_hash(hasher, [__version__, method_name, settings or {}])
+        _update_hash(hasher, data)
+        return hasher.hexdigest()
+
+    def keys(self):
+        """Return the keys of all entries in the cache."""
+        return [
+            filename[: -len(".json")]
+            for filename in os.listdir(self.directory)
+            if filename.endswith(".json")
+        ]
+
+    @property
+    def size(self):
+        """Total size in bytes of all entries in the cache."""
+        return sum(self._entries().values())
+
+    def _entries(self):
+        entries = {}
+        for key in self.keys():
+            try:
+                entries[key] = os.path.getsize(self._path(key))
+            except OSError:  # pragma: no cover
+                pass  # removed by another process
+        return entries
+
+    def get(self, key):
+        """Return the cached JSON-serializable value for a key, or None if
+        there is no entry for that key.
+        """
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                value = json.load(f)
+        except (IOError, OSError):
+            return None
+        except ValueError:
+            # partially written or corrupt entry
+            self.invalidate(key)
+            return None
+        os.utime(path, None)  # mark as recently used
+        return value
+
+    def set(self, key, value):
+        """Store a JSON-serializable value under a key and evict least recently
+        used entries if the cache is over ``max_size``.
+        """
+        # write to a temporary file and move it into place so that concurrent
+        # readers never see a partial entry.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def invalidate(self, key):
+        """Remove the entry for a key. Returns True if an entry was removed."""
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            return False
+        return True
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for key in self.keys():
+            self.invalidate(key)
+
+    def _evict(self):
+        entries = self._entries()
+        total_size = sum(entries.values())
+        if total_size <= self.max_size:
+            return
+
+        def _mtime(key):
+            try:
+                return os.path.getmtime(self._path(key))
+            except OSError:  # pragma: no cover
+                return 0
+
+        for key in sorted(entries, key=_mtime):
+            if total_size <= self.max_size:
+                break
+            if self.invalidate(key):
+                total_size -= entries[key]
+
+    def fit_caltrack_usage_per_day_model(self, data, **kwargs):
+        """Return cached results of
+        :any:`eemeter.fit_caltrack_usage_per_day_model` for this data and these
+        settings, fitting and caching them first if necessary.
+
+        Parameters
+        ----------
+        data : :any:`pandas.DataFrame`
+            Design matrix, as given to
+            :any:`eemeter.fit_caltrack_usage_per_day_model`.
+        **kwargs
+            Keyword arguments for
+            :any:`eemeter.fit_caltrack_usage_per_day_model`.
+
+        Returns
+        -------
+        model_results : :any:`eemeter.CalTRACKUsagePerDayModelResults`
+            Results of the fit, either fresh or loaded from the cache.
+        """
+        key = self.key("caltrack_usage_per_day", data, kwargs)
+        value = self.get(key)
+        if value is not None:
+            return CalTRACKUsagePerDayModelResults.from_json(value)
+        model_results = fit_caltrack_usage_per_day_model(data, **kwargs)
+        self.set(key, model_results.json(with_candidates=True))
+        return model_results
+
+    def fit_caltrack_hourly_model(
+        self,
+        segmented_design_matrices,
+        occupancy_lookup,
+        occupied_temperature_bins,
+        unoccupied_temperature_bins,
+        dtype=None,
+    ):
+        """Return cached results of :any:`eemeter.fit_caltrack_hourly_model`
+        for these inputs, fitting and caching them first if necessary.
+
+        Parameters are the same as :any:`eemeter.fit_caltrack_hourly_model`.
+
+        Returns
+        -------
+        model_results : :any:`eemeter.CalTRACKHourlyModelResults`
+            Results of the fit, either fresh or loaded from the cache.
+        """
+        data = {
+            "segmented_design_matrices": segmented_design_matrices,
+            "occupancy_lookup": occupancy_lookup,
+            "occupied_temperature_bins": occupied_temperature_bins,
+            "unoccupied_temperature_bins": unoccupied_temperature_bins,
+        }
+        settings = None if dtype is None else {"dtype": str(dtype)}
+        key = self.key("caltrack_hourly", data, settings)
+        value = self.get(key)
+        if value is not None:
+            return CalTRACKHourlyModelResults.from_json(value)
+        model_results = fit_caltrack_hourly_model(
+            segmented_design_matrices,
+            occupancy_lookup,
+            occupied_temperature_bins,
+            unoccupied_temperature_bins,
+            dtype=dtype,
+        )
+        self.set(key, model_results.json())
+        return model_results
@@ -17,19 +17,23 @@
    limitations under the License.
 
 """
+import numpy as np
 import pandas as pd
 
 from eemeter.features import (
+    _daily_temperature_summaries,
     compute_time_features,
     compute_temperature_features,
     compute_usage_per_day_feature,
     merge_features,
 )
+from eemeter.profiling import profiled
 from eemeter.segmentation import iterate_segmented_dataset
 from eemeter.caltrack.hourly import caltrack_hourly_fit_feature_processor
 
 
 __all__ = (
+    "CalTRACKUsagePerDayDesignMatrix",
     "create_caltrack_hourly_preliminary_design_matrix",
     "create_caltrack_hourly_segmented_design_matrices",
     "create_caltrack_daily_design_matrix",
@@ -37,7 +41,224 @@ __all__ = (
 )
 
 
-def create_caltrack_hourly_preliminary_design_matrix(meter_data, temperature_data):
+class CalTRACKUsagePerDayDesignMatrix(object):
+    """A daily or billing design matrix that computes its ``hdd_<bp>`` and
+    ``cdd_<bp>`` columns on first access.
+
+    Holds the columns that do not depend on a balance point and, for each
+    period, the daily mean temperatures that count toward degree days. A
+    degree day column is computed from those in one vectorized pass the first
+    time it is accessed and is then cached, so balance points that are never
+    searched cost nothing. Values are the same as in the design matrices
+    returned by :any:`eemeter.create_caltrack_daily_design_matrix` and
+    :any:`eemeter.create_caltrack_billing_design_matrix`.
+
+    Instances are created by those functions with ``lazy=True`` and can be
+    given in place of a :any:`pandas.DataFrame` to
+    :any:`eemeter.fit_caltrack_usage_per_day_model` (which only computes the
+    balance points it searches) and to the prediction methods that take a
+    design matrix. Use :any:`to_frame` for anything else.
+
+    Parameters
+    ----------
+    data : :any:`pandas.DataFrame`
+        The ``meter_value``, ``temperature_not_null``, ``temperature_null``,
+        ``temperature_mean``, ``n_days_kept`` and ``n_days_dropped`` columns.
+    degree_day_positions : :any:`numpy.ndarray` of :any:`int`
+        Row position of each daily mean temperature in
+        ``degree_day_temperatures``.
+    degree_day_temperatures : :any:`numpy.ndarray` of :any:`float`
+        Daily mean temperatures of all rows that count toward degree days.
+    heating_balance_points : :any:`list` of :any:`int`
+        Heating balance points listed in :any:`columns`.
+    cooling_balance_points : :any:`list` of :any:`int`
+        Cooling balance points listed in :any:`columns`.
+    """
+
+    def __init__(
+        self,
+        data,
+        degree_day_positions,
+        degree_day_temperatures,
+        heating_balance_points,
+        cooling_balance_points,
+    ):
+        self.heating_balance_points = list(heating_balance_points)
+        self.cooling_balance_points = list(cooling_balance_points)
+        self._degree_day_positions = degree_day_positions
+        self._degree_day_temperatures = degree_day_temperatures
+        self._degree_days = {}
+
+        n_rows = data.shape[0]
+        self._n_days = np.bincount(degree_day_positions, minlength=n_rows)
+        nan_temperatures = np.bincount(
+            degree_day_positions,
+            weights=np.isnan(degree_day_temperatures),
+            minlength=n_rows,
+        )
+        # rows with any missing value are entirely NaN, as in merge_features,
+        # and the last row marks the end of the last period.
+        self._nan_rows = (
+            data.isnull().to_numpy().any(axis=1)
+            | (self._n_days == 0)
+            | (nan_temperatures > 0)
+        )
+        if n_rows > 0:
+            self._nan_rows[-1] = True
+        self.data = data.copy()
+        self.data.loc[self._nan_rows, :] = np.nan
+
+    def __repr__(self):
+        return (
+            "CalTRACKUsagePerDayDesignMatrix(rows={}, heating_balance_points={},"
+            " cooling_balance_points={}, computed={})".format(
+                self.data.shape[0],
+                len(self.heating_balance_points),
+                len(self.cooling_balance_points),
+                len(self._degree_days),
+            )
+        )
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def __getitem__(self, key):
+        if isinstance(key, list):
+            return pd.concat([self[column] for column in key], axis=1)
+        if key in self.data.columns:
+            return self.data[key]
+        return pd.Series(self._degree_day_column(key), index=self.data.index, name=key)
+
+    @property
+    def index(self):
+        """The :any:`pandas.DatetimeIndex` of the design matrix."""
+        return self.data.index
+
+    @property
+    def columns(self):
+        """All columns, including degree day columns for the balance points
+        given on creation, in the same order as the equivalent DataFrame.
+        """
+        return pd.Index(
+            list(self.data.columns)
+            + ["cdd_%s" % bp for bp in self.cooling_balance_points]
+            + ["hdd_%s" % bp for bp in self.heating_balance_points]
+        )
+
+    @property
+    def shape(self):
+        return (self.data.shape[0], len(self.columns))
+
+    def _degree_day_column(self, column):
+        degree_days = self._degree_days.get(column)
+        if degree_days is not None:
+            return degree_days
+        try:
+            kind, balance_point = column.split("_")
+            balance_point = float(balance_point)
+        except (AttributeError, ValueError):
+            raise KeyError(column)
+        if kind == "cdd":
+            values = self._degree_day_temperatures - balance_point
+        elif kind == "hdd":
+            values = balance_point - self._degree_day_temperatures
+        else:
+            raise KeyError(column)
+        totals = np.bincount(
+            self._degree_day_positions,
+            weights=np.maximum(values, 0),
+            minlength=len(self._n_days),
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            degree_days = np.where(self._nan_rows, np.nan, totals / self._n_days)
+        self._degree_days[column] = degree_days
+        return degree_days
+
+    def to_frame(self, heating_balance_points=None, cooling_balance_points=None):
+        """Return the design matrix as a :any:`pandas.DataFrame`.
+
+        Parameters
+        ----------
+        heating_balance_points : :any:`list` of :any:`int`, optional
+            Heating balance points for which to include ``hdd_<bp>`` columns.
+            Defaults to :any:`heating_balance_points`.
+        cooling_balance_points : :any:`list` of :any:`int`, optional
+            Cooling balance points for which to include ``cdd_<bp>`` columns.
+            Defaults to :any:`cooling_balance_points`.
+
+        Returns
+        -------
+        data : :any:`pandas.DataFrame`
+            The columns that do not depend on a balance point followed by
+            the requested ``cdd_<bp>`` and ``hdd_<bp>`` columns.
+        """
+        if heating_balance_points is None:
+            heating_balance_points = self.heating_balance_points
+        if cooling_balance_points is None:
+            cooling_balance_points = self.cooling_balance_points
+        degree_day_columns = ["cdd_%s" % bp for bp in cooling_balance_points] + [
+            "hdd_%s" % bp for bp in heating_balance_points
+        ]
+        degree_days = pd.DataFrame(
+            {column: self._degree_day_column(column) for column in degree_day_columns},
+            index=self.data.index,
+            columns=degree_day_columns,
+        )
+        return pd.concat([self.data, degree_days], axis=1)
+
+
+def _create_caltrack_usage_per_day_design_matrix(
+    meter_data, temperature_data, tolerance
+):
+    if temperature_data.index.freq != "H":
+        raise ValueError(
+            "temperature_data.index must have hourly frequency (freq='H')."
+            " Found: {}".format(temperature_data.index.freq)
+        )
+    if not temperature_data.index.tz:
+        raise ValueError(
+            "temperature_data.index must be timezone-aware. You can set it with"
+            " temperature_data.tz_localize(...)."
+        )
+    meter_data_index = meter_data.index
+    if not meter_data_index.tz:
+        raise ValueError(
+            "meter_data_index must be timezone-aware. You can set it with"
+            " meter_data.tz_localize(...)."
+        )
+    if meter_data_index.freq == "H":
+        raise ValueError(
+            "degree_day_method='hourly' must be used with hourly meter data."
+            " Found: 'daily'"
+        )
+    if meter_data_index.duplicated().any():
+        raise ValueError("Duplicates found in input meter trace index.")
+    if tolerance is None and meter_data_index.freq is not None:
+        try:
+            tolerance = pd.Timedelta(meter_data_index.freq)
+        except ValueError:  # freq cannot be converted to timedelta
+            pass
+
+    summaries, positions, temperatures = _daily_temperature_summaries(
+        meter_data_index, temperature_data, tolerance=tolerance
+    )
+    usage_per_day = compute_usage_per_day_feature(meter_data, series_name="meter_value")
+    return CalTRACKUsagePerDayDesignMatrix(
+        pd.concat([usage_per_day, summaries], axis=1),
+        positions,
+        temperatures,
+        heating_balance_points=range(30, 91),
+        cooling_balance_points=range(30, 91),
+    )
+
+
+@profiled
+def create_caltrack_hourly_preliminary_design_matrix(
+    meter_data, temperature_data, dtype=None
+):
     """A helper function which calls basic feature creation methods to create an
     input suitable for use in the first step of creating a CalTRACK hourly model.
 
@@ -47,6 +268,9 @@ def create_caltrack_hourly_preliminary_design_matrix(meter_data, temperature_dat
         Hourly meter data in eemeter format.
     temperature_data : :any:`pandas.Series`
         Hourly temperature data in eemeter format.
+    dtype : :any:`str` or :any:`numpy.dtype`, optional
+        If given, e.g., ``'float32'``, store floating point features with this
+        dtype instead of float64. See :ref:`reduced-precision`.
 
     Returns
     -------
@@ -62,14 +286,17 @@ def create_caltrack_hourly_preliminary_design_matrix(meter_data, temperature_dat
         heating_balance_points=[50],
         cooling_balance_points=[65],
         degree_day_method="hourly",
+        dtype=dtype,
     )
-    design_matrix = merge_features(
-        [meter_data.value.to_frame("meter_value"), temperature_features, time_features]
-    )
+    meter_value = meter_data.value.to_frame("meter_value")
+    if dtype is not None:
+        meter_value = meter_value.astype(dtype)
+    design_matrix = merge_features([meter_value, temperature_features, time_features])
     return design_matrix
 
 
-def create_caltrack_billing_design_matrix(meter_data, temperature_data):
+@profiled
+def create_caltrack_billing_design_matrix(meter_data, temperature_data, lazy=False):
     """A helper function which calls basic feature creation methods to create a
     design matrix suitable for use with CalTRACK Billing methods.
 
@@ -79,13 +306,20 @@ def create_caltrack_billing_design_matrix(meter_data, temperature_data):
         Hourly meter data in eemeter format.
     temperature_data : :any:`pandas.Series`
         Hourly temperature data in eemeter format.
+    lazy : :any:`bool`, default False
+        If True, return a :any:`eemeter.CalTRACKUsagePerDayDesignMatrix`,
+        which only computes degree day columns when they are used.
 
     Returns
     -------
-    design_matrix : :any:`pandas.DataFrame`
+    design_matrix : :any:`pandas.DataFrame` or :any:`eemeter.CalTRACKUsagePerDayDesignMatrix`
         A design matrics with mean usage_per_day, hdd_30-hdd_90, and cdd_30-cdd_90
         features.
     """
+    if lazy:
+        return _create_caltrack_usage_per_day_design_matrix(
+            meter_data, temperature_data, tolerance=pd.Timedelta("35D")
+        )
     usage_per_day = compute_usage_per_day_feature(meter_data, series_name="meter_value")
     temperature_features = compute_temperature_features(
         meter_data.index,
@@ -101,7 +335,10 @@ def create_caltrack_billing_design_matrix(meter_data, temperature_data):
     return design_matrix
 
 
-def create_caltrack_daily_design_matrix(meter_data, temperature_data):
+@profiled
+def create_caltrack_daily_design_matrix(
+    meter_data, temperature_data, lazy=False, chunk_days=None
+):
     """A helper function which calls basic feature creation methods to create a
     design matrix suitable for use with CalTRACK daily methods.
 
@@ -111,13 +348,24 @@ def create_caltrack_daily_design_matrix(meter_data, temperature_data):
         Hourly meter data in eemeter format.
     temperature_data : :any:`pandas.Series`
         Hourly temperature data in eemeter format.
+    lazy : :any:`bool`, default False
+        If True, return a :any:`eemeter.CalTRACKUsagePerDayDesignMatrix`,
+        which only computes degree day columns when they are used.
+    chunk_days : :any:`int`, optional
+        If given, compute temperature features in chunks of this many days.
+        See :any:`eemeter.compute_temperature_features`. Not needed if
+        ``lazy`` is True.
 
     Returns
     -------
-    design_matrix : :any:`pandas.DataFrame`
+    design_matrix : :any:`pandas.DataFrame` or :any:`eemeter.CalTRACKUsagePerDayDesignMatrix`
         A design matrics with mean usage_per_day, hdd_30-hdd_90, and cdd_30-cdd_90
         features.
     """
+    if lazy:
+        return _create_caltrack_usage_per_day_design_matrix(
+            meter_data, temperature_data, tolerance=None
+        )
     usage_per_day = compute_usage_per_day_feature(meter_data, series_name="meter_value")
     temperature_features = compute_temperature_features(
         meter_data.index,
@@ -125,17 +373,20 @@ def create_caltrack_daily_design_matrix(meter_data, temperature_data):
         heating_balance_points=range(30, 91),
         cooling_balance_points=range(30, 91),
         data_quality=True,
+        chunk_days=chunk_days,
     )
     design_matrix = merge_features([usage_per_day, temperature_features])
     return design_matrix
 
 
+@profiled
 def create_caltrack_hourly_segmented_design_matrices(
     preliminary_design_matrix,
     segmentation,
     occupancy_lookup,
     occupied_temperature_bins,
     unoccupied_temperature_bins,
+    dtype=None,
 ):
     """A helper function which calls basic feature creation methods to create a
     design matrix suitable for use with segmented CalTRACK hourly models.
@@ -156,6 +407,10 @@ def create_caltrack_hourly_segmented_design_matrices(
         form returned by :any:`eemeter.fit_temperature_bins`.
     unoccupied_temperature_bins : :any:``
         Ditto, for unoccupied.
+    dtype : :any:`str` or :any:`numpy.dtype`, optional
+        If given, e.g., ``'float32'``, store floating point features with this
+        dtype instead of float64. Pass the same dtype to
+        :any:`eemeter.fit_caltrack_hourly_model`. See :ref:`reduced-precision`.
 
     Returns
     -------
@@ -173,6 +428,7 @@ def create_caltrack_hourly_segmented_design_matrices(
                 "occupancy_lookup": occupancy_lookup,
                 "occupied_temperature_bins": occupied_temperature_bins,
                 "unoccupied_temperature_bins": unoccupied_temperature_bins,
+                "dtype": dtype,
             },
         )
     }
@@ -19,15 +19,16 @@
 """
 import numpy as np
 import pandas as pd
-import statsmodels.formula.api as smf
 
 from ..features import (
+    _astype_float_columns,
     compute_time_features,
     compute_temperature_bin_features,
     compute_occupancy_feature,
     merge_features,
 )
 from ..metrics import ModelMetrics
+from ..profiling import profiled
 from ..segmentation import CalTRACKSegmentModel, SegmentedModel, fit_model_segments
 from ..warnings import EEMeterWarning
 
@@ -109,6 +110,7 @@ class CalTRACKHourlyModelResults(object):
             self.status, self.method_name
         )
 
+    @profiled
     def json(self, with_candidates=False):
         """Return a JSON-serializable representation of this result.
 
@@ -156,21 +158,28 @@ class CalTRACKHourlyModelResults(object):
             data.get("status"),
             data.get("method_name"),
             model=model,
-            warnings=data.get("warnings"),
+            warnings=[EEMeterWarning.from_json(w) for w in data.get("warnings") or []],
             metadata=data.get("metadata"),
             settings=data.get("settings"),
         )
 
         # Note the metrics do not contain all the data needed
         # for reconstruction (like the input pandas) ...
+        def _from_json_or_none_in_dict(d):
+            return {
+                key: None if val is None else ModelMetrics.from_json(val)
+                for key, val in d.items()
+            }
+
         d = data.get("avgs_metrics")
         if d:
-            c.avgs_metrics = ModelMetrics.from_json(d)  # pragma: no cover
+            c.avgs_metrics = _from_json_or_none_in_dict(d)  # pragma: no cover
         d = data.get("totals_metrics")
         if d:
-            c.totals_metrics = ModelMetrics.from_json(d)
+            c.totals_metrics = _from_json_or_none_in_dict(d)
         return c
 
+    @profiled
     def predict(self, prediction_index, temperature_data, **kwargs):
         """Predict over a particular index using temperature data.
 
@@ -207,6 +216,9 @@ class CalTRACKHourlyModel(SegmentedModel):
         A dataframe of bin endpoint flags for each segment. Segment names are columns.
     unoccupied_temperature_bins : :any:`pandas.DataFrame`
         Ditto for the unoccupied mode.
+    dtype : :any:`str` or :any:`None`
+        The dtype of prediction features, e.g., ``'float32'``, or None for
+        float64.
     """
 
     def __init__(
@@ -215,10 +227,12 @@ class CalTRACKHourlyModel(SegmentedModel):
         occupancy_lookup,
         occupied_temperature_bins,
         unoccupied_temperature_bins,
+        dtype=None,
     ):
         self.occupancy_lookup = occupancy_lookup
         self.occupied_temperature_bins = occupied_temperature_bins
         self.unoccupied_temperature_bins = unoccupied_temperature_bins
+        self.dtype = None if dtype is None else np.dtype(dtype).name
         super(CalTRACKHourlyModel, self).__init__(
             segment_models=segment_models,
             prediction_segment_type="one_month",
@@ -241,6 +255,7 @@ class CalTRACKHourlyModel(SegmentedModel):
                 "occupancy_lookup": self.occupancy_lookup,
                 "occupied_temperature_bins": self.occupied_temperature_bins,
                 "unoccupied_temperature_bins": self.unoccupied_temperature_bins,
+                "dtype": self.dtype,
             },
         )
 
@@ -260,6 +275,7 @@ class CalTRACKHourlyModel(SegmentedModel):
                 "unoccupied_temperature_bins": self.unoccupied_temperature_bins.to_json(
                     orient="split"
                 ),
+                "dtype": self.dtype,
             }
         )
         return data
@@ -284,17 +300,20 @@ class CalTRACKHourlyModel(SegmentedModel):
             occupancy_lookup,
             pd.read_json(data.get("occupied_temperature_bins"), orient="split"),
             pd.read_json(data.get("unoccupied_temperature_bins"), orient="split"),
+            dtype=data.get("dtype"),
         )
 
         return c
 
 
+@profiled
 def caltrack_hourly_fit_feature_processor(
     segment_name,
     segmented_data,
     occupancy_lookup,
     occupied_temperature_bins,
     unoccupied_temperature_bins,
+    dtype=None,
 ):
     """A function that takes in temperature data and returns a dataframe of
     features suitable for use with :any:`eemeter.fit_caltrack_hourly_model_segment`.
@@ -313,6 +332,9 @@ def caltrack_hourly_fit_feature_processor(
         A dataframe of bin endpoint flags for each segment. Segment names are columns.
     unoccupied_temperature_bins : :any:`pandas.DataFrame`
         Ditto for the unoccupied mode.
+    dtype : :any:`str` or :any:`numpy.dtype`, optional
+        If given, e.g., ``'float32'``, store floating point features with this
+        dtype instead of float64. See :ref:`reduced-precision`.
 
     Returns
     -------
@@ -343,7 +365,7 @@ def caltrack_hourly_fit_feature_processor(
         .tolist()
     )
     occupied_temperature_bin_features = compute_temperature_bin_features(
-        segmented_data.temperature_mean, occupied_bin_endpoints_list
+        segmented_data.temperature_mean, occupied_bin_endpoints_list, dtype=dtype
     )
     occupied_temperature_bin_features[occupancy_feature == 0] = 0
     occupied_temperature_bin_features.rename(
@@ -354,7 +376,7 @@ def caltrack_hourly_fit_feature_processor(
         inplace=True,
     )
     unoccupied_temperature_bin_features = compute_temperature_bin_features(
-        segmented_data.temperature_mean, unoccupied_bin_endpoints_list
+        segmented_data.temperature_mean, unoccupied_bin_endpoints_list, dtype=dtype
     )
     unoccupied_temperature_bin_features[occupancy_feature == 1] = 0
     unoccupied_temperature_bin_features.rename(
@@ -366,7 +388,7 @@ def caltrack_hourly_fit_feature_processor(
     )
 
     # combine features
-    return merge_features(
+    features = merge_features(
         [
             segmented_data[["meter_value", "hour_of_week"]],
             occupied_temperature_bin_features,
@@ -374,14 +396,19 @@ def caltrack_hourly_fit_feature_processor(
             segmented_data.weight,
         ]
     )
+    if dtype is not None:
+        features = _astype_float_columns(features, dtype)
+    return features
 
 
+@profiled
 def caltrack_hourly_prediction_feature_processor(
     segment_name,
     segmented_data,
     occupancy_lookup,
     occupied_temperature_bins,
     unoccupied_temperature_bins,
+    dtype=None,
 ):
     """A function that takes in temperature data and returns a dataframe of
     features suitable for use inside :any:`eemeter.CalTRACKHourlyModel`.
@@ -400,6 +427,9 @@ def caltrack_hourly_prediction_feature_processor(
         A dataframe of bin endpoint flags for each segment. Segment names are columns.
     unoccupied_temperature_bins : :any:`pandas.DataFrame`
         Ditto for the unoccupied mode.
+    dtype : :any:`str` or :any:`numpy.dtype`, optional
+        If given, e.g., ``'float32'``, store floating point features with this
+        dtype instead of float64. See :ref:`reduced-precision`.
 
     Returns
     -------
@@ -435,7 +465,7 @@ def caltrack_hourly_prediction_feature_processor(
         .tolist()
     )
     occupied_temperature_bin_features = compute_temperature_bin_features(
-        segmented_data.temperature_mean, occupied_bin_endpoints_list
+        segmented_data.temperature_mean, occupied_bin_endpoints_list, dtype=dtype
     )
     occupied_temperature_bin_features[occupancy_feature == 0] = 0
     occupied_temperature_bin_features.rename(
@@ -446,7 +476,7 @@ def caltrack_hourly_prediction_feature_processor(
         inplace=True,
     )
     unoccupied_temperature_bin_features = compute_temperature_bin_features(
-        segmented_data.temperature_mean, unoccupied_bin_endpoints_list
+        segmented_data.temperature_mean, unoccupied_bin_endpoints_list, dtype=dtype
     )
     unoccupied_temperature_bin_features[occupancy_feature == 1] = 0
     unoccupied_temperature_bin_features.rename(
@@ -458,7 +488,7 @@ def caltrack_hourly_prediction_feature_processor(
     )
 
     # combine features
-    return merge_features(
+    features = merge_features(
         [
             hour_of_week_feature,
             occupied_temperature_bin_features,
@@ -466,8 +496,12 @@ def caltrack_hourly_prediction_feature_processor(
             segmented_data.weight,
         ]
     )
+    if dtype is not None:
+        features = _astype_float_columns(features, dtype)
+    return features
 
 
+@profiled
 def fit_caltrack_hourly_model_segment(segment_name, segment_data):
     """Fit a model for a single segment.
 
@@ -484,6 +518,11 @@ def fit_caltrack_hourly_model_segment(segment_name, segment_data):
     segment_model : :any:`CalTRACKSegmentModel`
         A model that represents the fitted model.
     """
+    import statsmodels.formula.api as smf
+
+    # reduced precision features are only stored that way: solve in float64.
+    if any(kind.kind == "f" and kind != float for kind in segment_data.dtypes):
+        segment_data = _astype_float_columns(segment_data, float)
 
     warnings = []
     if segment_data.dropna().empty:
@@ -541,11 +580,13 @@ def fit_caltrack_hourly_model_segment(segment_name, segment_data):
     return segment_model
 
 
+@profiled
 def fit_caltrack_hourly_model(
     segmented_design_matrices,
     occupancy_lookup,
     occupied_temperature_bins,
     unoccupied_temperature_bins,
+    dtype=None,
 ):
     """Fit a CalTRACK hourly model
 
@@ -561,6 +602,10 @@ def fit_caltrack_hourly_model(
         A dataframe of bin endpoint flags for each segment. Segment names are columns.
     unoccupied_temperature_bins : :any:`pandas.DataFrame`
         Ditto for the unoccupied mode.
+    dtype : :any:`str` or :any:`numpy.dtype`, optional
+        The dtype the design matrices were created with, e.g., ``'float32'``.
+        The model computes prediction features with the same dtype. Parameters
+        are always fit in float64. See :ref:`reduced-precision`.
 
     Returns
     -------
@@ -582,6 +627,7 @@ def fit_caltrack_hourly_model(
         occupancy_lookup,
         occupied_temperature_bins,
         unoccupied_temperature_bins,
+        dtype=dtype,
     )
 
     model_results = CalTRACKHourlyModelResults(
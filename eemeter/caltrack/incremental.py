@@ -0,0 +1,683 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+"""
+import numpy as np
+import pandas as pd
+
+from ..warnings import EEMeterWarning
+from .usage_per_day import (
+    CalTRACKUsagePerDayCandidateModel,
+    CalTRACKUsagePerDayModelResults,
+    _too_few_non_zero_degree_day_warning,
+    _total_degree_day_too_low_warning,
+    get_parameter_negative_warning,
+    get_parameter_p_value_too_high_warning,
+    select_best_candidate,
+)
+
+
+__all__ = ("CalTRACKUsagePerDayFitState",)
+
+
+def _balance_points(columns, prefix):
+    return [int(col[4:]) for col in columns if col.startswith(prefix)]
+
+
+def _solve_weighted_least_squares(xtwx, xtwy, sum_w, sum_wy, sum_wyy, n):
+    # Solve stacked weighted least squares problems given their normal
+    # equations. xtwx has shape (..., k, k) and xtwy has shape (..., k). Returns
+    # params, adjusted r-squared and p-values in the same form statsmodels
+    # reports them for a model with an intercept.
+    from scipy.stats import t
+
+    k = xtwx.shape[-1]
+    xtwx_inv = np.linalg.pinv(xtwx)
+    params = np.einsum("...ij,...j->...i", xtwx_inv, xtwy)
+    df_resid = n - k
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ssr = sum_wyy - np.einsum("...i,...i->...", params, xtwy)
+        centered_tss = sum_wyy - sum_wy ** 2 / sum_w
+        r_squared = 1 - ssr / centered_tss
+        r_squared_adj = 1 - (n - 1) / float(df_resid) * (1 - r_squared)
+
+        scale = ssr / df_resid
+        bse = np.sqrt(
+            scale[..., np.newaxis] * np.diagonal(xtwx_inv, axis1=-2, axis2=-1)
+        )
+        p_values = 2 * t.sf(np.abs(params / bse), df_resid)
+
+    return params, r_squared_adj, p_values
+
+
+class CalTRACKUsagePerDayFitState(object):
+    """Sufficient statistics for incrementally refitting CalTRACK usage per
+    day models.
+
+    Each candidate model considered by
+    :any:`eemeter.fit_caltrack_usage_per_day_model` is a weighted linear
+    regression with at most three parameters, so it is fully described by a
+    few weighted sums and cross products of ``meter_value`` and its degree day
+    columns. This object keeps those sums for every balance point (and every
+    pair of balance points), so that periods can be added to or removed from
+    the fit in time proportional to the number of candidates, and candidate
+    selection can be rerun without revisiting the full history.
+
+    Results match those of :any:`eemeter.fit_caltrack_usage_per_day_model` up
+    to floating point error. Candidate models created from a fit state do not
+    carry the raw statsmodels ``model`` or ``result`` objects, and model
+    metrics are not computed because they require the underlying data.
+
+    Attributes
+    ----------
+    cooling_balance_points : :any:`list` of :any:`int`
+        Cooling balance points tracked by this state.
+    heating_balance_points : :any:`list` of :any:`int`
+        Heating balance points tracked by this state.
+    weights_col : :any:`str` or None
+        The name of the column (if any) in the design matrix used as weights.
+    periods : :any:`pandas.DatetimeIndex`
+        The sorted start dates of periods currently included in the fit.
+    """
+
+    def __init__(
+        self, cooling_balance_points, heating_balance_points, weights_col=None
+    ):
+        self.cooling_balance_points = list(cooling_balance_points)
+        self.heating_balance_points = list(heating_balance_points)
+        self.weights_col = weights_col
+        self.periods = pd.DatetimeIndex([], tz="UTC")
+
+        n_cdd = len(self.cooling_balance_points)
+        n_hdd = len(self.heating_balance_points)
+        self._statistics = {
+            "n": 0,
+            "w": 0.0,
+            "wy": 0.0,
+            "wyy": 0.0,
+            "cdd_w": np.zeros(n_cdd),
+            "cdd_ww": np.zeros(n_cdd),
+            "cdd_wy": np.zeros(n_cdd),
+            "cdd_n_non_zero": np.zeros(n_cdd, dtype=int),
+            "hdd_w": np.zeros(n_hdd),
+            "hdd_ww": np.zeros(n_hdd),
+            "hdd_wy": np.zeros(n_hdd),
+            "hdd_n_non_zero": np.zeros(n_hdd, dtype=int),
+            "cdd_hdd_w": np.zeros((n_cdd, n_hdd)),
+        }
+
+    def __repr__(self):
+        return (
+            "CalTRACKUsagePerDayFitState(n_periods={}, n_cooling_balance_points={},"
+            " n_heating_balance_points={})".format(
+                self.n_periods,
+                len(self.cooling_balance_points),
+                len(self.heating_balance_points),
+            )
+        )
+
+    @property
+    def n_periods(self):
+        """The number of non-null periods included in the fit."""
+        return int(self._statistics["n"])
+
+    @classmethod
+    def from_design_matrix(cls, data, weights_col=None):
+        """Create a fit state from a design matrix, tracking every balance
+        point found in its columns.
+
+        Parameters
+        ----------
+        data : :any:`pandas.DataFrame`
+            A design matrix of the form created by
+            :any:`eemeter.create_caltrack_daily_design_matrix` or
+            :any:`eemeter.create_caltrack_billing_design_matrix`.
+        weights_col : :any:`str` or None
+            The name of the column (if any) in ``data`` to use as weights.
+
+        Returns
+        -------
+        fit_state : :any:`eemeter.CalTRACKUsagePerDayFitState`
+            A fit state including all periods in ``data``.
+        """
+        fit_state = cls(
+            _balance_points(data.columns, "cdd"),
+            _balance_points(data.columns, "hdd"),
+            weights_col=weights_col,
+        )
+        fit_state.add_periods(data)
+        return fit_state
+
+    def _period_statistics(self, data):
+        # cleans data to fully NaN rows that have missing temp or meter data,
+        # then drops them - they contribute nothing to any candidate fit.
+        data = data.dropna()
+
+        meter_value = data.meter_value.to_numpy(dtype=float)
+        if self.weights_col is None:
+            weights = np.ones(meter_value.shape)
+        else:
+            weights = data[self.weights_col].to_numpy(dtype=float)
+
+        cdd = data[["cdd_%s" % bp for bp in self.cooling_balance_points]].to_numpy(
+            dtype=float
+        )
+        hdd = data[["hdd_%s" % bp for bp in self.heating_balance_points]].to_numpy(
+            dtype=float
+        )
+        weighted_cdd = cdd * weights[:, np.newaxis]
+        weighted_hdd = hdd * weights[:, np.newaxis]
+        weighted_meter_value = weights * meter_value
+
+        statistics = {
+            "n": meter_value.shape[0],
+            "w": weights.sum(),
+            "wy": weighted_meter_value.sum(),
+            "wyy": (weighted_meter_value * meter_value).sum(),
+            "cdd_w": weighted_cdd.sum(axis=0),
+            "cdd_ww": (weighted_cdd * cdd).sum(axis=0),
+            "cdd_wy": weighted_cdd.T.dot(meter_value),
+            "cdd_n_non_zero": (cdd > 0).sum(axis=0),
+            "hdd_w": weighted_hdd.sum(axis=0),
+            "hdd_ww": (weighted_hdd * hdd).sum(axis=0),
+            "hdd_wy": weighted_hdd.T.dot(meter_value),
+            "hdd_n_non_zero": (hdd > 0).sum(axis=0),
+            "cdd_hdd_w": weighted_cdd.T.dot(hdd),
+        }
+        return data.index, statistics
+
+    def add_periods(self, data):
+        """Add periods to the fit.
+
+        Parameters
+        ----------
+        data : :any:`pandas.DataFrame`
+            Rows of a design matrix with the same columns used to create this
+            state. Rows containing any null value are ignored.
+        """
+        index, statistics = self._period_statistics(data)
+        if index.isin(self.periods).any():
+            raise ValueError(
+                "Periods already included in fit state: {}".format(
+                    [ts.isoformat() for ts in index[index.isin(self.periods)]]
+                )
+            )
+        for key, value in statistics.items():
+            self._statistics[key] = self._statistics[key] + value
+        self.periods = self.periods.append(index.tz_convert("UTC")).sort_values()
+
+    def remove_periods(self, data):
+        """Remove periods from the fit.
+
+        Parameters
+        ----------
+        data : :any:`pandas.DataFrame`
+            Rows of a design matrix previously added with
+            :any:`eemeter.CalTRACKUsagePerDayFitState.add_periods`. Rows
+            containing any null value are ignored.
+        """
+        index, statistics = self._period_statistics(data)
+        if not index.isin(self.periods).all():
+            raise ValueError(
+                "Periods not included in fit state: {}".format(
+                    [ts.isoformat() for ts in index[~index.isin(self.periods)]]
+                )
+            )
+        for key, value in statistics.items():
+            self._statistics[key] = self._statistics[key] - value
+        self.periods = self.periods[~self.periods.isin(index)]
+
+    def get_candidate_models(
+        self,
+        fit_cdd=True,
+        minimum_non_zero_cdd=10,
+        minimum_non_zero_hdd=10,
+        minimum_total_cdd=20,
+        minimum_total_hdd=20,
+        beta_cdd_maximum_p_value=1,
+        beta_hdd_maximum_p_value=1,
+        fit_intercept_only=True,
+        fit_cdd_only=True,
+        fit_hdd_only=True,
+        fit_cdd_hdd=True,
+    ):
+        """Return candidate models computed from the current statistics, in
+        the same order and with the same statuses and warnings as
+        :any:`eemeter.fit_caltrack_usage_per_day_model`.
+
+        See :any:`eemeter.fit_caltrack_usage_per_day_model` for a description
+        of the parameters.
+
+        Returns
+        -------
+        candidate_models : :any:`list` of :any:`eemeter.CalTRACKUsagePerDayCandidateModel`
+            All candidate models, with any associated warnings.
+        """
+        candidates = []
+        if fit_intercept_only:
+            candidates.append(self._get_intercept_only_candidate_model())
+        if fit_hdd_only:
+            candidates.extend(
+                self._get_single_degree_day_candidate_models(
+                    "hdd",
+                    minimum_non_zero_hdd,
+                    minimum_total_hdd,
+                    beta_hdd_maximum_p_value,
+                )
+            )
+        # cdd models ignored for gas
+        if fit_cdd:
+            if fit_cdd_only:
+                candidates.extend(
+                    self._get_single_degree_day_candidate_models(
+                        "cdd",
+                        minimum_non_zero_cdd,
+                        minimum_total_cdd,
+                        beta_cdd_maximum_p_value,
+                    )
+                )
+            if fit_cdd_hdd:
+                candidates.extend(
+                    self._get_cdd_hdd_candidate_models(
+                        minimum_non_zero_cdd,
+                        minimum_non_zero_hdd,
+                        minimum_total_cdd,
+                        minimum_total_hdd,
+                        beta_cdd_maximum_p_value,
+                        beta_hdd_maximum_p_value,
+                    )
+                )
+        return candidates
+
+    def _get_intercept_only_candidate_model(self):
+        model_type = "intercept_only"
+        formula = "meter_value ~ 1"
+
+        # CalTrack 3.3.1.3
+        model_params = {"intercept": self._statistics["wy"] / self._statistics["w"]}
+
+        # CalTrack 3.4.3.2
+        model_warnings = get_parameter_negative_warning(
+            model_type, model_params, "intercept"
+        )
+        return CalTRACKUsagePerDayCandidateModel(
+            model_type=model_type,
+            formula=formula,
+            status="DISQUALIFIED" if len(model_warnings) > 0 else "QUALIFIED",
+            warnings=model_warnings,
+            model_params=model_params,
+            r_squared_adj=0,
+        )
+
+    def _get_balance_points(self, degree_day_type):
+        if degree_day_type == "cdd":
+            return self.cooling_balance_points
+        return self.heating_balance_points
+
+    def _degree_day_warnings(
+        self, model_type, degree_day_type, i, minimum_non_zero, minimum_total
+    ):
+        balance_point = self._get_balance_points(degree_day_type)[i]
+        warnings = []
+        warnings.extend(
+            _total_degree_day_too_low_warning(
+                model_type,
+                balance_point,
+                degree_day_type,
+                self._statistics["%s_w" % degree_day_type][i],
+                minimum_total,
+            )
+        )
+        warnings.extend(
+            _too_few_non_zero_degree_day_warning(
+                model_type,
+                balance_point,
+                degree_day_type,
+                int(self._statistics["%s_n_non_zero" % degree_day_type][i]),
+                minimum_non_zero,
+            )
+        )
+        return warnings
+
+    def _get_single_degree_day_candidate_models(
+        self, degree_day_type, minimum_non_zero, minimum_total, beta_maximum_p_value
+    ):
+        model_type = "%s_only" % degree_day_type
+        beta = "beta_%s" % degree_day_type
+        balance_point_param = (
+            "cooling_balance_point"
+            if degree_day_type == "cdd"
+            else "heating_balance_point"
+        )
+        balance_points = self._get_balance_points(degree_day_type)
+        stats = self._statistics
+
+        n_candidates = len(balance_points)
+        xtwx = np.empty((n_candidates, 2, 2))
+        xtwx[:, 0, 0] = stats["w"]
+        xtwx[:, 0, 1] = xtwx[:, 1, 0] = stats["%s_w" % degree_day_type]
+        xtwx[:, 1, 1] = stats["%s_ww" % degree_day_type]
+        xtwy = np.empty((n_candidates, 2))
+        xtwy[:, 0] = stats["wy"]
+        xtwy[:, 1] = stats["%s_wy" % degree_day_type]
+        params, r_squared_adj, p_values = _solve_weighted_least_squares(
+            xtwx, xtwy, stats["w"], stats["wy"], stats["wyy"], stats["n"]
+        )
+
+        candidates = []
+        for i, balance_point in enumerate(balance_points):
+            column = "%s_%s" % (degree_day_type, balance_point)
+            formula = "meter_value ~ %s" % column
+
+            degree_day_warnings = self._degree_day_warnings(
+                model_type, degree_day_type, i, minimum_non_zero, minimum_total
+            )
+            if len(degree_day_warnings) > 0:
+                candidates.append(
+                    CalTRACKUsagePerDayCandidateModel(
+                        model_type=model_type,
+                        formula=formula,
+                        status="NOT ATTEMPTED",
+                        warnings=degree_day_warnings,
+                    )
+                )
+                continue
+
+            # CalTrack 3.3.1.3
+            model_params = {
+                "intercept": params[i, 0],
+                beta: params[i, 1],
+                balance_point_param: balance_point,
+            }
+
+            # CalTrack 3.4.3.2
+            model_warnings = []
+            for parameter in ["intercept", beta]:
+                model_warnings.extend(
+                    get_parameter_negative_warning(model_type, model_params, parameter)
+                )
+            model_warnings.extend(
+                get_parameter_p_value_too_high_warning(
+                    model_type,
+                    model_params,
+                    beta,
+                    p_values[i, 1],
+                    beta_maximum_p_value,
+                )
+            )
+
+            candidates.append(
+                CalTRACKUsagePerDayCandidateModel(
+                    model_type=model_type,
+                    formula=formula,
+                    status="DISQUALIFIED" if len(model_warnings) > 0 else "QUALIFIED",
+                    warnings=model_warnings,
+                    model_params=model_params,
+                    r_squared_adj=r_squared_adj[i],
+                )
+            )
+        return candidates
+
+    def _get_cdd_hdd_candidate_models(
+        self,
+        minimum_non_zero_cdd,
+        minimum_non_zero_hdd,
+        minimum_total_cdd,
+        minimum_total_hdd,
+        beta_cdd_maximum_p_value,
+        beta_hdd_maximum_p_value,
+    ):
+        model_type = "cdd_hdd"
+        stats = self._statistics
+
+        n_cdd = len(self.cooling_balance_points)
+        n_hdd = len(self.heating_balance_points)
+        xtwx = np.empty((n_cdd, n_hdd, 3, 3))
+        xtwx[..., 0, 0] = stats["w"]
+        xtwx[..., 0, 1] = xtwx[..., 1, 0] = stats["cdd_w"][:, np.newaxis]
+        xtwx[..., 0, 2] = xtwx[..., 2, 0] = stats["hdd_w"][np.newaxis, :]
+        xtwx[..., 1, 1] = stats["cdd_ww"][:, np.newaxis]
+        xtwx[..., 2, 2] = stats["hdd_ww"][np.newaxis, :]
+        xtwx[..., 1, 2] = xtwx[..., 2, 1] = stats["cdd_hdd_w"]
+        xtwy = np.empty((n_cdd, n_hdd, 3))
+        xtwy[..., 0] = stats["wy"]
+        xtwy[..., 1] = stats["cdd_wy"][:, np.newaxis]
+        xtwy[..., 2] = stats["hdd_wy"][np.newaxis, :]
+        params, r_squared_adj, p_values = _solve_weighted_least_squares(
+            xtwx, xtwy, stats["w"], stats["wy"], stats["wyy"], stats["n"]
+        )
+
+        # CalTrack 3.2.2.1
+        candidates = []
+        for i, cooling_balance_point in enumerate(self.cooling_balance_points):
+            for j, heating_balance_point in enumerate(self.heating_balance_points):
+                if heating_balance_point > cooling_balance_point:
+                    continue
+                formula = "meter_value ~ cdd_%s + hdd_%s" % (
+                    cooling_balance_point,
+                    heating_balance_point,
+                )
+
+                degree_day_warnings = self._degree_day_warnings(
+                    model_type, "cdd", i, minimum_non_zero_cdd, minimum_total_cdd
+                ) + self._degree_day_warnings(
+                    model_type, "hdd", j, minimum_non_zero_hdd, minimum_total_hdd
+                )
+                if len(degree_day_warnings) > 0:
+                    candidates.append(
+                        CalTRACKUsagePerDayCandidateModel(
+                            model_type,
+                            formula,
+                            "NOT ATTEMPTED",
+                            warnings=degree_day_warnings,
+                        )
+                    )
+                    continue
+
+                # CalTrack 3.3.1.3
+                model_params = {
+                    "intercept": params[i, j, 0],
+                    "beta_cdd": params[i, j, 1],
+                    "beta_hdd": params[i, j, 2],
+                    "cooling_balance_point": cooling_balance_point,
+                    "heating_balance_point": heating_balance_point,
+                }
+
+                # CalTrack 3.4.3.2
+                model_warnings = []
+                for parameter in ["intercept", "beta_cdd", "beta_hdd"]:
+                    model_warnings.extend(
+                        get_parameter_negative_warning(
+                            model_type, model_params, parameter
+                        )
+                    )
+                # Both p-value warnings are reported under the last parameter
+                # name, as in get_single_cdd_hdd_candidate_model.
+                model_warnings.extend(
+                    get_parameter_p_value_too_high_warning(
+                        model_type,
+                        model_params,
+                        parameter,
+                        p_values[i, j, 1],
+                        beta_cdd_maximum_p_value,
+                    )
+                )
+                model_warnings.extend(
+                    get_parameter_p_value_too_high_warning(
+                        model_type,
+                        model_params,
+                        parameter,
+                        p_values[i, j, 2],
+                        beta_hdd_maximum_p_value,
+                    )
+                )
+
+                candidates.append(
+                    CalTRACKUsagePerDayCandidateModel(
+                        model_type=model_type,
+                        formula=formula,
+                        status="DISQUALIFIED"
+                        if len(model_warnings) > 0
+                        else "QUALIFIED",
+                        warnings=model_warnings,
+                        model_params=model_params,
+                        r_squared_adj=r_squared_adj[i, j],
+                    )
+                )
+        return candidates
+
+    def fit(
+        self,
+        fit_cdd=True,
+        use_billing_presets=False,
+        minimum_non_zero_cdd=10,
+        minimum_non_zero_hdd=10,
+        minimum_total_cdd=20,
+        minimum_total_hdd=20,
+        beta_cdd_maximum_p_value=1,
+        beta_hdd_maximum_p_value=1,
+        fit_intercept_only=True,
+        fit_cdd_only=True,
+        fit_hdd_only=True,
+        fit_cdd_hdd=True,
+    ):
+        """Select the best candidate model given the periods currently in the
+        fit state.
+
+        Takes the same settings as
+        :any:`eemeter.fit_caltrack_usage_per_day_model`, except for
+        ``weights_col``, which is a property of the fit state.
+
+        Returns
+        -------
+        model_results : :any:`eemeter.CalTRACKUsagePerDayModelResults`
+            Results of running CalTRACK daily method, without model metrics.
+        """
+        if use_billing_presets:
+            # CalTrack 3.2.2.2.1
+            minimum_non_zero_cdd = 0
+            minimum_non_zero_hdd = 0
+            # CalTrack 3.2.2.2.2
+            minimum_total_cdd = 20
+            minimum_total_hdd = 20
+            # CalTrack 3.4.2
+            if self.weights_col is None:
+                raise ValueError(
+                    "If using billing presets, the weights_col argument must be specified."
+                )
+            interval = "billing"
+        else:
+            interval = "daily"
+
+        if self.n_periods == 0:
+            return CalTRACKUsagePerDayModelResults(
+                status="NO DATA",
+                method_name="caltrack_usage_per_day",
+                warnings=[
+                    EEMeterWarning(
+                        qualified_name="eemeter.caltrack_usage_per_day.no_data",
+                        description=("No data available. Cannot fit model."),
+                        data={},
+                    )
+                ],
+            )
+
+        candidates = self.get_candidate_models(
+            fit_cdd=fit_cdd,
+            minimum_non_zero_cdd=minimum_non_zero_cdd,
+            minimum_non_zero_hdd=minimum_non_zero_hdd,
+            minimum_total_cdd=minimum_total_cdd,
+            minimum_total_hdd=minimum_total_hdd,
+            beta_cdd_maximum_p_value=beta_cdd_maximum_p_value,
+            beta_hdd_maximum_p_value=beta_hdd_maximum_p_value,
+            fit_intercept_only=fit_intercept_only,
+            fit_cdd_only=fit_cdd_only,
+            fit_hdd_only=fit_hdd_only,
+            fit_cdd_hdd=fit_cdd_hdd,
+        )
+
+        best_candidate, warnings = select_best_candidate(candidates)
+
+        if best_candidate is None:
+            status = "NO MODEL"
+            r_squared_adj = None
+        else:
+            status = "SUCCESS"
+            r_squared_adj = best_candidate.r_squared_adj
+
+        return CalTRACKUsagePerDayModelResults(
+            status=status,
+            method_name="caltrack_usage_per_day",
+            interval=interval,
+            model=best_candidate,
+            candidates=candidates,
+            r_squared_adj=r_squared_adj,
+            warnings=warnings,
+            settings={
+                "fit_cdd": fit_cdd,
+                "minimum_non_zero_cdd": minimum_non_zero_cdd,
+                "minimum_non_zero_hdd": minimum_non_zero_hdd,
+                "minimum_total_cdd": minimum_total_cdd,
+                "minimum_total_hdd": minimum_total_hdd,
+                "beta_cdd_maximum_p_value": beta_cdd_maximum_p_value,
+                "beta_hdd_maximum_p_value": beta_hdd_maximum_p_value,
+            },
+        )
+
+    def json(self):
+        """Return a JSON-serializable representation of this fit state.
+
+        The output of this function can be converted to a serialized string
+        with :any:`json.dumps`.
+        """
+
+        def _to_json(value):
+            return value.tolist() if isinstance(value, np.ndarray) else value
+
+        return {
+            "cooling_balance_points": self.cooling_balance_points,
+            "heating_balance_points": self.heating_balance_points,
+            "weights_col": self.weights_col,
+            "periods": [ts.isoformat() for ts in self.periods],
+            "statistics": {
+                key: _to_json(value) for key, value in self._statistics.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """Loads a JSON-serializable representation into the fit state.
+
+        The input of this function is a dict which can be the result
+        of :any:`json.loads`.
+        """
+        c = cls(
+            data.get("cooling_balance_points"),
+            data.get("heating_balance_points"),
+            weights_col=data.get("weights_col"),
+        )
+        c.periods = pd.DatetimeIndex(
+            pd.to_datetime(data.get("periods"), utc=True)
+        ).sort_values()
+        for key, value in data.get("statistics").items():
+            default = c._statistics[key]
+            if isinstance(default, np.ndarray):
+                value = np.asarray(value, dtype=default.dtype).reshape(default.shape)
+            c._statistics[key] = value
+        return c
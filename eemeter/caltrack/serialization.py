@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from .hourly import CalTRACKHourlyModel, CalTRACKHourlyModelResults
+from .usage_per_day import CalTRACKUsagePerDayModelResults
+from ..profiling import profiled
+from ..segmentation import CalTRACKSegmentModel
+
+
+__all__ = ("model_results_to_npz", "model_results_from_npz")
+
+
+_NPZ_FORMAT_VERSION = 1
+
+# kinds of model parameter values, stored alongside the float64 values
+_FLOAT, _INT, _BOOL, _NONE = 0, 1, 2, 3
+
+_HOURLY_MODEL_FRAMES = (
+    "occupancy_lookup",
+    "occupied_temperature_bins",
+    "unoccupied_temperature_bins",
+)
+
+
+def _param_kind(value):
+    if value is None:
+        return _NONE
+    if isinstance(value, (bool, np.bool_)):
+        return _BOOL
+    if isinstance(value, (int, np.integer)):
+        return _INT
+    if isinstance(value, (float, np.floating)):
+        return _FLOAT
+    return None
+
+
+class _ModelParamsPacker(object):
+    # Collects model_params dicts into flat arrays. Each dict becomes a slot,
+    # a run of (name index, kind, value) entries delimited by offsets, so that
+    # key order, ints, bools and Nones survive the round trip.
+
+    def __init__(self):
+        self.names = []
+        self._name_indices = {}
+        self.offsets = [0]
+        self.name_indices = []
+        self.kinds = []
+        self.values = []
+
+    def pack(self, model_params):
+        if model_params is None:
+            return None
+        kinds = [_param_kind(value) for value in model_params.values()]
+        if any(kind is None for kind in kinds):
+            return model_params  # left in the header as is
+        for (name, value), kind in zip(model_params.items(), kinds):
+            if name not in self._name_indices:
+                self._name_indices[name] = len(self.names)
+                self.names.append(name)
+            self.name_indices.append(self._name_indices[name])
+            self.kinds.append(kind)
+            self.values.append(np.nan if kind == _NONE else float(value))
+        self.offsets.append(len(self.values))
+        return len(self.offsets) - 2
+
+    def arrays(self):
+        return {
+            "param_names": np.array(self.names, dtype=np.str_),
+            "param_offsets": np.array(self.offsets, dtype=np.int64),
+            "param_name_indices": np.array(self.name_indices, dtype=np.int32),
+            "param_kinds": np.array(self.kinds, dtype=np.int8),
+            "param_values": np.array(self.values, dtype=np.float64),
+        }
+
+
+def _unpack_model_params(arrays):
+    # Return a function from a header model_params entry to a dict.
+    names = arrays["param_names"].tolist()
+    offsets = arrays["param_offsets"].tolist()
+    name_indices = arrays["param_name_indices"].tolist()
+    kinds = arrays["param_kinds"].tolist()
+    values = arrays["param_values"].tolist()
+    converters = {
+        _FLOAT: lambda value: value,
+        _INT: int,
+        _BOOL: bool,
+        _NONE: lambda value: None,
+    }
+
+    def _unpack(slot):
+        if not isinstance(slot, int):
+            return slot  # None, or a dict stored in the header
+        start, end = offsets[slot], offsets[slot + 1]
+        return {
+            names[name_indices[i]]: converters[kinds[i]](values[i])
+            for i in range(start, end)
+        }
+
+    return _unpack
+
+
+def _frame_arrays(prefix, df):
+    arrays = {
+        prefix + "_values": np.asarray(df.values),
+        prefix + "_index": np.asarray(df.index),
+        prefix + "_columns": np.array([str(c) for c in df.columns], dtype=np.str_),
+    }
+    header = {
+        "index_name": df.index.name,
+        "index_categorical": isinstance(df.index, pd.CategoricalIndex),
+        "columns_name": df.columns.name,
+    }
+    return arrays, header
+
+
+def _frame_from_arrays(prefix, arrays, header):
+    index = pd.Index(arrays[prefix + "_index"], name=header["index_name"])
+    if header["index_categorical"]:
+        index = index.astype("category")
+    columns = pd.Index(
+        arrays[prefix + "_columns"].tolist(), dtype=object, name=header["columns_name"]
+    )
+    return pd.DataFrame(arrays[prefix + "_values"], index=index, columns=columns)
+
+
+@profiled
+def model_results_to_npz(model_results, file, with_candidates=False):
+    """Write model results to a compact binary file.
+
+    The file is an uncompressed NumPy ``.npz`` archive. Model parameters of
+    all candidates or segments are stored in flat float64 arrays, hourly
+    occupancy and temperature bin lookups are stored as boolean arrays and
+    everything else is stored as a small JSON header. Results loaded with
+    :any:`eemeter.model_results_from_npz` serialize with ``json()`` exactly
+    as the original results do.
+
+    Parameters
+    ----------
+    model_results : :any:`eemeter.CalTRACKUsagePerDayModelResults` or :any:`eemeter.CalTRACKHourlyModelResults`
+        The results to write.
+    file : :any:`str` or file-like object
+        Path or open binary file to write to. As with :any:`numpy.savez`,
+        ``.npz`` is appended to paths without it.
+    with_candidates : :any:`bool`, default False
+        If True, also write all candidate models of usage per day results.
+    """
+    packer = _ModelParamsPacker()
+    arrays = {}
+
+    if isinstance(model_results, CalTRACKUsagePerDayModelResults):
+        results_type = "caltrack_usage_per_day"
+        data = model_results.json(with_candidates=with_candidates)
+        candidates = [data["model"]] + (data["candidates"] or [])
+        for candidate in candidates:
+            if candidate is not None:
+                candidate["model_params"] = packer.pack(candidate["model_params"])
+    elif isinstance(model_results, CalTRACKHourlyModelResults):
+        results_type = "caltrack_hourly"
+        model = model_results.model
+        data = model_results.json()
+        if model is not None:
+            model_data = data["model"]
+            # model_lookup is rebuilt from segment_models when loading
+            model_data.pop("model_lookup")
+            for segment_data in model_data["segment_models"]:
+                if segment_data is not None:
+                    segment_data["model_params"] = packer.pack(
+                        segment_data["model_params"]
+                    )
+            for name in _HOURLY_MODEL_FRAMES:
+                frame_arrays, model_data[name] = _frame_arrays(
+                    name, getattr(model, name)
+                )
+                arrays.update(frame_arrays)
+    else:
+        raise ValueError(
+            "Cannot write model results of type {}.".format(type(model_results))
+        )
+
+    header = {
+        "format_version": _NPZ_FORMAT_VERSION,
+        "results_type": results_type,
+        "results": data,
+    }
+    arrays["header"] = np.frombuffer(json.dumps(header).encode("utf-8"), np.uint8)
+    arrays.update(packer.arrays())
+    np.savez(file, **arrays)
+
+
+@profiled
+def model_results_from_npz(file):
+    """Load model results written by :any:`eemeter.model_results_to_npz`.
+
+    Parameters
+    ----------
+    file : :any:`str` or file-like object
+        Path or open binary file to read from.
+
+    Returns
+    -------
+    model_results : :any:`eemeter.CalTRACKUsagePerDayModelResults` or :any:`eemeter.CalTRACKHourlyModelResults`
+        The loaded results. As with results loaded with ``from_json()``,
+        fitted statsmodels objects are not included.
+    """
+    with np.load(file, allow_pickle=False) as npz:
+        arrays = {key: npz[key] for key in npz.files}
+
+    header = json.loads(arrays["header"].tobytes().decode("utf-8"))
+    if header.get("format_version") != _NPZ_FORMAT_VERSION:
+        raise ValueError(
+            "Unsupported model results format version: {}.".format(
+                header.get("format_version")
+            )
+        )
+    unpack = _unpack_model_params(arrays)
+    data = header["results"]
+
+    if header["results_type"] == "caltrack_usage_per_day":
+        for candidate in [data["model"]] + (data["candidates"] or []):
+            if candidate is not None:
+                candidate["model_params"] = unpack(candidate["model_params"])
+        return CalTRACKUsagePerDayModelResults.from_json(data)
+
+    elif header["results_type"] == "caltrack_hourly":
+        model_data = data.pop("model")
+        model_results = CalTRACKHourlyModelResults.from_json(data)
+        if model_data is not None:
+            segment_models = []
+            for segment_data in model_data["segment_models"]:
+                segment_data["model_params"] = unpack(segment_data["model_params"])
+                segment_models.append(CalTRACKSegmentModel.from_json(segment_data))
+            model_results.model = CalTRACKHourlyModel(
+                segment_models,
+                *[
+                    _frame_from_arrays(name, arrays, model_data[name])
+                    for name in _HOURLY_MODEL_FRAMES
+                ],
+                dtype=model_data.get("dtype")
+            )
+        return model_results
+
+    raise ValueError("Unknown model results type: {}.".format(header["results_type"]))
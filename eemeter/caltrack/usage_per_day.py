@@ -18,18 +18,21 @@
 
 """
 from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
 import traceback
 
 import numpy as np
 import pandas as pd
 import pytz
-import statsmodels.formula.api as smf
 
 from ..exceptions import MissingModelParameterError, UnrecognizedModelTypeError
 from ..features import compute_temperature_features
 from ..metrics import ModelMetrics
+from ..profiling import profiled
 from ..transform import day_counts, overwrite_partial_rows_with_nan
 from ..warnings import EEMeterWarning
+from .design_matrices import CalTRACKUsagePerDayDesignMatrix
 
 
 __all__ = (
@@ -39,6 +42,7 @@ __all__ = (
     "ModelPrediction",
     "fit_caltrack_usage_per_day_model",
     "caltrack_sufficiency_criteria",
+    "caltrack_sufficiency_criteria_batch",
     "caltrack_usage_per_day_predict",
     "plot_caltrack_candidate",
     "get_too_few_non_zero_degree_day_warning",
@@ -158,6 +162,7 @@ class CalTRACKUsagePerDayModelResults(object):
             )
         )
 
+    @profiled
     def json(self, with_candidates=False):
         """Return a JSON-serializable representation of this result.
 
@@ -205,8 +210,11 @@ class CalTRACKUsagePerDayModelResults(object):
             interval=data.get("interval"),
             model=model,
             r_squared_adj=data.get("r_squared_adj"),
-            candidates=data.get("candidates"),
-            warnings=data.get("warnings"),
+            candidates=[
+                CalTRACKUsagePerDayCandidateModel.from_json(candidate)
+                for candidate in data.get("candidates") or []
+            ],
+            warnings=[EEMeterWarning.from_json(w) for w in data.get("warnings") or []],
             metadata=data.get("metadata"),
             settings=data.get("settings"),
         )
@@ -221,6 +229,7 @@ class CalTRACKUsagePerDayModelResults(object):
             c.totals_metrics = ModelMetrics.from_json(d)
         return c
 
+    @profiled
     def predict(
         self,
         prediction_index,
@@ -394,7 +403,7 @@ class CalTRACKUsagePerDayCandidateModel(object):
             data.get("status"),
             model_params=data.get("model_params"),
             r_squared_adj=data.get("r_squared_adj"),
-            warnings=data.get("warnings"),
+            warnings=[EEMeterWarning.from_json(w) for w in data.get("warnings") or []],
         )
 
         return c
@@ -530,7 +539,7 @@ def _caltrack_predict_design_matrix(
         Model type (e.g., ``'cdd_hdd'``).
     model_params : :any:`dict`
         Parameters as stored in :any:`eemeter.CalTRACKUsagePerDayCandidateModel.model_params`.
-    data : :any:`pandas.DataFrame`
+    data : :any:`pandas.DataFrame` or :any:`eemeter.CalTRACKUsagePerDayDesignMatrix`
         Data over which to predict. Assumed to be like the format of the data used
         for fitting, although it need only have the columns. If not giving data
         with a `pandas.DatetimeIndex` it must have the column `n_days`,
@@ -553,14 +562,47 @@ def _caltrack_predict_design_matrix(
         Returns results as series unless ``disaggregated=True``.
     """
 
-    zeros = pd.Series(0, index=data.index)
-    ones = zeros + 1
+    base_load, heating_load, cooling_load = _caltrack_predict_design_matrix_components(
+        model_type,
+        model_params,
+        data,
+        input_averages=input_averages,
+        output_averages=output_averages,
+    )
+
+    if disaggregated:
+        return pd.DataFrame(
+            {
+                "base_load": base_load,
+                "heating_load": heating_load,
+                "cooling_load": cooling_load,
+            },
+            index=data.index,
+        )
+    else:
+        return pd.Series(base_load + heating_load + cooling_load, index=data.index)
+
 
+def _caltrack_predict_design_matrix_components(
+    model_type, model_params, data, input_averages=False, output_averages=False
+):
+    """Compute base, heating and cooling load components for a design matrix.
+
+    Works on the few columns needed by the model as :any:`numpy.ndarray` and
+    computes the row NaN mask a single time for all three components. See
+    :any:`eemeter.caltrack.usage_per_day._caltrack_predict_design_matrix` for
+    a description of the parameters.
+
+    Returns
+    -------
+    base_load, heating_load, cooling_load : :any:`tuple` of :any:`numpy.ndarray`
+        Load components aligned with the rows of ``data``.
+    """
     if isinstance(data.index, pd.DatetimeIndex):
-        days_per_period = day_counts(data.index)
+        days_per_period = day_counts(data.index).to_numpy()
     else:
         try:
-            days_per_period = data["n_days"]
+            days_per_period = data["n_days"].to_numpy(dtype=float)
         except KeyError:
             raise ValueError("Data needs DatetimeIndex or an n_days column.")
 
@@ -570,7 +612,7 @@ def _caltrack_predict_design_matrix(
         if output_averages == False:
             base_load = intercept * days_per_period
         else:
-            base_load = intercept * ones
+            base_load = np.full(data.shape[0], intercept, dtype=float)
     elif model_type is None:
         raise ValueError("Model not valid for prediction: model_type=None")
     else:
@@ -578,65 +620,50 @@ def _caltrack_predict_design_matrix(
             "invalid caltrack model type: {}".format(model_type)
         )
 
+    def _degree_day_load(column_name, beta):
+        degree_days = data[column_name].to_numpy(dtype=float)
+        if input_averages == True and output_averages == False:
+            return degree_days * beta * days_per_period
+        elif input_averages == False and output_averages == True:
+            return degree_days * beta / days_per_period
+        else:
+            return degree_days * beta
+
     if model_type in ["hdd_only", "cdd_hdd"]:
         beta_hdd = _get_parameter_or_raise(model_type, model_params, "beta_hdd")
         heating_balance_point = _get_parameter_or_raise(
             model_type, model_params, "heating_balance_point"
         )
-        hdd_column_name = "hdd_%s" % heating_balance_point
-        hdd = data[hdd_column_name]
-        if input_averages == True and output_averages == False:
-            heating_load = hdd * beta_hdd * days_per_period
-        elif input_averages == True and output_averages == True:
-            heating_load = hdd * beta_hdd
-        elif input_averages == False and output_averages == False:
-            heating_load = hdd * beta_hdd
-        else:
-            heating_load = hdd * beta_hdd / days_per_period
+        heating_load = _degree_day_load("hdd_%s" % heating_balance_point, beta_hdd)
     else:
-        heating_load = zeros
+        heating_load = np.zeros(data.shape[0])
 
     if model_type in ["cdd_only", "cdd_hdd"]:
         beta_cdd = _get_parameter_or_raise(model_type, model_params, "beta_cdd")
         cooling_balance_point = _get_parameter_or_raise(
             model_type, model_params, "cooling_balance_point"
         )
-        cdd_column_name = "cdd_%s" % cooling_balance_point
-        cdd = data[cdd_column_name]
-        if input_averages == True and output_averages == False:
-            cooling_load = cdd * beta_cdd * days_per_period
-        elif input_averages == True and output_averages == True:
-            cooling_load = cdd * beta_cdd
-        elif input_averages == False and output_averages == False:
-            cooling_load = cdd * beta_cdd
-        else:
-            cooling_load = cdd * beta_cdd / days_per_period
+        cooling_load = _degree_day_load("cdd_%s" % cooling_balance_point, beta_cdd)
     else:
-        cooling_load = zeros
+        cooling_load = np.zeros(data.shape[0])
 
     # If any of the rows of input data contained NaNs, restore the NaNs
     # Note: If data contains ANY NaNs at all, this declares the entire row a NaN.
     # TODO(philngo): Consider making this more nuanced.
-    def _restore_nans(load):
-        load = load[data.sum(axis=1, skipna=False).notnull()].reindex(data.index)
-        return load
-
-    base_load = _restore_nans(base_load)
-    heating_load = _restore_nans(heating_load)
-    cooling_load = _restore_nans(cooling_load)
-
-    if disaggregated:
-        return pd.DataFrame(
-            {
-                "base_load": base_load,
-                "heating_load": heating_load,
-                "cooling_load": cooling_load,
-            }
-        )
+    if isinstance(data, CalTRACKUsagePerDayDesignMatrix):
+        # rows with any missing value are already entirely NaN
+        nan_rows = data["meter_value"].isnull().to_numpy()
     else:
-        return base_load + heating_load + cooling_load
+        nan_rows = data.isnull().to_numpy().any(axis=1)
+
+    return (
+        np.where(nan_rows, np.nan, base_load),
+        np.where(nan_rows, np.nan, heating_load),
+        np.where(nan_rows, np.nan, cooling_load),
+    )
 
 
+@profiled
 def caltrack_usage_per_day_predict(
     model_type,
     model_params,
@@ -751,23 +778,21 @@ def caltrack_usage_per_day_predict(
             warnings=predict_warnings,
         )
 
-    results = _caltrack_predict_design_matrix(
+    disaggregated = _caltrack_predict_design_matrix(
         model_type,
         model_params,
         design_matrix,
+        disaggregated=True,
         input_averages=False,
         output_averages=False,
+    )
+    results = (
+        disaggregated.base_load
+        + disaggregated.heating_load
+        + disaggregated.cooling_load
     ).to_frame("predicted_usage")
 
     if with_disaggregated:
-        disaggregated = _caltrack_predict_design_matrix(
-            model_type,
-            model_params,
-            design_matrix,
-            disaggregated=True,
-            input_averages=False,
-            output_averages=False,
-        )
         results = results.join(disaggregated)
 
     if with_design_matrix:
@@ -802,8 +827,18 @@ def get_too_few_non_zero_degree_day_warning(
     warnings : :any:`list` of :any:`eemeter.EEMeterWarning`
         Empty list or list of single warning.
     """
-    warnings = []
     n_non_zero = int((degree_days > 0).sum())
+    return _too_few_non_zero_degree_day_warning(
+        model_type, balance_point, degree_day_type, n_non_zero, minimum_non_zero
+    )
+
+
+def _too_few_non_zero_degree_day_warning(
+    model_type, balance_point, degree_day_type, n_non_zero, minimum_non_zero
+):
+    # Same as get_too_few_non_zero_degree_day_warning, but takes an already
+    # computed count of non-zero degree day values.
+    warnings = []
     if n_non_zero < minimum_non_zero:
         warnings.append(
             EEMeterWarning(
@@ -865,9 +900,18 @@ def get_total_degree_day_too_low_warning(
     warnings : :any:`list` of :any:`eemeter.EEMeterWarning`
         Empty list or list of single warning.
     """
+    total_degree_days = (avg_degree_days * period_days).sum()
+    return _total_degree_day_too_low_warning(
+        model_type, balance_point, degree_day_type, total_degree_days, minimum_total
+    )
 
+
+def _total_degree_day_too_low_warning(
+    model_type, balance_point, degree_day_type, total_degree_days, minimum_total
+):
+    # Same as get_total_degree_day_too_low_warning, but takes an already
+    # computed total of degree day values.
     warnings = []
-    total_degree_days = (avg_degree_days * period_days).sum()
     if total_degree_days < minimum_total:
         warnings.append(
             EEMeterWarning(
@@ -898,6 +942,63 @@ def get_total_degree_day_too_low_warning(
     return warnings
 
 
+def _get_degree_day_warnings(
+    data,
+    model_type,
+    degree_day_type,
+    balance_points,
+    minimum_non_zero,
+    minimum_total,
+    weights_col,
+):
+    # Compute the total and non-zero degree day warnings for every balance
+    # point at once instead of one column at a time. Returns a dict mapping
+    # balance point to the list of warnings that would rule out the fit.
+    columns = ["%s_%s" % (degree_day_type, bp) for bp in balance_points]
+    degree_days = data[columns]
+    if weights_col is None:
+        totals = degree_days.sum()
+    else:
+        totals = degree_days.multiply(data[weights_col], axis=0).sum()
+    non_zero_counts = (degree_days > 0).sum()
+
+    degree_day_warnings = {}
+    for balance_point, column in zip(balance_points, columns):
+        degree_day_warnings[balance_point] = _total_degree_day_too_low_warning(
+            model_type, balance_point, degree_day_type, totals[column], minimum_total
+        ) + _too_few_non_zero_degree_day_warning(
+            model_type,
+            balance_point,
+            degree_day_type,
+            int(non_zero_counts[column]),
+            minimum_non_zero,
+        )
+    return degree_day_warnings
+
+
+def _candidate_model_data(data, heating_balance_points=(), cooling_balance_points=()):
+    # The data handed to statsmodels for a single candidate fit. A lazy design
+    # matrix only materializes the columns used in the candidate formula.
+    if isinstance(data, CalTRACKUsagePerDayDesignMatrix):
+        columns = (
+            ["meter_value"]
+            + ["cdd_%s" % bp for bp in cooling_balance_points]
+            + ["hdd_%s" % bp for bp in heating_balance_points]
+        )
+        return pd.DataFrame({column: data[column] for column in columns})
+    return data
+
+
+def _map_candidate_fits(fit, args_list, max_workers):
+    # Apply fit to each tuple of arguments, in order. Candidates which are
+    # not attempted return immediately, so only the remaining fits do real
+    # work on the thread pool when max_workers > 1.
+    if max_workers is None or max_workers <= 1 or len(args_list) <= 1:
+        return [fit(*args) for args in args_list]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda args: fit(*args), args_list))
+
+
 def get_parameter_negative_warning(model_type, model_params, parameter):
     """Return an empty list or a single warning wrapped in a list indicating
     whether model parameter is negative.
@@ -1015,6 +1116,7 @@ def get_fit_failed_candidate_model(model_type, formula):
     )
 
 
+@profiled
 def get_intercept_only_candidate_models(data, weights_col):
     """Return a list of a single candidate intercept-only model.
 
@@ -1041,8 +1143,12 @@ def get_intercept_only_candidate_models(data, weights_col):
     else:
         weights = data[weights_col]
 
+    import statsmodels.formula.api as smf
+
     try:
-        model = smf.wls(formula=formula, data=data, weights=weights)
+        model = smf.wls(
+            formula=formula, data=_candidate_model_data(data), weights=weights
+        )
     except Exception as e:
         return [get_fit_failed_candidate_model(model_type, formula)]
 
@@ -1115,7 +1221,6 @@ def get_single_cdd_only_candidate_model(
     """
     model_type = "cdd_only"
     cdd_column = "cdd_%s" % balance_point
-    formula = "meter_value ~ %s" % cdd_column
 
     if weights_col is None:
         weights = 1
@@ -1141,6 +1246,25 @@ def get_single_cdd_only_candidate_model(
         )
     )
 
+    return _fit_single_cdd_only_candidate_model(
+        data, degree_day_warnings, beta_cdd_maximum_p_value, weights_col, balance_point
+    )
+
+
+def _fit_single_cdd_only_candidate_model(
+    data, degree_day_warnings, beta_cdd_maximum_p_value, weights_col, balance_point
+):
+    # Fit a single cdd-only candidate model unless degree day warnings,
+    # computed ahead of time by the caller, rule it out.
+    model_type = "cdd_only"
+    cdd_column = "cdd_%s" % balance_point
+    formula = "meter_value ~ %s" % cdd_column
+
+    if weights_col is None:
+        weights = 1
+    else:
+        weights = data[weights_col]
+
     if len(degree_day_warnings) > 0:
         return CalTRACKUsagePerDayCandidateModel(
             model_type=model_type,
@@ -1149,8 +1273,14 @@ def get_single_cdd_only_candidate_model(
             warnings=degree_day_warnings,
         )
 
+    import statsmodels.formula.api as smf
+
     try:
-        model = smf.wls(formula=formula, data=data, weights=weights)
+        model = smf.wls(
+            formula=formula,
+            data=_candidate_model_data(data, cooling_balance_points=[balance_point]),
+            weights=weights,
+        )
     except Exception as e:
         return get_fit_failed_candidate_model(model_type, formula)
 
@@ -1199,8 +1329,15 @@ def get_single_cdd_only_candidate_model(
     )
 
 
+@profiled
 def get_cdd_only_candidate_models(
-    data, minimum_non_zero_cdd, minimum_total_cdd, beta_cdd_maximum_p_value, weights_col
+    data,
+    minimum_non_zero_cdd,
+    minimum_total_cdd,
+    beta_cdd_maximum_p_value,
+    weights_col,
+    max_workers=None,
+    balance_points=None,
 ):
     """Return a list of all possible candidate cdd-only models.
 
@@ -1221,24 +1358,43 @@ def get_cdd_only_candidate_models(
         The maximum allowable p-value of the beta cdd parameter.
     weights_col : :any:`str` or None
         The name of the column (if any) in ``data`` to use as weights.
+    max_workers : :any:`int`, optional
+        If greater than 1, fit candidate models on a thread pool of this
+        size. Candidates are returned in the same order either way.
+    balance_points : :any:`list` of :any:`int`, optional
+        The cooling balance points to fit. If None, fit every balance point with
+        a ``cdd_<balance_point>`` column in ``data``.
 
     Returns
     -------
     candidate_models : :any:`list` of :any:`CalTRACKUsagePerDayCandidateModel`
         A list of cdd-only candidate models, with any associated warnings.
     """
-    balance_points = [int(col[4:]) for col in data.columns if col.startswith("cdd")]
-    candidate_models = [
-        get_single_cdd_only_candidate_model(
-            data,
-            minimum_non_zero_cdd,
-            minimum_total_cdd,
-            beta_cdd_maximum_p_value,
-            weights_col,
-            balance_point,
-        )
-        for balance_point in balance_points
-    ]
+    if balance_points is None:
+        balance_points = [int(col[4:]) for col in data.columns if col.startswith("cdd")]
+    degree_day_warnings = _get_degree_day_warnings(
+        data,
+        "cdd_only",
+        "cdd",
+        balance_points,
+        minimum_non_zero_cdd,
+        minimum_total_cdd,
+        weights_col,
+    )
+    candidate_models = _map_candidate_fits(
+        _fit_single_cdd_only_candidate_model,
+        [
+            (
+                data,
+                degree_day_warnings[balance_point],
+                beta_cdd_maximum_p_value,
+                weights_col,
+                balance_point,
+            )
+            for balance_point in balance_points
+        ],
+        max_workers,
+    )
     return candidate_models
 
 
@@ -1279,7 +1435,6 @@ def get_single_hdd_only_candidate_model(
     """
     model_type = "hdd_only"
     hdd_column = "hdd_%s" % balance_point
-    formula = "meter_value ~ %s" % hdd_column
 
     if weights_col is None:
         weights = 1
@@ -1305,6 +1460,25 @@ def get_single_hdd_only_candidate_model(
         )
     )
 
+    return _fit_single_hdd_only_candidate_model(
+        data, degree_day_warnings, beta_hdd_maximum_p_value, weights_col, balance_point
+    )
+
+
+def _fit_single_hdd_only_candidate_model(
+    data, degree_day_warnings, beta_hdd_maximum_p_value, weights_col, balance_point
+):
+    # Fit a single hdd-only candidate model unless degree day warnings,
+    # computed ahead of time by the caller, rule it out.
+    model_type = "hdd_only"
+    hdd_column = "hdd_%s" % balance_point
+    formula = "meter_value ~ %s" % hdd_column
+
+    if weights_col is None:
+        weights = 1
+    else:
+        weights = data[weights_col]
+
     if len(degree_day_warnings) > 0:
         return CalTRACKUsagePerDayCandidateModel(
             model_type=model_type,
@@ -1313,8 +1487,14 @@ def get_single_hdd_only_candidate_model(
             warnings=degree_day_warnings,
         )
 
+    import statsmodels.formula.api as smf
+
     try:
-        model = smf.wls(formula=formula, data=data, weights=weights)
+        model = smf.wls(
+            formula=formula,
+            data=_candidate_model_data(data, heating_balance_points=[balance_point]),
+            weights=weights,
+        )
     except Exception as e:
         return get_fit_failed_candidate_model(model_type, formula)
 
@@ -1363,8 +1543,15 @@ def get_single_hdd_only_candidate_model(
     )
 
 
+@profiled
 def get_hdd_only_candidate_models(
-    data, minimum_non_zero_hdd, minimum_total_hdd, beta_hdd_maximum_p_value, weights_col
+    data,
+    minimum_non_zero_hdd,
+    minimum_total_hdd,
+    beta_hdd_maximum_p_value,
+    weights_col,
+    max_workers=None,
+    balance_points=None,
 ):
     """
     Parameters
@@ -1384,6 +1571,12 @@ def get_hdd_only_candidate_models(
         The maximum allowable p-value of the beta hdd parameter.
     weights_col : :any:`str` or None
         The name of the column (if any) in ``data`` to use as weights.
+    max_workers : :any:`int`, optional
+        If greater than 1, fit candidate models on a thread pool of this
+        size. Candidates are returned in the same order either way.
+    balance_points : :any:`list` of :any:`int`, optional
+        The heating balance points to fit. If None, fit every balance point with
+        a ``hdd_<balance_point>`` column in ``data``.
 
     Returns
     -------
@@ -1391,19 +1584,32 @@ def get_hdd_only_candidate_models(
         A list of hdd-only candidate models, with any associated warnings.
     """
 
-    balance_points = [int(col[4:]) for col in data.columns if col.startswith("hdd")]
-
-    candidate_models = [
-        get_single_hdd_only_candidate_model(
-            data,
-            minimum_non_zero_hdd,
-            minimum_total_hdd,
-            beta_hdd_maximum_p_value,
-            weights_col,
-            balance_point,
-        )
-        for balance_point in balance_points
-    ]
+    if balance_points is None:
+        balance_points = [int(col[4:]) for col in data.columns if col.startswith("hdd")]
+
+    degree_day_warnings = _get_degree_day_warnings(
+        data,
+        "hdd_only",
+        "hdd",
+        balance_points,
+        minimum_non_zero_hdd,
+        minimum_total_hdd,
+        weights_col,
+    )
+    candidate_models = _map_candidate_fits(
+        _fit_single_hdd_only_candidate_model,
+        [
+            (
+                data,
+                degree_day_warnings[balance_point],
+                beta_hdd_maximum_p_value,
+                weights_col,
+                balance_point,
+            )
+            for balance_point in balance_points
+        ],
+        max_workers,
+    )
     return candidate_models
 
 
@@ -1457,8 +1663,6 @@ def get_single_cdd_hdd_candidate_model(
     model_type = "cdd_hdd"
     cdd_column = "cdd_%s" % cooling_balance_point
     hdd_column = "hdd_%s" % heating_balance_point
-    formula = "meter_value ~ %s + %s" % (cdd_column, hdd_column)
-    n_days_column = None
 
     if weights_col is None:
         weights = 1
@@ -1507,13 +1711,55 @@ def get_single_cdd_hdd_candidate_model(
         )
     )
 
+    return _fit_single_cdd_hdd_candidate_model(
+        data,
+        degree_day_warnings,
+        beta_cdd_maximum_p_value,
+        beta_hdd_maximum_p_value,
+        weights_col,
+        cooling_balance_point,
+        heating_balance_point,
+    )
+
+
+def _fit_single_cdd_hdd_candidate_model(
+    data,
+    degree_day_warnings,
+    beta_cdd_maximum_p_value,
+    beta_hdd_maximum_p_value,
+    weights_col,
+    cooling_balance_point,
+    heating_balance_point,
+):
+    # Fit a single cdd_hdd candidate model unless degree day warnings,
+    # computed ahead of time by the caller, rule it out.
+    model_type = "cdd_hdd"
+    cdd_column = "cdd_%s" % cooling_balance_point
+    hdd_column = "hdd_%s" % heating_balance_point
+    formula = "meter_value ~ %s + %s" % (cdd_column, hdd_column)
+
+    if weights_col is None:
+        weights = 1
+    else:
+        weights = data[weights_col]
+
     if len(degree_day_warnings) > 0:
         return CalTRACKUsagePerDayCandidateModel(
             model_type, formula, "NOT ATTEMPTED", warnings=degree_day_warnings
         )
 
+    import statsmodels.formula.api as smf
+
     try:
-        model = smf.wls(formula=formula, data=data, weights=weights)
+        model = smf.wls(
+            formula=formula,
+            data=_candidate_model_data(
+                data,
+                heating_balance_points=[heating_balance_point],
+                cooling_balance_points=[cooling_balance_point],
+            ),
+            weights=weights,
+        )
     except Exception as e:
         return get_fit_failed_candidate_model(model_type, formula)
 
@@ -1574,6 +1820,7 @@ def get_single_cdd_hdd_candidate_model(
     )
 
 
+@profiled
 def get_cdd_hdd_candidate_models(
     data,
     minimum_non_zero_cdd,
@@ -1583,6 +1830,8 @@ def get_cdd_hdd_candidate_models(
     beta_cdd_maximum_p_value,
     beta_hdd_maximum_p_value,
     weights_col,
+    max_workers=None,
+    balance_points=None,
 ):
     """Return a list of candidate cdd_hdd models for a particular selection
     of cooling balance point and heating balance point
@@ -1610,6 +1859,14 @@ def get_cdd_hdd_candidate_models(
         The maximum allowable p-value of the beta hdd parameter.
     weights_col : :any:`str` or None
         The name of the column (if any) in ``data`` to use as weights.
+    max_workers : :any:`int`, optional
+        If greater than 1, fit candidate models on a thread pool of this
+        size. Candidates are returned in the same order either way.
+    balance_points : :any:`list` of :any:`tuple`, optional
+        The ``(cooling_balance_point, heating_balance_point)`` pairs to fit.
+        If None, fit every pair of ``cdd_<cooling_balance_point>`` and
+        ``hdd_<heating_balance_point>`` columns in ``data`` for which
+        ``heating_balance_point <= cooling_balance_point``.
 
     Returns
     -------
@@ -1617,34 +1874,64 @@ def get_cdd_hdd_candidate_models(
         A list of cdd_hdd candidate models, with any associated warnings.
     """
 
-    cooling_balance_points = [
-        int(col[4:]) for col in data.columns if col.startswith("cdd")
-    ]
-    heating_balance_points = [
-        int(col[4:]) for col in data.columns if col.startswith("hdd")
-    ]
+    if balance_points is None:
+        cooling_balance_points = [
+            int(col[4:]) for col in data.columns if col.startswith("cdd")
+        ]
+        heating_balance_points = [
+            int(col[4:]) for col in data.columns if col.startswith("hdd")
+        ]
+        # CalTrack 3.2.2.1
+        balance_points = [
+            (cooling_balance_point, heating_balance_point)
+            for cooling_balance_point in cooling_balance_points
+            for heating_balance_point in heating_balance_points
+            if heating_balance_point <= cooling_balance_point
+        ]
+    else:
+        cooling_balance_points = sorted(set(c for c, h in balance_points))
+        heating_balance_points = sorted(set(h for c, h in balance_points))
+
+    cdd_warnings = _get_degree_day_warnings(
+        data,
+        "cdd_hdd",
+        "cdd",
+        cooling_balance_points,
+        minimum_non_zero_cdd,
+        minimum_total_cdd,
+        weights_col,
+    )
+    hdd_warnings = _get_degree_day_warnings(
+        data,
+        "cdd_hdd",
+        "hdd",
+        heating_balance_points,
+        minimum_non_zero_hdd,
+        minimum_total_hdd,
+        weights_col,
+    )
 
-    # CalTrack 3.2.2.1
-    candidate_models = [
-        get_single_cdd_hdd_candidate_model(
-            data,
-            minimum_non_zero_cdd,
-            minimum_non_zero_hdd,
-            minimum_total_cdd,
-            minimum_total_hdd,
-            beta_cdd_maximum_p_value,
-            beta_hdd_maximum_p_value,
-            weights_col,
-            cooling_balance_point,
-            heating_balance_point,
-        )
-        for cooling_balance_point in cooling_balance_points
-        for heating_balance_point in heating_balance_points
-        if heating_balance_point <= cooling_balance_point
-    ]
+    candidate_models = _map_candidate_fits(
+        _fit_single_cdd_hdd_candidate_model,
+        [
+            (
+                data,
+                cdd_warnings[cooling_balance_point]
+                + hdd_warnings[heating_balance_point],
+                beta_cdd_maximum_p_value,
+                beta_hdd_maximum_p_value,
+                weights_col,
+                cooling_balance_point,
+                heating_balance_point,
+            )
+            for cooling_balance_point, heating_balance_point in balance_points
+        ],
+        max_workers,
+    )
     return candidate_models
 
 
+@profiled
 def select_best_candidate(candidate_models):
     """Select and return the best candidate model based on r-squared and
     qualification.
@@ -1691,6 +1978,52 @@ def select_best_candidate(candidate_models):
     return best_candidate, []
 
 
+def _coarse_balance_points(balance_points, step):
+    # Every step-th balance point, always keeping both ends of the grid.
+    coarse = balance_points[::step]
+    if len(balance_points) > 0 and coarse[-1] != balance_points[-1]:
+        coarse.append(balance_points[-1])
+    return coarse
+
+
+def _coarse_to_fine_candidate_models(get_candidate_models, axes, step, is_valid):
+    # Search a grid of balance points (one sorted axis per degree day type)
+    # by fitting a coarse grid first and then every grid point within
+    # ``step - 1`` grid positions of the best qualified coarse candidate.
+    # Returns exactly the evaluated candidates, in exhaustive search order.
+    axes = [sorted(axis) for axis in axes]
+
+    def _fit(keys):
+        keys = [
+            key
+            for key in keys
+            if (is_valid is None or is_valid(key)) and key not in candidates
+        ]
+        if len(keys) > 0:
+            balance_points = [key[0] for key in keys] if len(axes) == 1 else keys
+            candidate_models = get_candidate_models(balance_points=balance_points)
+            candidates.update(zip(keys, candidate_models))
+
+    candidates = {}
+    _fit(list(product(*[_coarse_balance_points(axis, step) for axis in axes])))
+
+    qualified = [
+        (candidate.r_squared_adj, key)
+        for key, candidate in candidates.items()
+        if candidate.status == "QUALIFIED"
+    ]
+    if len(qualified) > 0:
+        _, best_key = max(qualified)
+        neighborhoods = []
+        for axis, balance_point in zip(axes, best_key):
+            i = axis.index(balance_point)
+            neighborhoods.append(axis[max(0, i - step + 1) : i + step])
+        _fit(list(product(*neighborhoods)))
+
+    return [candidates[key] for key in product(*axes) if key in candidates]
+
+
+@profiled
 def fit_caltrack_usage_per_day_model(
     data,
     fit_cdd=True,
@@ -1706,19 +2039,23 @@ def fit_caltrack_usage_per_day_model(
     fit_cdd_only=True,
     fit_hdd_only=True,
     fit_cdd_hdd=True,
+    max_workers=None,
+    balance_point_search="exhaustive",
+    coarse_balance_point_step=3,
 ):
     """CalTRACK daily and billing methods using a usage-per-day modeling
     strategy.
 
     Parameters
     ----------
-    data : :any:`pandas.DataFrame`
+    data : :any:`pandas.DataFrame` or :any:`eemeter.CalTRACKUsagePerDayDesignMatrix`
         A DataFrame containing at least the column ``meter_value`` and 1 to n
         columns each of the form ``hdd_<heating_balance_point>``
         and ``cdd_<cooling_balance_point>``. DataFrames of this form can be
         made using the :any:`eemeter.create_caltrack_daily_design_matrix` or
         :any:`eemeter.create_caltrack_billing_design_matrix` methods.
-        Should have a :any:`pandas.DatetimeIndex`.
+        Should have a :any:`pandas.DatetimeIndex`. With a lazy design matrix,
+        only the degree day columns of the searched balance points are computed.
     fit_cdd : :any:`bool`, optional
         If True, fit CDD models unless overridden by ``fit_cdd_only`` or
         ``fit_cdd_hdd`` flags. Should be set to ``False`` for gas meter data.
@@ -1754,6 +2091,21 @@ def fit_caltrack_usage_per_day_model(
     fit_cdd_hdd : :any:`bool`, optional
         If True, fit and consider cdd_hdd model candidates. Ignored if
         ``fit_cdd=False``.
+    max_workers : :any:`int`, optional
+        If greater than 1, fit candidate models on a thread pool of this
+        size. Results are identical to the serial fit.
+    balance_point_search : :any:`str`, optional
+        How to search the balance points available in ``data``. One of
+        ``'exhaustive'`` (the default), which fits every candidate, or
+        ``'coarse_to_fine'``, which fits every
+        ``coarse_balance_point_step``-th balance point and then refines
+        around the best qualified candidate of each model type. Only the
+        evaluated candidates are included in
+        :any:`eemeter.CalTRACKUsagePerDayModelResults.candidates`. Useful
+        for screening runs; use ``'exhaustive'`` for CalTRACK compliance.
+    coarse_balance_point_step : :any:`int`, optional
+        Grid step, in number of balance points, of the coarse pass of the
+        ``'coarse_to_fine'`` search.
 
     Returns
     -------
@@ -1777,10 +2129,27 @@ def fit_caltrack_usage_per_day_model(
     else:
         interval = "daily"
 
-    # cleans data to fully NaN rows that have missing temp or meter data
-    data = overwrite_partial_rows_with_nan(data)
+    if balance_point_search not in ("exhaustive", "coarse_to_fine"):
+        raise ValueError(
+            "balance_point_search must be one of 'exhaustive' or 'coarse_to_fine',"
+            " got {!r}.".format(balance_point_search)
+        )
+    if coarse_balance_point_step < 1:
+        raise ValueError(
+            "coarse_balance_point_step must be at least 1, got {!r}.".format(
+                coarse_balance_point_step
+            )
+        )
 
-    if data.dropna().empty:
+    if isinstance(data, CalTRACKUsagePerDayDesignMatrix):
+        # rows with missing temp or meter data are already fully NaN
+        no_data = data["meter_value"].dropna().empty
+    else:
+        # cleans data to fully NaN rows that have missing temp or meter data
+        data = overwrite_partial_rows_with_nan(data)
+        no_data = data.dropna().empty
+
+    if no_data:
         return CalTRACKUsagePerDayModelResults(
             status="NO DATA",
             method_name="caltrack_usage_per_day",
@@ -1802,41 +2171,73 @@ def fit_caltrack_usage_per_day_model(
             get_intercept_only_candidate_models(data, weights_col=weights_col)
         )
 
-    if fit_hdd_only:
-        candidates.extend(
-            get_hdd_only_candidate_models(
-                data=data,
-                minimum_non_zero_hdd=minimum_non_zero_hdd,
-                minimum_total_hdd=minimum_total_hdd,
-                beta_hdd_maximum_p_value=beta_hdd_maximum_p_value,
-                weights_col=weights_col,
-            )
+    def _hdd_only_candidate_models(balance_points=None):
+        return get_hdd_only_candidate_models(
+            data=data,
+            minimum_non_zero_hdd=minimum_non_zero_hdd,
+            minimum_total_hdd=minimum_total_hdd,
+            beta_hdd_maximum_p_value=beta_hdd_maximum_p_value,
+            weights_col=weights_col,
+            max_workers=max_workers,
+            balance_points=balance_points,
+        )
+
+    def _cdd_only_candidate_models(balance_points=None):
+        return get_cdd_only_candidate_models(
+            data=data,
+            minimum_non_zero_cdd=minimum_non_zero_cdd,
+            minimum_total_cdd=minimum_total_cdd,
+            beta_cdd_maximum_p_value=beta_cdd_maximum_p_value,
+            weights_col=weights_col,
+            max_workers=max_workers,
+            balance_points=balance_points,
+        )
+
+    def _cdd_hdd_candidate_models(balance_points=None):
+        return get_cdd_hdd_candidate_models(
+            data=data,
+            minimum_non_zero_cdd=minimum_non_zero_cdd,
+            minimum_non_zero_hdd=minimum_non_zero_hdd,
+            minimum_total_cdd=minimum_total_cdd,
+            minimum_total_hdd=minimum_total_hdd,
+            beta_cdd_maximum_p_value=beta_cdd_maximum_p_value,
+            beta_hdd_maximum_p_value=beta_hdd_maximum_p_value,
+            weights_col=weights_col,
+            max_workers=max_workers,
+            balance_points=balance_points,
         )
 
+    cooling_balance_points = [
+        int(col[4:]) for col in data.columns if col.startswith("cdd")
+    ]
+    heating_balance_points = [
+        int(col[4:]) for col in data.columns if col.startswith("hdd")
+    ]
+
+    def _search(get_candidate_models, axes, is_valid=None):
+        if balance_point_search == "coarse_to_fine":
+            return _coarse_to_fine_candidate_models(
+                get_candidate_models, axes, coarse_balance_point_step, is_valid
+            )
+        return get_candidate_models()
+
+    if fit_hdd_only:
+        candidates.extend(_search(_hdd_only_candidate_models, [heating_balance_points]))
+
     # cdd models ignored for gas
     if fit_cdd:
         if fit_cdd_only:
             candidates.extend(
-                get_cdd_only_candidate_models(
-                    data=data,
-                    minimum_non_zero_cdd=minimum_non_zero_cdd,
-                    minimum_total_cdd=minimum_total_cdd,
-                    beta_cdd_maximum_p_value=beta_cdd_maximum_p_value,
-                    weights_col=weights_col,
-                )
+                _search(_cdd_only_candidate_models, [cooling_balance_points])
             )
 
         if fit_cdd_hdd:
+            # CalTrack 3.2.2.1
             candidates.extend(
-                get_cdd_hdd_candidate_models(
-                    data=data,
-                    minimum_non_zero_cdd=minimum_non_zero_cdd,
-                    minimum_non_zero_hdd=minimum_non_zero_hdd,
-                    minimum_total_cdd=minimum_total_cdd,
-                    minimum_total_hdd=minimum_total_hdd,
-                    beta_cdd_maximum_p_value=beta_cdd_maximum_p_value,
-                    beta_hdd_maximum_p_value=beta_hdd_maximum_p_value,
-                    weights_col=weights_col,
+                _search(
+                    _cdd_hdd_candidate_models,
+                    [cooling_balance_points, heating_balance_points],
+                    lambda key: key[1] <= key[0],
                 )
             )
 
@@ -1870,6 +2271,13 @@ def fit_caltrack_usage_per_day_model(
             "beta_hdd_maximum_p_value": beta_hdd_maximum_p_value,
         },
     )
+    if balance_point_search != "exhaustive":
+        model_result.settings.update(
+            {
+                "balance_point_search": balance_point_search,
+                "coarse_balance_point_step": coarse_balance_point_step,
+            }
+        )
 
     if best_candidate is not None:
         if best_candidate.model_type in ["cdd_hdd"]:
@@ -1879,27 +2287,34 @@ def fit_caltrack_usage_per_day_model(
         else:
             num_parameters = 0
 
-        predicted_avgs = _caltrack_predict_design_matrix(
+        # avgs and totals share one pass over the design matrix; totals are
+        # the averaged components scaled by the number of days per period.
+        (
+            base_load,
+            heating_load,
+            cooling_load,
+        ) = _caltrack_predict_design_matrix_components(
             best_candidate.model_type,
             best_candidate.model_params,
             data,
             input_averages=True,
             output_averages=True,
         )
+        predicted_avgs = pd.Series(
+            base_load + heating_load + cooling_load, index=data.index
+        )
         model_result.avgs_metrics = ModelMetrics(
-            data.meter_value, predicted_avgs, num_parameters
+            data["meter_value"], predicted_avgs, num_parameters
         )
 
-        predicted_totals = _caltrack_predict_design_matrix(
-            best_candidate.model_type,
-            best_candidate.model_params,
-            data,
-            input_averages=True,
-            output_averages=False,
+        days_per_period = day_counts(data.index)
+        n_days = days_per_period.to_numpy()
+        predicted_totals = pd.Series(
+            base_load * n_days + heating_load * n_days + cooling_load * n_days,
+            index=data.index,
         )
 
-        days_per_period = day_counts(data.index)
-        data_totals = data.meter_value * days_per_period
+        data_totals = data["meter_value"] * days_per_period
         model_result.totals_metrics = ModelMetrics(
             data_totals, predicted_totals, num_parameters
         )
@@ -1907,74 +2322,44 @@ def fit_caltrack_usage_per_day_model(
     return model_result
 
 
-def caltrack_sufficiency_criteria(
-    data_quality,
+def _caltrack_sufficiency_criteria_no_data():
+    return DataSufficiency(
+        status="NO DATA",
+        criteria_name="caltrack_sufficiency_criteria",
+        warnings=[
+            EEMeterWarning(
+                qualified_name="eemeter.caltrack_sufficiency_criteria.no_data",
+                description=("No data available."),
+                data={},
+            )
+        ],
+    )
+
+
+def _caltrack_sufficiency_criteria_result(
+    data_start,
+    data_end,
     requested_start,
     requested_end,
-    num_days=365,
-    min_fraction_daily_coverage=0.9,  # TODO: needs to be per year
-    min_fraction_hourly_temperature_coverage_per_period=0.9,
+    n_negative_meter_values,
+    n_valid_meter_value_days,
+    n_valid_temperature_days,
+    n_valid_days,
+    median,
+    upper_quantile,
+    lower_quantile,
+    extreme_value_limit,
+    n_extreme_values,
+    max_value,
+    num_days,
+    min_fraction_daily_coverage,
+    min_fraction_hourly_temperature_coverage_per_period,
 ):
-    """CalTRACK daily data sufficiency criteria.
-
-    .. note::
-
-        For CalTRACK compliance, ``min_fraction_daily_coverage`` must be set
-        at ``0.9`` (section 2.2.1.2), and requested_start and requested_end must
-        not be None (section 2.2.4).
-
-
-    Parameters
-    ----------
-    data_quality : :any:`pandas.DataFrame`
-        A DataFrame containing at least the column ``meter_value`` and the two
-        columns ``temperature_null``, containing a count of null hourly
-        temperature values for each meter value, and ``temperature_not_null``,
-        containing a count of not-null hourly temperature values for each
-        meter value. Should have a :any:`pandas.DatetimeIndex`.
-    requested_start : :any:`datetime.datetime`, timezone aware (or :any:`None`)
-        The desired start of the period, if any, especially if this is
-        different from the start of the data. If given, warnings
-        are reported on the basis of this start date instead of data start
-        date. Must be explicitly set to ``None`` in order to use data start date.
-    requested_end : :any:`datetime.datetime`, timezone aware (or :any:`None`)
-        The desired end of the period, if any, especially if this is
-        different from the end of the data. If given, warnings
-        are reported on the basis of this end date instead of data end date.
-        Must be explicitly set to ``None`` in order to use data end date.
-    num_days : :any:`int`, optional
-        Exact number of days allowed in data, including extent given by
-        ``requested_start`` or ``requested_end``, if given.
-    min_fraction_daily_coverage : :any:, optional
-        Minimum fraction of days of data in total data extent for which data
-        must be available.
-    min_fraction_hourly_temperature_coverage_per_period=0.9,
-        Minimum fraction of hours of temperature data coverage in a particular
-        period. Anything below this causes the whole period to be considered
-        considered missing.
-
-    Returns
-    -------
-    data_sufficiency : :any:`eemeter.DataSufficiency`
-        The an object containing sufficiency status and warnings for this data.
-    """
+    # Apply the CalTRACK sufficiency criteria to the statistics of one
+    # meter's data quality frame, as computed by caltrack_sufficiency_criteria
+    # or caltrack_sufficiency_criteria_batch.
     criteria_name = "caltrack_sufficiency_criteria"
 
-    if data_quality.dropna().empty:
-        return DataSufficiency(
-            status="NO DATA",
-            criteria_name=criteria_name,
-            warnings=[
-                EEMeterWarning(
-                    qualified_name="eemeter.caltrack_sufficiency_criteria.no_data",
-                    description=("No data available."),
-                    data={},
-                )
-            ],
-        )
-
-    data_start = data_quality.index.min().tz_convert("UTC")
-    data_end = data_quality.index.max().tz_convert("UTC")
     n_days_data = (data_end - data_start).days
 
     if requested_start is not None:
@@ -2029,10 +2414,6 @@ def caltrack_sufficiency_criteria(
 
     n_days_total = n_days_data + n_days_start_gap + n_days_end_gap
 
-    n_negative_meter_values = data_quality.meter_value[
-        data_quality.meter_value < 0
-    ].shape[0]
-
     if n_negative_meter_values > 0:
         # CalTrack 2.3.5
         critical_warnings.append(
@@ -2048,34 +2429,6 @@ def caltrack_sufficiency_criteria(
             )
         )
 
-    # TODO(philngo): detect and report unsorted or repeated values.
-
-    # create masks showing which daily or billing periods meet criteria
-    valid_meter_value_rows = data_quality.meter_value.notnull()
-    valid_temperature_rows = (
-        data_quality.temperature_not_null
-        / (data_quality.temperature_not_null + data_quality.temperature_null)
-    ) > min_fraction_hourly_temperature_coverage_per_period
-    valid_rows = valid_meter_value_rows & valid_temperature_rows
-
-    # get number of days per period - for daily this should be a series of ones
-    row_day_counts = day_counts(data_quality.index)
-
-    # apply masks, giving total
-    n_valid_meter_value_days = int((valid_meter_value_rows * row_day_counts).sum())
-    n_valid_temperature_days = int((valid_temperature_rows * row_day_counts).sum())
-    n_valid_days = int((valid_rows * row_day_counts).sum())
-
-    median = data_quality.meter_value.median()
-    upper_quantile = data_quality.meter_value.quantile(0.75)
-    lower_quantile = data_quality.meter_value.quantile(0.25)
-    iqr = upper_quantile - lower_quantile
-    extreme_value_limit = median + (3 * iqr)
-    n_extreme_values = data_quality.meter_value[
-        data_quality.meter_value > extreme_value_limit
-    ].shape[0]
-    max_value = float(data_quality.meter_value.max())
-
     if n_days_total > 0:
         fraction_valid_meter_value_days = n_valid_meter_value_days / float(n_days_total)
         fraction_valid_temperature_days = n_valid_temperature_days / float(n_days_total)
@@ -2223,6 +2576,294 @@ def caltrack_sufficiency_criteria(
     )
 
 
+@profiled
+def caltrack_sufficiency_criteria(
+    data_quality,
+    requested_start,
+    requested_end,
+    num_days=365,
+    min_fraction_daily_coverage=0.9,  # TODO: needs to be per year
+    min_fraction_hourly_temperature_coverage_per_period=0.9,
+):
+    """CalTRACK daily data sufficiency criteria.
+
+    .. note::
+
+        For CalTRACK compliance, ``min_fraction_daily_coverage`` must be set
+        at ``0.9`` (section 2.2.1.2), and requested_start and requested_end must
+        not be None (section 2.2.4).
+
+
+    Parameters
+    ----------
+    data_quality : :any:`pandas.DataFrame`
+        A DataFrame containing at least the column ``meter_value`` and the two
+        columns ``temperature_null``, containing a count of null hourly
+        temperature values for each meter value, and ``temperature_not_null``,
+        containing a count of not-null hourly temperature values for each
+        meter value. Should have a :any:`pandas.DatetimeIndex`.
+    requested_start : :any:`datetime.datetime`, timezone aware (or :any:`None`)
+        The desired start of the period, if any, especially if this is
+        different from the start of the data. If given, warnings
+        are reported on the basis of this start date instead of data start
+        date. Must be explicitly set to ``None`` in order to use data start date.
+    requested_end : :any:`datetime.datetime`, timezone aware (or :any:`None`)
+        The desired end of the period, if any, especially if this is
+        different from the end of the data. If given, warnings
+        are reported on the basis of this end date instead of data end date.
+        Must be explicitly set to ``None`` in order to use data end date.
+    num_days : :any:`int`, optional
+        Exact number of days allowed in data, including extent given by
+        ``requested_start`` or ``requested_end``, if given.
+    min_fraction_daily_coverage : :any:, optional
+        Minimum fraction of days of data in total data extent for which data
+        must be available.
+    min_fraction_hourly_temperature_coverage_per_period=0.9,
+        Minimum fraction of hours of temperature data coverage in a particular
+        period. Anything below this causes the whole period to be considered
+        considered missing.
+
+    Returns
+    -------
+    data_sufficiency : :any:`eemeter.DataSufficiency`
+        The an object containing sufficiency status and warnings for this data.
+    """
+    if data_quality.dropna().empty:
+        return _caltrack_sufficiency_criteria_no_data()
+
+    data_start = data_quality.index.min().tz_convert("UTC")
+    data_end = data_quality.index.max().tz_convert("UTC")
+
+    n_negative_meter_values = data_quality.meter_value[
+        data_quality.meter_value < 0
+    ].shape[0]
+
+    # TODO(philngo): detect and report unsorted or repeated values.
+
+    # create masks showing which daily or billing periods meet criteria
+    valid_meter_value_rows = data_quality.meter_value.notnull()
+    valid_temperature_rows = (
+        data_quality.temperature_not_null
+        / (data_quality.temperature_not_null + data_quality.temperature_null)
+    ) > min_fraction_hourly_temperature_coverage_per_period
+    valid_rows = valid_meter_value_rows & valid_temperature_rows
+
+    # get number of days per period - for daily this should be a series of ones
+    row_day_counts = day_counts(data_quality.index)
+
+    # apply masks, giving total
+    n_valid_meter_value_days = int((valid_meter_value_rows * row_day_counts).sum())
+    n_valid_temperature_days = int((valid_temperature_rows * row_day_counts).sum())
+    n_valid_days = int((valid_rows * row_day_counts).sum())
+
+    median = data_quality.meter_value.median()
+    upper_quantile = data_quality.meter_value.quantile(0.75)
+    lower_quantile = data_quality.meter_value.quantile(0.25)
+    iqr = upper_quantile - lower_quantile
+    extreme_value_limit = median + (3 * iqr)
+    n_extreme_values = data_quality.meter_value[
+        data_quality.meter_value > extreme_value_limit
+    ].shape[0]
+    max_value = float(data_quality.meter_value.max())
+
+    return _caltrack_sufficiency_criteria_result(
+        data_start,
+        data_end,
+        requested_start,
+        requested_end,
+        n_negative_meter_values,
+        n_valid_meter_value_days,
+        n_valid_temperature_days,
+        n_valid_days,
+        median,
+        upper_quantile,
+        lower_quantile,
+        extreme_value_limit,
+        n_extreme_values,
+        max_value,
+        num_days,
+        min_fraction_daily_coverage,
+        min_fraction_hourly_temperature_coverage_per_period,
+    )
+
+
+def _grouped_quantile(sorted_values, group_starts, counts, q):
+    # Linear interpolation quantile of each group of sorted_values, in which
+    # each group is sorted with its NaNs last, matching numpy.percentile.
+    position = q * (counts - 1)
+    lower = np.floor(position).astype(int)
+    upper = np.minimum(lower + 1, counts - 1)
+    t = position - lower
+    a = sorted_values[group_starts + lower]
+    b = sorted_values[group_starts + upper]
+    diff_b_a = b - a
+    return np.where(t >= 0.5, b - diff_b_a * (1 - t), a + diff_b_a * t)
+
+
+def _grouped_median(sorted_values, group_starts, counts):
+    # Median of each group of sorted_values, matching numpy.median.
+    a = sorted_values[group_starts + (counts - 1) // 2]
+    b = sorted_values[group_starts + counts // 2]
+    return (a + b) / 2
+
+
+@profiled
+def caltrack_sufficiency_criteria_batch(
+    data_quality,
+    requested_start,
+    requested_end,
+    meter_id_col="meter_id",
+    num_days=365,
+    min_fraction_daily_coverage=0.9,
+    min_fraction_hourly_temperature_coverage_per_period=0.9,
+    as_frame=False,
+):
+    """CalTRACK daily data sufficiency criteria for many meters at once.
+
+    Gives the same results as :any:`eemeter.caltrack_sufficiency_criteria`
+    applied to the data of each meter, but computes coverage, negative
+    value and extreme value statistics for all meters in a single pass of
+    grouped array operations.
+
+    Parameters
+    ----------
+    data_quality : :any:`pandas.DataFrame`
+        A long-format DataFrame with the data quality columns described in
+        :any:`eemeter.caltrack_sufficiency_criteria` for every meter, plus
+        a column of meter ids. Should have a :any:`pandas.DatetimeIndex`.
+        Rows need not be sorted.
+    requested_start : :any:`datetime.datetime`, :any:`dict`, :any:`pandas.Series` or :any:`None`
+        The desired start of the period, either the same for every meter or
+        keyed by meter id. Meters missing from the mapping use data start date.
+    requested_end : :any:`datetime.datetime`, :any:`dict`, :any:`pandas.Series` or :any:`None`
+        The desired end of the period, either the same for every meter or
+        keyed by meter id. Meters missing from the mapping use data end date.
+    meter_id_col : :any:`str`, optional
+        The name of the column of meter ids.
+    num_days : :any:`int`, optional
+        Exact number of days allowed in data, including extent given by
+        ``requested_start`` or ``requested_end``, if given.
+    min_fraction_daily_coverage : :any:, optional
+        Minimum fraction of days of data in total data extent for which data
+        must be available.
+    min_fraction_hourly_temperature_coverage_per_period=0.9,
+        Minimum fraction of hours of temperature data coverage in a particular
+        period. Anything below this causes the whole period to be considered
+        considered missing.
+    as_frame : :any:`bool`, optional
+        If True, return a summary table instead of
+        :any:`eemeter.DataSufficiency` objects.
+
+    Returns
+    -------
+    data_sufficiencies : :any:`dict` of :any:`eemeter.DataSufficiency` or :any:`pandas.DataFrame`
+        The data sufficiency of each meter, keyed by meter id in order of
+        first appearance. If ``as_frame=True``, a DataFrame indexed by meter id
+        with a ``status`` column, a ``warnings`` column of qualified warning
+        names and a column for each statistic checked.
+    """
+    meter_codes, meter_ids = pd.factorize(data_quality[meter_id_col], sort=False)
+    features = data_quality.drop(columns=[meter_id_col])
+    times = data_quality.index.tz_convert("UTC").asi8
+    meter_values = features.meter_value.to_numpy(dtype=float)
+
+    # group rows by meter, in time order
+    order = np.lexsort((times, meter_codes))
+    meter_codes = meter_codes[order]
+    times = times[order]
+    meter_values = meter_values[order]
+    temperature_not_null = features.temperature_not_null.to_numpy(dtype=float)[order]
+    temperature_null = features.temperature_null.to_numpy(dtype=float)[order]
+    complete_rows = features.notnull().to_numpy().all(axis=1)[order]
+
+    n_meters = len(meter_ids)
+    n_rows = np.bincount(meter_codes, minlength=n_meters)
+    group_starts = np.concatenate([[0], np.cumsum(n_rows)[:-1]])
+    group_ends = group_starts + n_rows - 1
+
+    def _group_sum(weights):
+        return np.bincount(meter_codes, weights=weights, minlength=n_meters)
+
+    # days per period; the last period of each meter counts no days, as with
+    # day_counts
+    row_day_counts = np.zeros(len(times))
+    same_meter = meter_codes[1:] == meter_codes[:-1]
+    row_day_counts[:-1] = np.where(
+        same_meter, 1e-9 * (times[1:] - times[:-1]) / (60 * 60 * 24), 0
+    )
+
+    valid_meter_value_rows = ~np.isnan(meter_values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        valid_temperature_rows = (
+            temperature_not_null / (temperature_not_null + temperature_null)
+        ) > min_fraction_hourly_temperature_coverage_per_period
+    valid_rows = valid_meter_value_rows & valid_temperature_rows
+
+    n_valid_meter_value_days = _group_sum(valid_meter_value_rows * row_day_counts)
+    n_valid_temperature_days = _group_sum(valid_temperature_rows * row_day_counts)
+    n_valid_days = _group_sum(valid_rows * row_day_counts)
+    n_negative_meter_values = _group_sum(meter_values < 0)
+    has_data = _group_sum(complete_rows) > 0
+
+    # quantiles of the meter values of each meter, sorted with NaNs last
+    value_order = np.lexsort((meter_values, meter_codes))
+    sorted_values = meter_values[value_order]
+    counts = np.maximum(_group_sum(valid_meter_value_rows).astype(int), 1)
+    median = _grouped_median(sorted_values, group_starts, counts)
+    upper_quantile = _grouped_quantile(sorted_values, group_starts, counts, 0.75)
+    lower_quantile = _grouped_quantile(sorted_values, group_starts, counts, 0.25)
+    extreme_value_limit = median + (3 * (upper_quantile - lower_quantile))
+    with np.errstate(invalid="ignore"):
+        n_extreme_values = _group_sum(meter_values > extreme_value_limit[meter_codes])
+    max_value = sorted_values[group_starts + counts - 1]
+
+    def _for_meter(value, meter_id):
+        if isinstance(value, (dict, pd.Series)):
+            value = value.get(meter_id)
+            if pd.isnull(value):
+                return None
+        return value
+
+    data_sufficiencies = {}
+    for i, meter_id in enumerate(meter_ids):
+        if not has_data[i]:
+            data_sufficiencies[meter_id] = _caltrack_sufficiency_criteria_no_data()
+            continue
+        data_sufficiencies[meter_id] = _caltrack_sufficiency_criteria_result(
+            pd.Timestamp(times[group_starts[i]], tz="UTC"),
+            pd.Timestamp(times[group_ends[i]], tz="UTC"),
+            _for_meter(requested_start, meter_id),
+            _for_meter(requested_end, meter_id),
+            int(n_negative_meter_values[i]),
+            int(n_valid_meter_value_days[i]),
+            int(n_valid_temperature_days[i]),
+            int(n_valid_days[i]),
+            float(median[i]),
+            float(upper_quantile[i]),
+            float(lower_quantile[i]),
+            float(extreme_value_limit[i]),
+            int(n_extreme_values[i]),
+            float(max_value[i]),
+            num_days,
+            min_fraction_daily_coverage,
+            min_fraction_hourly_temperature_coverage_per_period,
+        )
+
+    if not as_frame:
+        return data_sufficiencies
+
+    rows = []
+    for meter_id, data_sufficiency in data_sufficiencies.items():
+        row = {
+            "status": data_sufficiency.status,
+            "warnings": [w.qualified_name for w in data_sufficiency.warnings],
+        }
+        for values in data_sufficiency.data.values():
+            row.update(values)
+        rows.append(row)
+    return pd.DataFrame(rows, index=pd.Index(meter_ids, name=meter_id_col))
+
+
 def plot_caltrack_candidate(
     candidate,
     best=False,
@@ -17,18 +17,39 @@
    limitations under the License.
 
 """
-from pkg_resources import resource_stream
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import csv
+from datetime import timedelta
+import glob
 import json
+import os
+import re
+import tempfile
 
 import click
-
-from .caltrack import fit_caltrack_usage_per_day_model
+import pandas as pd
+
+from .caltrack import (
+    FitResultCache,
+    caltrack_sufficiency_criteria,
+    create_caltrack_hourly_preliminary_design_matrix,
+    create_caltrack_hourly_segmented_design_matrices,
+    fit_caltrack_hourly_model,
+    fit_caltrack_usage_per_day_model,
+)
 from .features import (
     compute_usage_per_day_feature,
     compute_temperature_features,
+    estimate_hour_of_week_occupancy,
+    fit_temperature_bins,
     merge_features,
 )
 from .io import meter_data_from_csv, temperature_data_from_csv
+from .profiling import Profiler, profile_stage
+from .samples.load import _load_sample_data, _load_sample_metadata
+from .segmentation import segment_time_series
+from .transform import get_baseline_data
 
 
 @click.group()
@@ -58,36 +79,54 @@ def cli():
 
         \b
             $ eemeter caltrack --sample=il-gas-hdd-only-billing_monthly --no-fit-cdd
+
+        Fit many meters listed in a manifest, writing JSON Lines:
+
+        \b
+            $ eemeter batch --manifest=/path/to/manifest.csv --output-file=/path/to/results.jsonl --workers=4
     """
     pass  # pragma: no cover
 
 
 def _get_data(
-    sample, meter_file, temperature_file, heating_balance_points, cooling_balance_points
+    sample, meter_file, temperature_file, meter_data_freq=None, cache_dir=None
 ):
 
     if sample is not None:
-        with resource_stream("eemeter.samples", "metadata.json") as f:
-            metadata = json.loads(f.read().decode("utf-8"))
-        if sample in metadata:
+        sample_metadata = _load_sample_metadata()
+        if sample in sample_metadata:
             click.echo("Loading sample: {}".format(sample))
 
-            meter_file = resource_stream(
-                "eemeter.samples", metadata[sample]["meter_data_filename"]
+            metadata = sample_metadata[sample]
+            if cache_dir is not None:
+                cache_dir = os.path.join(cache_dir, "samples")
+            meter_data = _load_sample_data(
+                metadata["meter_data_filename"],
+                "meter",
+                meter_data_freq,
+                cache_dir=cache_dir,
             )
-            temperature_file = resource_stream(
-                "eemeter.samples", metadata[sample]["temperature_filename"]
+            temperature_data = _load_sample_data(
+                metadata["temperature_filename"],
+                "temperature",
+                "hourly",
+                cache_dir=cache_dir,
             )
+            return meter_data, temperature_data
         else:
             raise click.ClickException(
                 "Sample not found. Try one of these?\n{}".format(
-                    "\n".join([" - {}".format(key) for key in sorted(metadata.keys())])
+                    "\n".join(
+                        [" - {}".format(key) for key in sorted(sample_metadata.keys())]
+                    )
                 )
             )
 
     if meter_file is not None:
         gzipped = meter_file.name.endswith(".gz")
-        meter_data = meter_data_from_csv(meter_file, gzipped=gzipped)
+        meter_data = meter_data_from_csv(
+            meter_file, gzipped=gzipped, freq=meter_data_freq
+        )
     else:
         raise click.ClickException("Meter data not specified.")
 
@@ -99,44 +138,631 @@ def _get_data(
     else:
         raise click.ClickException("Temperature data not specified.")
 
-    usage_per_day = compute_usage_per_day_feature(meter_data)
+    return meter_data, temperature_data
+
+
+def _parse_balance_points(ctx, param, value):
+    # a comma separated list of balance points and inclusive ranges, such as
+    # "55-65" or "50,55,60-65"
+    balance_points = []
+    for part in value.split(","):
+        match = re.match(r"^\s*(-?\d+)\s*(?:-\s*(-?\d+)\s*)?$", part)
+        if match is None:
+            raise click.BadParameter(
+                "Expected balance points such as 55-65 or 55,60,65, got {}.".format(
+                    value
+                )
+            )
+        first, last = match.groups()
+        if last is None:
+            balance_points.append(int(first))
+        else:
+            balance_points.extend(range(int(first), int(last) + 1))
+    return sorted(set(balance_points))
+
+
+def _parse_datetime(value):
+    # timezone-naive dates and times are taken to be UTC
+    if value is None or value == "":
+        return None
+    timestamp = pd.Timestamp(value)
+    if timestamp.tz is None:
+        timestamp = timestamp.tz_localize("UTC")
+    return timestamp.to_pydatetime()
+
+
+def _parse_datetime_option(ctx, param, value):
+    try:
+        return _parse_datetime(value)
+    except ValueError:
+        raise click.BadParameter(
+            "Expected a date such as 2017-01-01, got {}.".format(value)
+        )
+
+
+def _pipeline_options(command):
+    """Add the options shared by the commands that fit models."""
+    options = [
+        click.option(
+            "--interval",
+            default="daily",
+            type=click.Choice(["daily", "billing", "hourly"]),
+            help="Meter data interval, which selects the CalTRACK method: daily, "
+            "billing (usage per day with billing presets) or hourly.",
+        ),
+        click.option(
+            "--heating-balance-points",
+            default="55-65",
+            callback=_parse_balance_points,
+            help="Heating balance points to try, e.g., 55-65 or 50,55,60. "
+            "Not used for hourly models.",
+        ),
+        click.option(
+            "--cooling-balance-points",
+            default="65-75",
+            callback=_parse_balance_points,
+            help="Cooling balance points to try, e.g., 65-75 or 65,70,75. "
+            "Not used for hourly models.",
+        ),
+        click.option(
+            "--baseline-start",
+            default=None,
+            callback=_parse_datetime_option,
+            help="Start of the baseline period. Dates without a timezone are UTC.",
+        ),
+        click.option(
+            "--baseline-end",
+            default=None,
+            callback=_parse_datetime_option,
+            help="End of the baseline period, e.g., the start of the intervention. "
+            "If neither --baseline-start nor --baseline-end is given, all data "
+            "is used.",
+        ),
+        click.option(
+            "--max-baseline-days",
+            default=365,
+            type=click.IntRange(min=1),
+            help="Maximum length of the baseline period in days, counted back "
+            "from the end of the baseline. Not used with --baseline-start.",
+        ),
+        click.option(
+            "--sufficiency/--no-sufficiency",
+            default=False,
+            is_flag=True,
+            help="Also run the CalTRACK data sufficiency check on the baseline "
+            "data. Output then contains data_sufficiency and model_results.",
+        ),
+        click.option(
+            "--cache-dir",
+            default=None,
+            type=click.Path(file_okay=False),
+            help="Directory in which to cache design matrices and fit results "
+            "between runs.",
+        ),
+        click.option(
+            "--show-candidates/--no-show-candidates", default=False, is_flag=True
+        ),
+        click.option("--fit-cdd/--no-fit-cdd", default=True, is_flag=True),
+        click.option(
+            "--profile/--no-profile",
+            default=False,
+            is_flag=True,
+            help="Print the time spent in each stage (design matrices, fits, "
+            "metrics, serialization) to stderr.",
+        ),
+        click.option(
+            "--profile-file",
+            default=None,
+            type=click.Path(dir_okay=False),
+            help="Write the time spent in each stage to this JSON file.",
+        ),
+    ]
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+def _pipeline_settings(
+    interval,
+    heating_balance_points,
+    cooling_balance_points,
+    baseline_start,
+    baseline_end,
+    max_baseline_days,
+    sufficiency,
+    cache_dir,
+    show_candidates,
+    fit_cdd,
+    profile,
+    profile_file,
+):
+    return {
+        "interval": interval,
+        "heating_balance_points": heating_balance_points,
+        "cooling_balance_points": cooling_balance_points,
+        "baseline_start": baseline_start,
+        "baseline_end": baseline_end,
+        "max_baseline_days": max_baseline_days,
+        "sufficiency": sufficiency,
+        "cache_dir": cache_dir,
+        "show_candidates": show_candidates,
+        "fit_cdd": fit_cdd,
+        "profile": profile,
+        "profile_file": profile_file,
+    }
+
+
+def _profiling(settings):
+    return settings["profile"] or settings["profile_file"] is not None
+
+
+def _start_profiler(settings):
+    profiler = Profiler()
+    if _profiling(settings):
+        profiler.start()
+    return profiler
+
+
+def _report_profile(profiler, settings):
+    if settings["profile_file"] is not None:
+        with open(settings["profile_file"], "w") as f:
+            json.dump(profiler.json(), f, indent=2)
+    if settings["profile"]:
+        click.echo(profiler.summary(), err=True)
+
+
+def _cached(cache, name, meter_data, temperature_data, settings, build):
+    # Return build(), pickled under the cache directory and keyed, like fit
+    # results, by a hash of the input data and settings.
+    if cache is None:
+        return build()
+    key = cache.key(
+        name, {"meter_data": meter_data, "temperature_data": temperature_data}, settings
+    )
+    directory = os.path.join(cache.directory, "design_matrices")
+    path = os.path.join(directory, "{}.pkl".format(key))
+    try:
+        return pd.read_pickle(path)
+    except Exception:
+        pass  # missing or unreadable, so rebuild it
+    value = build()
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        pd.to_pickle(value, tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return value
+
+
+def _get_design_matrix(meter_data, temperature_data, settings):
+    usage_per_day = compute_usage_per_day_feature(meter_data, series_name="meter_value")
+    temperature_features_kwargs = {}
+    if settings["interval"] == "billing":
+        temperature_features_kwargs = {
+            "data_quality": True,
+            "tolerance": pd.Timedelta("35D"),
+        }
     temperature_features = compute_temperature_features(
         meter_data.index,
         temperature_data,
-        heating_balance_points=heating_balance_points,
-        cooling_balance_points=cooling_balance_points,
+        heating_balance_points=settings["heating_balance_points"],
+        cooling_balance_points=settings["cooling_balance_points"],
+        **temperature_features_kwargs
     )
     return merge_features([usage_per_day, temperature_features])
 
 
+def _get_hourly_design_matrices(meter_data, temperature_data):
+    preliminary_design_matrix = create_caltrack_hourly_preliminary_design_matrix(
+        meter_data, temperature_data
+    )
+    segmentation = segment_time_series(
+        preliminary_design_matrix.index, "three_month_weighted"
+    )
+    occupancy_lookup = estimate_hour_of_week_occupancy(
+        preliminary_design_matrix, segmentation=segmentation
+    )
+    occupied_temperature_bins, unoccupied_temperature_bins = fit_temperature_bins(
+        preliminary_design_matrix,
+        segmentation=segmentation,
+        occupancy_lookup=occupancy_lookup,
+    )
+    segmented_design_matrices = create_caltrack_hourly_segmented_design_matrices(
+        preliminary_design_matrix,
+        segmentation,
+        occupancy_lookup,
+        occupied_temperature_bins,
+        unoccupied_temperature_bins,
+    )
+    return (
+        segmented_design_matrices,
+        occupancy_lookup,
+        occupied_temperature_bins,
+        unoccupied_temperature_bins,
+    )
+
+
+def _get_data_sufficiency(meter_data, temperature_data, settings):
+    if settings["interval"] == "hourly":
+        meter_data = meter_data.resample("D").sum(min_count=1)
+    tolerance = pd.Timedelta("35D") if settings["interval"] == "billing" else None
+    data_quality = merge_features(
+        [
+            compute_usage_per_day_feature(meter_data, series_name="meter_value"),
+            compute_temperature_features(
+                meter_data.index,
+                temperature_data,
+                heating_balance_points=[],
+                cooling_balance_points=[],
+                data_quality=True,
+                tolerance=tolerance,
+            ),
+        ]
+    )
+    requested_start = settings["baseline_start"]
+    requested_end = settings["baseline_end"]
+    if requested_start is None and requested_end is not None:
+        requested_start = requested_end - timedelta(days=settings["max_baseline_days"])
+    return caltrack_sufficiency_criteria(
+        data_quality,
+        requested_start,
+        requested_end,
+        num_days=settings["max_baseline_days"],
+    )
+
+
+def _run_pipeline(meter_data, temperature_data, settings):
+    # Select the baseline period, then build design matrices and fit the model
+    # for the interval. Returns the JSON-serializable output.
+    if settings["cache_dir"] is None:
+        cache = None
+    else:
+        cache = FitResultCache(settings["cache_dir"])
+
+    baseline_warnings = []
+    if settings["baseline_start"] is not None or settings["baseline_end"] is not None:
+        # an explicit start takes the place of max_days
+        if settings["baseline_start"] is None:
+            max_days = settings["max_baseline_days"]
+        else:
+            max_days = None
+        meter_data, baseline_warnings = get_baseline_data(
+            meter_data,
+            start=settings["baseline_start"],
+            end=settings["baseline_end"],
+            max_days=max_days,
+        )
+
+    output = {}
+    if settings["sufficiency"]:
+        data_sufficiency = _get_data_sufficiency(meter_data, temperature_data, settings)
+        output["data_sufficiency"] = data_sufficiency.json()
+
+    if settings["interval"] == "hourly":
+        args = _cached(
+            cache,
+            "caltrack_hourly_design_matrices",
+            meter_data,
+            temperature_data,
+            {},
+            lambda: _get_hourly_design_matrices(meter_data, temperature_data),
+        )
+        if cache is None:
+            model_results = fit_caltrack_hourly_model(*args)
+        else:
+            model_results = cache.fit_caltrack_hourly_model(*args)
+    else:
+        data = _cached(
+            cache,
+            "caltrack_{}_design_matrix".format(settings["interval"]),
+            meter_data,
+            temperature_data,
+            {
+                "heating_balance_points": settings["heating_balance_points"],
+                "cooling_balance_points": settings["cooling_balance_points"],
+            },
+            lambda: _get_design_matrix(meter_data, temperature_data, settings),
+        )
+        kwargs = {"fit_cdd": settings["fit_cdd"]}
+        if settings["interval"] == "billing":
+            kwargs.update({"use_billing_presets": True, "weights_col": "n_days_kept"})
+        if cache is None:
+            model_results = fit_caltrack_usage_per_day_model(data, **kwargs)
+        else:
+            model_results = cache.fit_caltrack_usage_per_day_model(data, **kwargs)
+
+    model_results.warnings = list(model_results.warnings) + baseline_warnings
+    output["model_results"] = model_results.json(
+        with_candidates=settings["show_candidates"]
+    )
+    return output
+
+
 @cli.command()
 @click.option("--sample", default=None, type=str)
 @click.option("--meter-file", default=None, type=click.File("rb"))
 @click.option("--temperature-file", default=None, type=click.File("rb"))
 @click.option("--output-file", default=None, type=click.File("wb"))
-@click.option("--show-candidates/--no-show-candidates", default=False, is_flag=True)
-@click.option("--fit-cdd/--no-fit-cdd", default=True, is_flag=True)
-def caltrack(
-    sample, meter_file, temperature_file, output_file, show_candidates, fit_cdd
-):
-    # TODO(philngo): add project dates and baseline period/reporting period.
-    # TODO(philngo): complain about temperature data that isn't daily
-
-    heating_balance_points = range(55, 66)
-    cooling_balance_points = range(65, 76)
-
-    data = _get_data(
-        sample,
-        meter_file,
-        temperature_file,
-        heating_balance_points,
-        cooling_balance_points,
-    )
-    model_results = fit_caltrack_usage_per_day_model(data, fit_cdd=fit_cdd)
-    json_str = json.dumps(model_results.json(with_candidates=show_candidates), indent=2)
+@_pipeline_options
+def caltrack(sample, meter_file, temperature_file, output_file, **kwargs):
+    settings = _pipeline_settings(**kwargs)
+    profiler = _start_profiler(settings)
+    try:
+        with profile_stage("read_data"):
+            meter_data, temperature_data = _get_data(
+                sample,
+                meter_file,
+                temperature_file,
+                meter_data_freq="hourly" if settings["interval"] == "hourly" else None,
+                cache_dir=settings["cache_dir"],
+            )
+        output = _run_pipeline(meter_data, temperature_data, settings)
+    finally:
+        profiler.stop()
+    if not settings["sufficiency"]:
+        output = output["model_results"]
+    json_str = json.dumps(output, indent=2)
 
     if output_file is None:
         click.echo(json_str)
     else:
         output_file.write(json_str.encode("utf-8"))
         click.echo("Output written: {}".format(output_file.name))
+    if _profiling(settings):
+        _report_profile(profiler, settings)
+
+
+def _parse_bool(value, default):
+    if value is None or value == "":
+        return default
+    return value in [True, "true", "True", 1, "1"]
+
+
+def _read_manifest(manifest_path):
+    # Read batch items from a CSV or JSON Lines manifest. Relative file paths
+    # are relative to the manifest.
+    if manifest_path.endswith(".jsonl") or manifest_path.endswith(".json"):
+        with open(manifest_path) as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(manifest_path) as f:
+            rows = list(csv.DictReader(f))
+
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    items = []
+    for i, row in enumerate(rows):
+        missing = [
+            key for key in ["meter_file", "temperature_file"] if not row.get(key)
+        ]
+        if missing:
+            raise click.ClickException(
+                "Manifest row {} is missing {}.".format(i + 1, ", ".join(missing))
+            )
+        meter_file = os.path.join(manifest_dir, row["meter_file"])
+        items.append(
+            {
+                "id": row.get("id") or row["meter_file"],
+                "meter_file": meter_file,
+                "temperature_file": os.path.join(manifest_dir, row["temperature_file"]),
+                "fit_cdd": row.get("fit_cdd"),
+                "baseline_start": row.get("baseline_start"),
+                "baseline_end": row.get("baseline_end"),
+            }
+        )
+    return items
+
+
+def _glob_items(meter_glob, temperature_file):
+    if temperature_file is None:
+        raise click.ClickException("--meter-glob requires --temperature-file.")
+    return [
+        {
+            "id": meter_file,
+            "meter_file": meter_file,
+            "temperature_file": temperature_file,
+            "fit_cdd": None,
+            "baseline_start": None,
+            "baseline_end": None,
+        }
+        for meter_file in sorted(glob.glob(meter_glob))
+    ]
+
+
+def _read_completed_ids(output_path):
+    # Return ids already written to a JSON Lines output file without an
+    # error, and the ids written with one. A partial last line left by an
+    # interrupted run and errored lines are removed, so errored meters are
+    # retried and written again.
+    if not os.path.exists(output_path):
+        return set(), set()
+    with open(output_path, "rb") as f:
+        content = f.read()
+    end = content.rfind(b"\n") + 1
+    completed, errored = set(), set()
+    lines = []
+    for line in content[:end].decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        if "error" in row:
+            errored.add(row["id"])
+        else:
+            completed.add(row["id"])
+            lines.append(line + "\n")
+
+    if errored or end < len(content):
+        # write to a temporary file and move it into place so that no
+        # completed results are lost if this is interrupted
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(output_path)), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.writelines(lines)
+            os.replace(tmp_path, output_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    return completed, errored - completed
+
+
+_temperature_data_cache = {}
+
+
+def _load_temperature_data(temperature_file):
+    # many meters usually share a temperature file, so keep them per process
+    if temperature_file not in _temperature_data_cache:
+        _temperature_data_cache.clear()
+        _temperature_data_cache[temperature_file] = temperature_data_from_csv(
+            temperature_file, gzipped=temperature_file.endswith(".gz"), freq="hourly"
+        )
+    return _temperature_data_cache[temperature_file]
+
+
+def _fit_batch_item(item, settings):
+    result = {
+        "id": item["id"],
+        "meter_file": item["meter_file"],
+        "temperature_file": item["temperature_file"],
+    }
+    profiler = _start_profiler(settings)
+    try:
+        settings = dict(
+            settings, fit_cdd=_parse_bool(item["fit_cdd"], settings["fit_cdd"])
+        )
+        for key in ["baseline_start", "baseline_end"]:
+            if item[key]:
+                settings[key] = _parse_datetime(item[key])
+        with profile_stage("read_data"):
+            meter_data = meter_data_from_csv(
+                item["meter_file"],
+                gzipped=item["meter_file"].endswith(".gz"),
+                freq="hourly" if settings["interval"] == "hourly" else None,
+            )
+            temperature_data = _load_temperature_data(item["temperature_file"])
+        result.update(_run_pipeline(meter_data, temperature_data, settings))
+    except Exception as e:
+        result["error"] = "{}: {}".format(type(e).__name__, e)
+    finally:
+        profiler.stop()
+    if _profiling(settings):
+        result["profile"] = profiler.json()
+    return result
+
+
+@cli.command()
+@click.option(
+    "--manifest",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="CSV or JSON Lines file with meter_file, temperature_file and, "
+    "optionally, id, fit_cdd, baseline_start and baseline_end for each meter.",
+)
+@click.option(
+    "--meter-glob",
+    default=None,
+    type=str,
+    help="Glob pattern of meter data files, used with --temperature-file.",
+)
+@click.option(
+    "--temperature-file",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Temperature data file for all meters matched by --meter-glob.",
+)
+@click.option(
+    "--output-file",
+    required=True,
+    type=click.Path(dir_okay=False),
+    help="JSON Lines file to which results are appended as they finish.",
+)
+@click.option("--workers", default=1, type=click.IntRange(min=1))
+@click.option(
+    "--resume/--no-resume",
+    default=True,
+    is_flag=True,
+    help="Skip meters already in the output file (default) or overwrite it.",
+)
+@_pipeline_options
+def batch(
+    manifest, meter_glob, temperature_file, output_file, workers, resume, **kwargs
+):
+    """Fit CalTRACK models for many meters.
+
+    Each line of the output file is a JSON object with the ``id``,
+    ``meter_file`` and ``temperature_file`` of a meter and either
+    ``model_results`` (and ``data_sufficiency``, if requested) or ``error``,
+    plus the ``profile`` of the meter if profiling.
+    Lines are written as soon as each fit finishes, in completion order, so an
+    interrupted batch can be resumed by running the same command again. On
+    resume, meters with an ``error`` are retried and their lines replaced.
+    """
+    settings = _pipeline_settings(**kwargs)
+    if (manifest is None) == (meter_glob is None):
+        raise click.ClickException("Specify exactly one of --manifest or --meter-glob.")
+    if manifest is not None:
+        items = _read_manifest(manifest)
+    else:
+        items = _glob_items(meter_glob, temperature_file)
+
+    if resume:
+        completed, errored = _read_completed_ids(output_file)
+    else:
+        completed, errored = set(), set()
+    pending = [item for item in items if item["id"] not in completed]
+    n_retried = sum(item["id"] in errored for item in pending)
+
+    n_errors = 0
+    profiler = Profiler()
+    with open(output_file, "a" if resume else "w") as f:
+
+        def _write(result):
+            if "profile" in result:
+                profiler.update(result["profile"])
+            f.write(json.dumps(result) + "\n")
+            f.flush()
+
+        if workers == 1:
+            results = (_fit_batch_item(item, settings) for item in pending)
+            for result in results:
+                n_errors += "error" in result
+                _write(result)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(_fit_batch_item, item, settings): item
+                    for item in pending
+                }
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool as e:
+                        # a worker died, so this and all remaining meters
+                        # fail; they are retried when the batch is resumed
+                        item = futures[future]
+                        result = {
+                            "id": item["id"],
+                            "meter_file": item["meter_file"],
+                            "temperature_file": item["temperature_file"],
+                            "error": "{}: {}".format(type(e).__name__, e),
+                        }
+                    n_errors += "error" in result
+                    _write(result)
+
+    click.echo(
+        "Fit {} meters ({} errors, {} already complete, {} retried after errors)."
+        " Output written: {}".format(
+            len(pending),
+            n_errors,
+            len(items) - len(pending),
+            n_retried,
+            output_file,
+        )
+    )
+    if _profiling(settings):
+        _report_profile(profiler, settings)
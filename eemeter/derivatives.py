@@ -17,9 +17,8 @@
    limitations under the License.
 
 """
-from scipy.stats import t
-
 from .caltrack.usage_per_day import CalTRACKUsagePerDayModelResults
+from .profiling import profiled
 
 
 __all__ = ("metered_savings", "modeled_savings")
@@ -96,6 +95,8 @@ def _compute_error_bands_metered_savings(
 
     degrees_of_freedom = float(base_obs - num_parameters)
     single_tailed_confidence_level = 1 - ((1 - confidence_level) / 2)
+    from scipy.stats import t
+
     t_stat = t.ppf(single_tailed_confidence_level, degrees_of_freedom)
 
     rmse_base_residuals = float(totals_metrics.rmse_adj)
@@ -153,6 +154,7 @@ def _compute_error_bands_metered_savings(
     }
 
 
+@profiled
 def metered_savings(
     baseline_model,
     reporting_meter_data,
@@ -301,6 +303,8 @@ def _compute_error_bands_modeled_savings(
     degrees_of_freedom_baseline = float(base_obs_baseline - num_parameters_baseline)
     degrees_of_freedom_reporting = float(base_obs_reporting - num_parameters_reporting)
     single_tailed_confidence_level = 1 - ((1 - confidence_level) / 2)
+    from scipy.stats import t
+
     t_stat_baseline = t.ppf(single_tailed_confidence_level, degrees_of_freedom_baseline)
     t_stat_reporting = t.ppf(
         single_tailed_confidence_level, degrees_of_freedom_reporting
@@ -378,6 +382,7 @@ def _compute_error_bands_modeled_savings(
     }
 
 
+@profiled
 def modeled_savings(
     baseline_model,
     reporting_model,
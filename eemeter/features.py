@@ -17,13 +17,13 @@
    limitations under the License.
 
 """
+from .profiling import profiled
 from .warnings import EEMeterWarning
-from .transform import day_counts, overwrite_partial_rows_with_nan
+from .transform import _day_chunk_starts, day_counts, overwrite_partial_rows_with_nan
 from .segmentation import iterate_segmented_dataset
 
 import numpy as np
 import pandas as pd
-import statsmodels.formula.api as smf
 
 
 __all__ = (
@@ -39,6 +39,14 @@ __all__ = (
 )
 
 
+def _astype_float_columns(df, dtype):
+    # only floating point columns: counts, categories and flags keep their dtypes
+    return df.astype(
+        {column: dtype for column, kind in df.dtypes.items() if kind.kind == "f"}
+    )
+
+
+@profiled
 def merge_features(features, keep_partial_nan_rows=False):
     """
     Combine dataframes of features which share a datetime index.
@@ -70,6 +78,7 @@ def merge_features(features, keep_partial_nan_rows=False):
     return df
 
 
+@profiled
 def compute_usage_per_day_feature(meter_data, series_name="usage_per_day"):
     """Compute average usage per day for billing/daily data.
 
@@ -117,6 +126,7 @@ def get_missing_hours_of_week_warning(hours_of_week):
         )
 
 
+@profiled
 def compute_time_features(index, hour_of_week=True, day_of_week=True, hour_of_day=True):
     """Compute hour of week, day of week, or hour of day features.
 
@@ -299,6 +309,128 @@ def _degree_day_columns(
     return agg_funcs
 
 
+def _daily_temperature_summaries(
+    meter_data_index,
+    temperature_data,
+    tolerance=None,
+    percent_hourly_coverage_per_day=0.5,
+    percent_hourly_coverage_per_billing_period=0.9,
+):
+    # Vectorized version of the temperature grouping and aggregation done by
+    # compute_temperature_features with degree_day_method='daily' and
+    # data_quality=True. Instead of degree day columns, returns the daily mean
+    # temperatures that _degree_day_columns would average over, as the row
+    # positions and values of all kept days, so that any hdd_<bp> or cdd_<bp>
+    # column is the per-row mean of max(bp - value, 0) or max(value - bp, 0).
+    n_rows = len(meter_data_index)
+    temperatures = temperature_data.to_numpy(dtype=float)
+
+    # match each temperature to the closest previous meter period start, up
+    # to tolerance, as with merge_asof in _matching_groups
+    times = temperature_data.index.asi8
+    starts = meter_data_index.asi8
+    positions = np.searchsorted(starts, times, side="right") - 1
+    matched = positions >= 0
+    if tolerance is not None:
+        matched &= times - starts[np.maximum(positions, 0)] <= tolerance.value
+    positions = positions[matched]
+    temperatures = temperatures[matched]
+    not_null = ~np.isnan(temperatures)
+    values = np.where(not_null, temperatures, 0.0)
+
+    count = np.bincount(positions, minlength=n_rows)
+    count_not_null = np.bincount(positions, weights=not_null, minlength=n_rows)
+    total = np.bincount(positions, weights=values, minlength=n_rows)
+
+    # split each period into consecutive 24-hour days from its first matched
+    # temperature
+    ranks = np.arange(len(positions)) - np.searchsorted(positions, positions)
+    days = ranks // 24
+    new_day = np.ones(len(positions), dtype=bool)
+    new_day[1:] = (np.diff(positions) != 0) | (np.diff(days) != 0)
+    day_ids = np.cumsum(new_day) - 1
+    day_positions = positions[new_day]
+    day_count_not_null = np.bincount(day_ids, weights=not_null)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        day_means = np.bincount(day_ids, weights=values) / day_count_not_null
+
+    # CalTRACK 2.2.2.3 and 2.2.3.2
+    n_limit_daily = 24 * percent_hourly_coverage_per_day
+    period_count = count[day_positions]
+    multiple_days = period_count > 24
+    period_covered = (
+        count_not_null[day_positions]
+        >= percent_hourly_coverage_per_billing_period * period_count
+    )
+    kept = np.where(
+        multiple_days,
+        period_covered & (day_count_not_null > n_limit_daily),
+        period_count > n_limit_daily,
+    )
+    n_days_total = np.bincount(day_positions, minlength=n_rows)
+    n_days_kept = np.bincount(day_positions, weights=kept, minlength=n_rows)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        summaries = pd.DataFrame(
+            {
+                "temperature_not_null": count_not_null,
+                "temperature_null": count - count_not_null,
+                "temperature_mean": total / count_not_null,
+                "n_days_kept": n_days_kept,
+                "n_days_dropped": n_days_total - n_days_kept,
+            },
+            index=meter_data_index.rename(None),
+            dtype=float,
+        )
+    # periods without any matched temperatures
+    summaries.loc[count == 0, :] = np.nan
+    return summaries, day_positions[kept], day_means[kept]
+
+
+def _compute_temperature_features_chunked(
+    meter_data_index, temperature_data, chunk_days, **kwargs
+):
+    # Each meter period only gets temperatures from its start up to the start
+    # of the next period, so each chunk of periods is computed with the start
+    # of the following period, which is dropped again as the nan last row,
+    # and only the temperatures between its first start and that start.
+    starts = _day_chunk_starts(meter_data_index, chunk_days)
+    positions = meter_data_index.searchsorted(starts)
+    stops = list(positions[1:]) + [len(meter_data_index)]
+    temperature_positions = temperature_data.index.searchsorted(meter_data_index)
+
+    chunks = []
+    for i, j in zip(positions, stops):
+        if i == j:
+            continue  # no meter periods start in this chunk
+        if j < len(meter_data_index):
+            index = meter_data_index[i : j + 1]
+            temperatures = temperature_data.iloc[
+                temperature_positions[i] : temperature_positions[j]
+            ]
+            chunks.append(
+                compute_temperature_features(index, temperatures, **kwargs).iloc[:-1]
+            )
+        else:
+            index = meter_data_index[i:]
+            temperatures = temperature_data.iloc[temperature_positions[i] :]
+            chunks.append(compute_temperature_features(index, temperatures, **kwargs))
+
+    # chunks in which no temperatures match any meter period only get
+    # placeholder n_days_dropped and n_days_kept columns, which the full data
+    # only gets if that is the case for all chunks.
+    matched_chunks = [
+        chunk
+        for chunk in chunks
+        if list(chunk.columns[-2:]) != ["n_days_dropped", "n_days_kept"]
+    ]
+    columns = (matched_chunks or chunks)[0].columns
+    df = pd.concat(chunks).reindex(columns=columns)
+    df.index = meter_data_index.rename(df.index.name)
+    return df
+
+
+@profiled
 def compute_temperature_features(
     meter_data_index,
     temperature_data,
@@ -312,6 +444,8 @@ def compute_temperature_features(
     use_mean_daily_values=True,
     tolerance=None,
     keep_partial_nan_rows=False,
+    dtype=None,
+    chunk_days=None,
 ):
     """Compute temperature features from hourly temperature data using the
     :any:`pandas.DatetimeIndex` meter data..
@@ -379,12 +513,39 @@ def compute_temperature_features(
         If True, keeps data in resultant :any:`pandas.DataFrame` that has
         missing temperature or meter data. Otherwise, these rows are overwritten
         entirely with ``numpy.nan`` values.
+    dtype : :any:`str` or :any:`numpy.dtype`, optional
+        If given, e.g., ``'float32'``, store floating point features with this
+        dtype instead of float64 to reduce memory use. See
+        :ref:`reduced-precision` for accuracy bounds.
+    chunk_days : :any:`int`, optional
+        If given, compute features for the meter periods starting in each
+        chunk of this many days separately, so that intermediate data is
+        proportional to the chunk size instead of the length of the data.
+        The result is the same as without chunks.
 
     Returns
     -------
     data : :any:`pandas.DataFrame`
         A dataset with the specified parameters.
     """
+    if chunk_days is not None and len(meter_data_index) > 0:
+        return _compute_temperature_features_chunked(
+            meter_data_index,
+            temperature_data,
+            chunk_days,
+            heating_balance_points=heating_balance_points,
+            cooling_balance_points=cooling_balance_points,
+            data_quality=data_quality,
+            temperature_mean=temperature_mean,
+            degree_day_method=degree_day_method,
+            percent_hourly_coverage_per_day=percent_hourly_coverage_per_day,
+            percent_hourly_coverage_per_billing_period=percent_hourly_coverage_per_billing_period,
+            use_mean_daily_values=use_mean_daily_values,
+            tolerance=tolerance,
+            keep_partial_nan_rows=keep_partial_nan_rows,
+            dtype=dtype,
+        )
+
     if temperature_data.index.freq != "H":
         raise ValueError(
             "temperature_data.index must have hourly frequency (freq='H')."
@@ -447,6 +608,8 @@ def compute_temperature_features(
 
     if freq_timedelta == pd.Timedelta("1H"):
         # special fast route for hourly data.
+        if dtype is not None:
+            temperature_data = temperature_data.astype(dtype)
         df = temperature_data.to_frame("temperature_mean").reindex(meter_data_index)
 
         if use_mean_daily_values:
@@ -545,10 +708,14 @@ def compute_temperature_features(
 
     # nan last row
     df = df.iloc[:-1].reindex(df.index)
+    if dtype is not None:
+        df = _astype_float_columns(df, dtype)
     return df
 
 
 def _estimate_hour_of_week_occupancy(model_data, threshold):
+    import statsmodels.formula.api as smf
+
     index = pd.CategoricalIndex(range(168))
     if model_data.dropna().empty:
         return pd.Series(np.nan, index=index, name="occupancy")
@@ -582,6 +749,7 @@ def _estimate_hour_of_week_occupancy(model_data, threshold):
     )  # guarantee an index value for all hours
 
 
+@profiled
 def estimate_hour_of_week_occupancy(data, segmentation=None, threshold=0.65):
     """Estimate occupancy features for each segment.
 
@@ -680,6 +848,7 @@ def _fit_temperature_bins(temperature_data, default_bins, min_temperature_count)
     return sorted(test_bins)
 
 
+@profiled
 def fit_temperature_bins(
     data,
     segmentation=None,
@@ -811,7 +980,8 @@ def fit_temperature_bins(
 
 
 # TODO(philngo): combine with compute_temperature_features?
-def compute_temperature_bin_features(temperatures, bin_endpoints):
+@profiled
+def compute_temperature_bin_features(temperatures, bin_endpoints, dtype=None):
     """Compute temperature bin features.
 
     Parameters
@@ -820,6 +990,10 @@ def compute_temperature_bin_features(temperatures, bin_endpoints):
         Hourly temperature data.
     bin_endpoints : :any:`list` of :any:`int` or :any:`float`
         List of bin endpoints to use when assigning features.
+    dtype : :any:`str` or :any:`numpy.dtype`, optional
+        If given, e.g., ``'float32'``, compute and store the bin features with
+        this dtype instead of float64. See :ref:`reduced-precision` for
+        accuracy bounds.
 
     Returns
     -------
@@ -828,6 +1002,9 @@ def compute_temperature_bin_features(temperatures, bin_endpoints):
         row (with all of the temperature bins) equals the input temperature. More
         details on this bin feature are available in the CalTRACK documentation.
     """
+    if dtype is None:
+        dtype = float
+    values = temperatures.to_numpy(dtype=dtype)
     bin_endpoints = [-np.inf] + bin_endpoints + [np.inf]
 
     bins = {}
@@ -836,34 +1013,22 @@ def compute_temperature_bin_features(temperatures, bin_endpoints):
 
         bin_name = "bin_{}".format(i)
 
-        in_bin = (temperatures > left_bin) & (temperatures <= right_bin)
-        gt_bin = temperatures > right_bin
-
-        not_in_bin_index = temperatures.index[~in_bin]
-        gt_bin_index = temperatures.index[gt_bin]
-
-        def _expand_and_fill(partial_temp_series):
-            return partial_temp_series.reindex(temperatures.index, fill_value=0)
-
-        def _mask_nans(temp_series):
-            return temp_series[temperatures.notnull()].reindex(temperatures.index)
-
+        # the first bin is the temperature itself, capped at its right endpoint;
+        # each other bin is the part of the temperature above its left endpoint,
+        # capped at the width of the bin. NaN temperatures stay NaN.
         if i == 0:
-            temps_in_bin = _expand_and_fill(temperatures[in_bin])
-            temps_out_of_bin = _expand_and_fill(
-                pd.Series(right_bin, index=not_in_bin_index)
-            )
-            bin_values = temps_in_bin + temps_out_of_bin
+            bin_values = np.minimum(values, values.dtype.type(right_bin))
         else:
-            temps_in_bin = _expand_and_fill(temperatures[in_bin] - left_bin)
-            temps_gt_bin = _expand_and_fill(
-                pd.Series(right_bin - left_bin, index=gt_bin_index)
+            bin_values = np.clip(
+                values - values.dtype.type(left_bin),
+                0,
+                values.dtype.type(right_bin - left_bin),
             )
-            bin_values = temps_in_bin + temps_gt_bin
-        bins[bin_name] = _mask_nans(bin_values)
-    return pd.DataFrame(bins)
+        bins[bin_name] = bin_values
+    return pd.DataFrame(bins, index=temperatures.index)
 
 
+@profiled
 def compute_occupancy_feature(hour_of_week, occupancy):
     """Given an hour of week feature, determine the occupancy for that hour of week.
 
@@ -17,19 +17,51 @@
    limitations under the License.
 
 """
+import json
+import os
+import tempfile
+import uuid
+
 import numpy as np
 import pandas as pd
 
 __all__ = (
+    "TemperatureStore",
+    "iterate_meter_data_from_long_csv",
+    "iterate_meter_data_from_long_parquet",
     "meter_data_from_csv",
+    "meter_data_from_feather",
     "meter_data_from_json",
+    "meter_data_from_parquet",
     "meter_data_to_csv",
+    "meter_data_to_feather",
+    "meter_data_to_long_csv",
+    "meter_data_to_long_parquet",
+    "meter_data_to_parquet",
     "temperature_data_from_csv",
+    "temperature_data_from_feather",
     "temperature_data_from_json",
+    "temperature_data_from_parquet",
     "temperature_data_to_csv",
+    "temperature_data_to_feather",
+    "temperature_data_to_parquet",
 )
 
 
+def _set_datetime_index(df, date_col, date_format):
+    # Parse date_col once into a UTC index. Letting read_csv parse dates and
+    # converting to UTC afterwards parses every timestamp twice, and falls
+    # back to slow per-row parsing when offsets are present.
+    index = pd.to_datetime(df[date_col], utc=True, format=date_format)
+    df = df.drop(columns=[date_col])
+    df.index = pd.DatetimeIndex(index, name=date_col)
+
+    # for pandas<0.24, which doesn't localize even with utc=True
+    if df.index.tz is None:
+        df.index = df.index.tz_localize("UTC")  # pragma: no cover
+    return df
+
+
 def meter_data_from_csv(
     filepath_or_buffer,
     tz=None,
@@ -37,6 +69,7 @@ def meter_data_from_csv(
     value_col="value",
     gzipped=False,
     freq=None,
+    date_format=None,
     **kwargs
 ):
     """Load meter data from a CSV file.
@@ -62,6 +95,11 @@ def meter_data_from_csv(
         Whether file is gzipped.
     freq : :any:`str`, optional
         If given, apply frequency to data using :any:`pandas.DataFrame.resample`.
+    date_format : :any:`str`, optional
+        A :any:`datetime.datetime.strptime` format for the ``start_col``
+        timestamps, e.g., ``'%Y-%m-%d %H:%M:%S%z'``. If not given, ISO 8601
+        timestamps like those in the default format are parsed with a fast
+        vectorized parser and other formats are inferred.
     **kwargs
         Extra keyword arguments to pass to :any:`pandas.read_csv`, such as
         ``sep='|'``.
@@ -70,8 +108,6 @@ def meter_data_from_csv(
     read_csv_kwargs = {
         "usecols": [start_col, value_col],
         "dtype": {value_col: np.float64},
-        "parse_dates": [start_col],
-        "index_col": start_col,
     }
 
     if gzipped:
@@ -81,11 +117,7 @@ def meter_data_from_csv(
     read_csv_kwargs.update(kwargs)
 
     df = pd.read_csv(filepath_or_buffer, **read_csv_kwargs)
-    df.index = pd.to_datetime(df.index, utc=True)
-
-    # for pandas<0.24, which doesn't localize even with utc=True
-    if df.index.tz is None:
-        df.index = df.index.tz_localize("UTC")  # pragma: no cover
+    df = _set_datetime_index(df, start_col, date_format)
 
     if tz is not None:
         df = df.tz_convert(tz)
@@ -105,6 +137,7 @@ def temperature_data_from_csv(
     temp_col="tempF",
     gzipped=False,
     freq=None,
+    date_format=None,
     **kwargs
 ):
     """Load temperature data from a CSV file.
@@ -130,6 +163,11 @@ def temperature_data_from_csv(
         Whether file is gzipped.
     freq : :any:`str`, optional
         If given, apply frequency to data using :any:`pandas.Series.resample`.
+    date_format : :any:`str`, optional
+        A :any:`datetime.datetime.strptime` format for the ``date_col``
+        timestamps, e.g., ``'%Y-%m-%d %H:%M:%S%z'``. If not given, ISO 8601
+        timestamps like those in the default format are parsed with a fast
+        vectorized parser and other formats are inferred.
     **kwargs
         Extra keyword arguments to pass to :any:`pandas.read_csv`, such as
         ``sep='|'``.
@@ -137,8 +175,6 @@ def temperature_data_from_csv(
     read_csv_kwargs = {
         "usecols": [date_col, temp_col],
         "dtype": {temp_col: np.float64},
-        "parse_dates": [date_col],
-        "index_col": date_col,
     }
 
     if gzipped:
@@ -148,11 +184,7 @@ def temperature_data_from_csv(
     read_csv_kwargs.update(kwargs)
 
     df = pd.read_csv(filepath_or_buffer, **read_csv_kwargs)
-    df.index = pd.to_datetime(df.index, utc=True)
-
-    # for pandas<0.24, which doesn't localize even with utc=True
-    if df.index.tz is None:
-        df.index = df.index.tz_localize("UTC")  # pragma: no cover
+    df = _set_datetime_index(df, date_col, date_format)
 
     if tz is not None:
         df = df.tz_convert(tz)
@@ -163,6 +195,30 @@ def temperature_data_from_csv(
     return df[temp_col]
 
 
+def _coerce_meter_values(values):
+    # Vectorized float(value), with None for values that can't be converted.
+    # Anything pandas can't parse is retried with float() so that semantics
+    # match the per-row conversion exactly (e.g., for "1_000").
+    values = pd.Series(values, dtype=object)
+    numeric = pd.to_numeric(values, errors="coerce")
+    retry = numeric.isnull() & values.notnull()
+    if retry.any():
+
+        def _to_float(value):
+            try:
+                return float(value)
+            except ValueError:
+                return np.nan
+
+        numeric[retry] = values[retry].map(_to_float)
+    return numeric.astype(float).values
+
+
+def _coerce_estimated_flags(estimated):
+    estimated = pd.Series(estimated, dtype=object)
+    return estimated.isin([True, "true", "True", 1, "1"]).values
+
+
 def meter_data_from_json(data, orient="list"):
     """Load meter data from json.
 
@@ -182,14 +238,32 @@ def meter_data_from_json(data, orient="list"):
             {'start': '2017-03-01T00:00:00+00:00', 'value': 0.46},
         ]
 
+    columns format::
+
+        {
+            'start': [
+                '2017-01-01T00:00:00+00:00',
+                '2017-02-01T00:00:00+00:00',
+                '2017-03-01T00:00:00+00:00',
+            ],
+            'value': [3.5, 0.4, 0.46],
+        }
+
     Parameters
     ----------
-    data : :any:`list`
-        A list of meter data, with each row representing a single record.
+    data : :any:`list` or :any:`dict`
+        A list of meter data, with each row representing a single record, or,
+        for the columns format, a dict of equal length lists.
     orient: :any: `str`
         Format of `data` parameter:
             - `list` (a list of lists, with the first element as start date)
             - `records` (a list of dicts)
+            - `columns` (a dict with ``start``, ``value`` and, optionally,
+              ``estimated`` lists)
+
+        For `records` and `columns`, values that cannot be converted to
+        floats become NaN and ``estimated`` flags are True only for
+        ``True``, ``'true'``, ``'True'``, ``1`` and ``'1'``.
 
     Returns
     -------
@@ -204,6 +278,15 @@ def meter_data_from_json(data, orient="list"):
             {"value": []}, index=pd.DatetimeIndex([], tz="UTC", name="start")
         )
 
+    def _meter_data_dataframe(start, value, estimated=None):
+        if len(start) == 0:
+            return _empty_meter_data_dataframe()
+        columns = {"value": _coerce_meter_values(value)}
+        if estimated is not None:
+            columns["estimated"] = _coerce_estimated_flags(estimated)
+        index = pd.DatetimeIndex(pd.to_datetime(start, utc=True), name="start")
+        return pd.DataFrame(columns, index=index)
+
     if data is None:
         return _empty_meter_data_dataframe()
 
@@ -213,30 +296,17 @@ def meter_data_from_json(data, orient="list"):
         df = df.set_index("start")
         return df
     elif orient == "records":
-
-        def _noneify_meter_data_row(row):
-            value = row["value"]
-            if value is not None:
-                try:
-                    value = float(value)
-                except ValueError:
-                    value = None
-            out_row = {"start": row["start"], "value": value}
-            if "estimated" in row:
-                estimated = row.get("estimated")
-                out_row["estimated"] = estimated in [True, "true", "True", 1, "1"]
-            return out_row
-
-        noneified_data = [_noneify_meter_data_row(row) for row in data]
-        df = pd.DataFrame(noneified_data)
-        if df.empty:
-            return _empty_meter_data_dataframe()
-        df["start"] = pd.to_datetime(df.start, utc=True)
-        df = df.set_index("start")
-        df["value"] = df["value"].astype(float)
-        if "estimated" in df.columns:
-            df["estimated"] = df["estimated"].fillna(False).astype(bool)
-        return df
+        # only gather columns per record; type coercion is vectorized
+        start = [row["start"] for row in data]
+        value = [row["value"] for row in data]
+        estimated = None
+        if any("estimated" in row for row in data):
+            estimated = [row.get("estimated") for row in data]
+        return _meter_data_dataframe(start, value, estimated)
+    elif orient == "columns":
+        return _meter_data_dataframe(
+            data["start"], data["value"], data.get("estimated")
+        )
     else:
         raise ValueError("orientation not recognized.")
 
@@ -304,3 +374,945 @@ def temperature_data_to_csv(temperature_data, path_or_buf):
     if temperature_data.name is None:
         temperature_data.name = "temperature"
     return temperature_data.to_frame().to_csv(path_or_buf, index=True)
+
+
+def _utc_timestamp(value):
+    timestamp = pd.Timestamp(value)
+    if timestamp.tz is None:
+        timestamp = timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC")
+
+
+def _time_range_filters(path, time_col, start, end):
+    # pyarrow filters selecting start <= time_col < end; row groups whose
+    # statistics fall outside of the range are skipped without being read.
+    # pyarrow only compares timestamps of the same timezone, so the bounds
+    # are cast to the timezone of the column (naive UTC for naive columns).
+    if start is None and end is None:
+        return None
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    column_type = pq.read_schema(path).field(time_col).type
+    if not pa.types.is_timestamp(column_type):
+        return None  # rows are filtered after reading
+
+    def _bound(value):
+        timestamp = _utc_timestamp(value)
+        if column_type.tz is None:
+            return timestamp.tz_localize(None)
+        return timestamp.tz_convert(column_type.tz)
+
+    filters = []
+    if start is not None:
+        filters.append((time_col, ">=", _bound(start)))
+    if end is not None:
+        filters.append((time_col, "<", _bound(end)))
+    return filters
+
+
+def _read_columnar(fmt, path, time_col, columns, start, end, **kwargs):
+    # Read the projected columns of a parquet or feather file into a
+    # DataFrame with a UTC DatetimeIndex, keeping start <= index < end.
+    columns = [time_col] + columns
+    if fmt == "parquet":
+        df = pd.read_parquet(
+            path,
+            columns=columns,
+            filters=_time_range_filters(path, time_col, start, end),
+            **kwargs
+        )
+    else:
+        df = pd.read_feather(path, columns=columns, **kwargs)
+
+    index = pd.DatetimeIndex(df[time_col])
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    else:
+        index = index.tz_convert("UTC")
+    df = df.drop(columns=[time_col])
+    df.index = index.rename(time_col)
+
+    # feather files have no row groups to skip, and parquet filters are only
+    # applied to row groups by some pyarrow versions, so filter rows here too.
+    if start is not None or end is not None:
+        mask = np.ones(len(df), dtype=bool)
+        if start is not None:
+            mask &= df.index >= _utc_timestamp(start)
+        if end is not None:
+            mask &= df.index < _utc_timestamp(end)
+        if not mask.all():
+            df = df[mask]
+    return df
+
+
+def _meter_data_from_columnar(
+    fmt, path, tz, start_col, value_col, estimated_col, start, end, freq, **kwargs
+):
+    columns = [value_col]
+    if estimated_col is not None:
+        columns.append(estimated_col)
+    df = _read_columnar(fmt, path, start_col, columns, start, end, **kwargs)
+    df = df.rename(columns={value_col: "value"})
+    df["value"] = df["value"].astype(np.float64)
+    if estimated_col is not None:
+        df = df.rename(columns={estimated_col: "estimated"})
+        df["estimated"] = df["estimated"].fillna(False).astype(bool)
+    df.index.name = "start"
+
+    if tz is not None:
+        df = df.tz_convert(tz)
+
+    if freq == "hourly":
+        df = df.resample("H").sum(min_count=1)
+    elif freq == "daily":
+        df = df.resample("D").sum(min_count=1)
+
+    return df
+
+
+def _temperature_data_from_columnar(
+    fmt, path, tz, date_col, temp_col, start, end, freq, **kwargs
+):
+    df = _read_columnar(fmt, path, date_col, [temp_col], start, end, **kwargs)
+    df[temp_col] = df[temp_col].astype(np.float64)
+
+    if tz is not None:
+        df = df.tz_convert(tz)
+
+    if freq == "hourly":
+        df = df.resample("H").sum(min_count=1)
+
+    return df[temp_col]
+
+
+def _meter_data_frame(meter_data):
+    if meter_data.index.name is None:
+        meter_data.index.name = "start"
+    return meter_data.reset_index()
+
+
+def _temperature_data_frame(temperature_data):
+    if temperature_data.index.name is None:
+        temperature_data.index.name = "dt"
+    if temperature_data.name is None:
+        temperature_data.name = "temperature"
+    return temperature_data.to_frame().reset_index()
+
+
+def meter_data_from_parquet(
+    path,
+    tz=None,
+    start_col="start",
+    value_col="value",
+    estimated_col=None,
+    start=None,
+    end=None,
+    freq=None,
+    **kwargs
+):
+    """Load meter data from a Parquet file. Requires ``pyarrow``.
+
+    Only the ``start_col``, ``value_col`` and (if given) ``estimated_col``
+    columns are read. If ``start`` or ``end`` are given, row groups entirely
+    outside of that time range are skipped, so a baseline or reporting window
+    can be read without scanning a whole file.
+
+    Parameters
+    ----------
+    path : :any:`str` or file-handle
+        File path or object.
+    tz : :any:`str`, optional
+        E.g., ``'UTC'`` or ``'US/Pacific'``
+    start_col : :any:`str`, optional, default ``'start'``
+        Date period start column.
+    value_col : :any:`str`, optional, default ``'value'``
+        Value column, can be in any unit.
+    estimated_col : :any:`str`, optional
+        Boolean column flagging estimated reads, if any. Loaded as
+        ``'estimated'``.
+    start : :any:`datetime.datetime`, optional
+        If given, only load rows with ``start_col`` at or after this time.
+        Naive datetimes are interpreted as UTC.
+    end : :any:`datetime.datetime`, optional
+        If given, only load rows with ``start_col`` before this time.
+        Naive datetimes are interpreted as UTC.
+    freq : :any:`str`, optional
+        If given, apply frequency to data using :any:`pandas.DataFrame.resample`.
+    **kwargs
+        Extra keyword arguments to pass to :any:`pandas.read_parquet`.
+
+    Returns
+    -------
+    df : :any:`pandas.DataFrame`
+        DataFrame with a ``'value'`` column (and an ``'estimated'`` column if
+        ``estimated_col`` is given) and a :any:`pandas.DatetimeIndex`.
+    """
+    return _meter_data_from_columnar(
+        "parquet",
+        path,
+        tz,
+        start_col,
+        value_col,
+        estimated_col,
+        start,
+        end,
+        freq,
+        **kwargs
+    )
+
+
+def meter_data_from_feather(
+    path,
+    tz=None,
+    start_col="start",
+    value_col="value",
+    estimated_col=None,
+    start=None,
+    end=None,
+    freq=None,
+    **kwargs
+):
+    """Load meter data from an Arrow IPC (Feather) file. Requires ``pyarrow``.
+
+    Parameters are the same as :any:`eemeter.meter_data_from_parquet`. Feather
+    files have no row groups, so ``start`` and ``end`` are applied after the
+    projected columns are read (which is cheap, as feather files are memory
+    mapped).
+
+    Returns
+    -------
+    df : :any:`pandas.DataFrame`
+        DataFrame with a ``'value'`` column (and an ``'estimated'`` column if
+        ``estimated_col`` is given) and a :any:`pandas.DatetimeIndex`.
+    """
+    return _meter_data_from_columnar(
+        "feather",
+        path,
+        tz,
+        start_col,
+        value_col,
+        estimated_col,
+        start,
+        end,
+        freq,
+        **kwargs
+    )
+
+
+def temperature_data_from_parquet(
+    path,
+    tz=None,
+    date_col="dt",
+    temp_col="tempF",
+    start=None,
+    end=None,
+    freq=None,
+    **kwargs
+):
+    """Load temperature data from a Parquet file. Requires ``pyarrow``.
+
+    Parameters
+    ----------
+    path : :any:`str` or file-handle
+        File path or object.
+    tz : :any:`str`, optional
+        E.g., ``'UTC'`` or ``'US/Pacific'``
+    date_col : :any:`str`, optional, default ``'dt'``
+        Date period start column.
+    temp_col : :any:`str`, optional, default ``'tempF'``
+        Temperature column.
+    start : :any:`datetime.datetime`, optional
+        If given, only load rows with ``date_col`` at or after this time.
+        Naive datetimes are interpreted as UTC.
+    end : :any:`datetime.datetime`, optional
+        If given, only load rows with ``date_col`` before this time.
+        Naive datetimes are interpreted as UTC.
+    freq : :any:`str`, optional
+        If given, apply frequency to data using :any:`pandas.Series.resample`.
+    **kwargs
+        Extra keyword arguments to pass to :any:`pandas.read_parquet`.
+
+    Returns
+    -------
+    series : :any:`pandas.Series`
+        Series named ``temp_col`` with a :any:`pandas.DatetimeIndex`.
+    """
+    return _temperature_data_from_columnar(
+        "parquet", path, tz, date_col, temp_col, start, end, freq, **kwargs
+    )
+
+
+def temperature_data_from_feather(
+    path,
+    tz=None,
+    date_col="dt",
+    temp_col="tempF",
+    start=None,
+    end=None,
+    freq=None,
+    **kwargs
+):
+    """Load temperature data from an Arrow IPC (Feather) file. Requires
+    ``pyarrow``.
+
+    Parameters are the same as :any:`eemeter.temperature_data_from_parquet`.
+
+    Returns
+    -------
+    series : :any:`pandas.Series`
+        Series named ``temp_col`` with a :any:`pandas.DatetimeIndex`.
+    """
+    return _temperature_data_from_columnar(
+        "feather", path, tz, date_col, temp_col, start, end, freq, **kwargs
+    )
+
+
+def meter_data_to_parquet(meter_data, path, row_group_size=None, **kwargs):
+    """Write meter data to Parquet. Requires ``pyarrow``. See also
+    :any:`pandas.DataFrame.to_parquet`.
+
+    Parameters
+    ----------
+    meter_data : :any:`pandas.DataFrame`
+        Meter data DataFrame with ``'value'`` column and
+        :any:`pandas.DatetimeIndex`.
+    path : :any:`str` or file handle
+        File path or object.
+    row_group_size : :any:`int`, optional
+        Number of rows per row group. Smaller row groups make time range
+        filtering in :any:`eemeter.meter_data_from_parquet` more selective.
+    **kwargs
+        Extra keyword arguments to pass to :any:`pandas.DataFrame.to_parquet`.
+    """
+    df = _meter_data_frame(meter_data.sort_index())
+    df.to_parquet(
+        path, engine="pyarrow", index=False, row_group_size=row_group_size, **kwargs
+    )
+
+
+def meter_data_to_feather(meter_data, path, **kwargs):
+    """Write meter data to Arrow IPC (Feather). Requires ``pyarrow``. See also
+    :any:`pandas.DataFrame.to_feather`.
+
+    Parameters
+    ----------
+    meter_data : :any:`pandas.DataFrame`
+        Meter data DataFrame with ``'value'`` column and
+        :any:`pandas.DatetimeIndex`.
+    path : :any:`str` or file handle
+        File path or object.
+    **kwargs
+        Extra keyword arguments to pass to :any:`pandas.DataFrame.to_feather`.
+    """
+    _meter_data_frame(meter_data.sort_index()).to_feather(path, **kwargs)
+
+
+def temperature_data_to_parquet(temperature_data, path, row_group_size=None, **kwargs):
+    """Write temperature data to Parquet. Requires ``pyarrow``. See also
+    :any:`pandas.DataFrame.to_parquet`.
+
+    Parameters
+    ----------
+    temperature_data : :any:`pandas.Series`
+        Temperature data series with :any:`pandas.DatetimeIndex`.
+    path : :any:`str` or file handle
+        File path or object.
+    row_group_size : :any:`int`, optional
+        Number of rows per row group. Smaller row groups make time range
+        filtering in :any:`eemeter.temperature_data_from_parquet` more
+        selective.
+    **kwargs
+        Extra keyword arguments to pass to :any:`pandas.DataFrame.to_parquet`.
+    """
+    df = _temperature_data_frame(temperature_data.sort_index())
+    df.to_parquet(
+        path, engine="pyarrow", index=False, row_group_size=row_group_size, **kwargs
+    )
+
+
+def temperature_data_to_feather(temperature_data, path, **kwargs):
+    """Write temperature data to Arrow IPC (Feather). Requires ``pyarrow``. See
+    also :any:`pandas.DataFrame.to_feather`.
+
+    Parameters
+    ----------
+    temperature_data : :any:`pandas.Series`
+        Temperature data series with :any:`pandas.DatetimeIndex`.
+    path : :any:`str` or file handle
+        File path or object.
+    **kwargs
+        Extra keyword arguments to pass to :any:`pandas.DataFrame.to_feather`.
+    """
+    _temperature_data_frame(temperature_data.sort_index()).to_feather(path, **kwargs)
+
+
+def _long_meter_data_frame(df, meter_id_col, start_col, value_col, estimated_col):
+    # Normalize one chunk of long-format meter data to columns meter_id,
+    # start (UTC), value and, optionally, estimated.
+    meter_ids = df[meter_id_col]
+    if meter_ids.isnull().any():
+        raise ValueError(
+            "Found {} rows with a missing {!r}. Every row of long-format meter"
+            " data needs a meter id.".format(
+                int(meter_ids.isnull().sum()), meter_id_col
+            )
+        )
+    data = {
+        "meter_id": meter_ids.to_numpy(),
+        "value": df[value_col].to_numpy(dtype=np.float64),
+    }
+    if estimated_col is not None:
+        data["estimated"] = df[estimated_col].fillna(False).astype(bool).to_numpy()
+    index = pd.DatetimeIndex(pd.to_datetime(df[start_col], utc=True), name="start")
+    return pd.DataFrame(data, index=index)
+
+
+def _split_by_meter_id(df):
+    # Split a frame whose rows are grouped by meter id into (meter_id, start,
+    # end) row ranges.
+    meter_ids = df["meter_id"].to_numpy()
+    if len(meter_ids) == 0:
+        return []
+    boundaries = np.flatnonzero(meter_ids[1:] != meter_ids[:-1]) + 1
+    starts = np.concatenate([[0], boundaries])
+    ends = np.concatenate([boundaries, [len(meter_ids)]])
+    return [(meter_ids[s], s, e) for s, e in zip(starts, ends)]
+
+
+def _iterate_long_meter_data(chunks, tz, streaming):
+    # Yield (meter_id, meter_data) pairs from normalized chunks. Without
+    # streaming there is a single chunk, which is sorted by meter id and
+    # start so that each meter's rows can be yielded as a slice of one
+    # frame. When streaming, rows of each meter must be contiguous; a meter
+    # is yielded once the next meter starts, so at most one meter's rows
+    # (plus one chunk) are held at a time.
+    def _meter_data(df):
+        meter_data = df.iloc[:, 1:]
+        if not meter_data.index.is_monotonic_increasing:
+            meter_data = meter_data.sort_index(kind="mergesort")
+        if tz is not None:
+            meter_data = meter_data.tz_convert(tz)
+        return meter_data
+
+    if not streaming:
+        for df in chunks:
+            # sort on integer codes; ids may mix types that don't compare
+            codes, _ = pd.factorize(df["meter_id"], sort=True)
+            order = np.lexsort((df.index.asi8, codes))
+            if (order != np.arange(len(order))).any():
+                df = df.iloc[order]
+            for meter_id, start, end in _split_by_meter_id(df):
+                yield meter_id, _meter_data(df.iloc[start:end])
+        return
+
+    seen = set()
+
+    def _combine(meter_id, frames):
+        if meter_id in seen:
+            raise ValueError(
+                "Rows for meter_id={!r} are not contiguous. Sort the input by"
+                " meter id or load it without chunking.".format(meter_id)
+            )
+        seen.add(meter_id)
+        df = frames[0] if len(frames) == 1 else pd.concat(frames)
+        return meter_id, _meter_data(df)
+
+    pending_meter_id, pending = None, []
+    for df in chunks:
+        for meter_id, start, end in _split_by_meter_id(df):
+            if len(pending) > 0 and meter_id != pending_meter_id:
+                yield _combine(pending_meter_id, pending)
+                pending = []
+            pending_meter_id = meter_id
+            pending.append(df.iloc[start:end])
+    if len(pending) > 0:
+        yield _combine(pending_meter_id, pending)
+
+
+def iterate_meter_data_from_long_csv(
+    filepath_or_buffer,
+    meter_id_col="meter_id",
+    start_col="start",
+    value_col="value",
+    estimated_col=None,
+    tz=None,
+    gzipped=False,
+    chunksize=None,
+    **kwargs
+):
+    """Iterate over the meters in a long-format CSV file containing data
+    for many meters.
+
+    Default format::
+
+        meter_id,start,value
+        METER_1,2017-01-01T00:00:00+00:00,0.31
+        METER_1,2017-01-02T00:00:00+00:00,0.4
+        METER_2,2017-01-01T00:00:00+00:00,1.2
+
+    Without ``chunksize``, the file is read once and sorted by meter id and
+    start, and each meter's data is yielded as a slice of that one frame, in
+    meter id order. With ``chunksize``, the file is read ``chunksize`` rows at
+    a time so that memory use is bounded by the chunk size and the largest
+    meter; rows for each meter must then be contiguous in the file, and
+    meters are yielded in file order.
+
+    Parameters
+    ----------
+    filepath_or_buffer : :any:`str` or file-handle
+        File path or object.
+    meter_id_col : :any:`str`, optional, default ``'meter_id'``
+        Meter identifier column.
+    start_col : :any:`str`, optional, default ``'start'``
+        Date period start column.
+    value_col : :any:`str`, optional, default ``'value'``
+        Value column, can be in any unit.
+    estimated_col : :any:`str`, optional
+        Boolean column flagging estimated reads, if any. Loaded as
+        ``'estimated'``.
+    tz : :any:`str`, optional
+        E.g., ``'UTC'`` or ``'US/Pacific'``
+    gzipped : :any:`bool`, optional
+        Whether file is gzipped.
+    chunksize : :any:`int`, optional
+        If given, stream the file in chunks of this many rows.
+    **kwargs
+        Extra keyword arguments to pass to :any:`pandas.read_csv`, such as
+        ``sep='|'``.
+
+    Yields
+    ------
+    meter_id, meter_data : :any:`tuple` of (:any:`object`, :any:`pandas.DataFrame`)
+        The meter id and its meter data, in the format returned by
+        :any:`eemeter.meter_data_from_csv`.
+    """
+    usecols = [meter_id_col, start_col, value_col]
+    if estimated_col is not None:
+        usecols.append(estimated_col)
+
+    read_csv_kwargs = {
+        "usecols": usecols,
+        "dtype": {value_col: np.float64},
+        "chunksize": chunksize,
+    }
+
+    if gzipped:
+        read_csv_kwargs.update({"compression": "gzip"})
+
+    # allow passing extra kwargs
+    read_csv_kwargs.update(kwargs)
+
+    reader = pd.read_csv(filepath_or_buffer, **read_csv_kwargs)
+    if chunksize is None:
+        reader = [reader]
+
+    chunks = (
+        _long_meter_data_frame(df, meter_id_col, start_col, value_col, estimated_col)
+        for df in reader
+    )
+    return _iterate_long_meter_data(chunks, tz, streaming=chunksize is not None)
+
+
+def iterate_meter_data_from_long_parquet(
+    path,
+    meter_id_col="meter_id",
+    start_col="start",
+    value_col="value",
+    estimated_col=None,
+    tz=None,
+    batch_size=None,
+):
+    """Iterate over the meters in a long-format Parquet file containing data
+    for many meters. Requires ``pyarrow``.
+
+    Parameters and ordering are the same as
+    :any:`eemeter.iterate_meter_data_from_long_csv`, except that
+    ``batch_size`` takes the place of ``chunksize``: if given, record batches
+    of at most this many rows are read one at a time and rows for each meter
+    must be contiguous in the file. Only the needed columns are read.
+
+    Yields
+    ------
+    meter_id, meter_data : :any:`tuple` of (:any:`object`, :any:`pandas.DataFrame`)
+        The meter id and its meter data, in the format returned by
+        :any:`eemeter.meter_data_from_csv`.
+    """
+    columns = [meter_id_col, start_col, value_col]
+    if estimated_col is not None:
+        columns.append(estimated_col)
+
+    if batch_size is None:
+        reader = [pd.read_parquet(path, columns=columns)]
+    else:
+        import pyarrow.parquet as pq
+
+        reader = (
+            batch.to_pandas()
+            for batch in pq.ParquetFile(path).iter_batches(
+                batch_size=batch_size, columns=columns
+            )
+        )
+
+    chunks = (
+        _long_meter_data_frame(df, meter_id_col, start_col, value_col, estimated_col)
+        for df in reader
+    )
+    return _iterate_long_meter_data(chunks, tz, streaming=batch_size is not None)
+
+
+def _long_meter_data_output_frame(meter_id, meter_data, estimated_col):
+    # One meter's data as long-format rows with columns meter_id, start,
+    # value and, optionally, estimated_col.
+    df = pd.DataFrame(
+        {
+            "meter_id": meter_id,
+            "start": meter_data.index.tz_convert("UTC"),
+            "value": meter_data["value"].to_numpy(dtype=np.float64),
+        }
+    )
+    if estimated_col is not None:
+        if "estimated" in meter_data.columns:
+            estimated = meter_data["estimated"].fillna(False).astype(bool)
+            df[estimated_col] = estimated.to_numpy()
+        else:
+            df[estimated_col] = False
+    return df
+
+
+def meter_data_to_long_csv(meters, path_or_buf, estimated_col=None):
+    """Write data for many meters to a long-format CSV file, one meter at a
+    time. The result can be read with
+    :any:`eemeter.iterate_meter_data_from_long_csv`.
+
+    Since each meter is written as soon as it is produced, ``meters`` can be
+    a generator, such as :any:`eemeter.iterate_synthetic_meters`, of any
+    length.
+
+    Parameters
+    ----------
+    meters : iterable of :any:`tuple` of (:any:`object`, :any:`pandas.DataFrame`)
+        Meter ids and meter data with ``'value'`` column and
+        :any:`pandas.DatetimeIndex`.
+    path_or_buf : :any:`str` or file handle
+        File path or object.
+    estimated_col : :any:`str`, optional
+        If given, write each meter's ``'estimated'`` column, if any, to a
+        column with this name, with ``False`` for meters without one.
+    """
+    if isinstance(path_or_buf, str):
+        with open(path_or_buf, "w", newline="") as f:
+            return meter_data_to_long_csv(meters, f, estimated_col=estimated_col)
+
+    header = True
+    for meter_id, meter_data in meters:
+        df = _long_meter_data_output_frame(meter_id, meter_data, estimated_col)
+        df.to_csv(path_or_buf, header=header, index=False)
+        header = False
+
+
+def meter_data_to_long_parquet(meters, path, estimated_col=None, **kwargs):
+    """Write data for many meters to a long-format Parquet file, one meter at
+    a time. Requires ``pyarrow``. The result can be read with
+    :any:`eemeter.iterate_meter_data_from_long_parquet`.
+
+    Each meter is written as soon as it is produced, in its own row groups,
+    so ``meters`` can be a generator, such as
+    :any:`eemeter.iterate_synthetic_meters`, of any length.
+
+    Parameters
+    ----------
+    meters : iterable of :any:`tuple` of (:any:`object`, :any:`pandas.DataFrame`)
+        Meter ids and meter data with ``'value'`` column and
+        :any:`pandas.DatetimeIndex`.
+    path : :any:`str` or file handle
+        File path or object.
+    estimated_col : :any:`str`, optional
+        If given, write each meter's ``'estimated'`` column, if any, to a
+        column with this name, with ``False`` for meters without one.
+    **kwargs
+        Extra keyword arguments to pass to :any:`pyarrow.parquet.ParquetWriter`,
+        such as ``compression``.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for meter_id, meter_data in meters:
+            df = _long_meter_data_output_frame(meter_id, meter_data, estimated_col)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, **kwargs)
+            writer.write_table(table.cast(writer.schema))
+        if writer is None:
+            # no meters, so write an empty file with the same columns
+            empty = pd.DataFrame(
+                {"value": []}, index=pd.DatetimeIndex([], tz="UTC", name="start")
+            )
+            df = _long_meter_data_output_frame("", empty, estimated_col)
+            df.to_parquet(path, engine="pyarrow", index=False, **kwargs)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+_HOUR_NS = 3600 * 10 ** 9
+
+
+def _utc_hour_ceil(value):
+    # hours since the epoch of the first hour at or after value
+    return -(-_utc_timestamp(value).value // _HOUR_NS)
+
+
+class TemperatureStore(object):
+    """A directory of hourly temperature data for many stations, stored as
+    memory-mapped arrays on a fixed hourly UTC grid.
+
+    Each station is stored as one ``.npy`` array of hourly values, with
+    ``NaN`` for missing hours, and the UTC hour of its first value is kept in
+    a small JSON index. Looking up a time range is an offset computation, and
+    :any:`eemeter.TemperatureStore.get` returns a read-only
+    :any:`pandas.Series` view of the memory-mapped array, so no temperature
+    data is parsed or copied.
+
+    Since arrays are memory-mapped, processes reading the same store share
+    one copy of the data in the operating system page cache. Stores can be
+    pickled and sent to worker processes; each process opens the arrays it
+    needs on first use.
+
+    Many processes can read at once, including while one process adds or
+    removes stations: a reader whose index is out of date reloads it and
+    retries, and then returns the new data or raises :any:`KeyError` for a
+    removed station. Series returned before a station was replaced keep
+    their data, and the replaced file is only deleted once no process has it
+    open (on systems that do not allow deleting open files, by a later
+    :any:`eemeter.TemperatureStore.add` or
+    :any:`eemeter.TemperatureStore.remove`). Stations should only be added
+    or removed by one process at a time.
+
+    Parameters
+    ----------
+    directory : :any:`str`
+        Directory in which to store temperature data. Created if it does not
+        exist.
+
+    Examples
+    --------
+
+    >>> store = TemperatureStore('/tmp/eemeter-temperature')  # doctest: +SKIP
+    >>> store.add('722880', temperature_data)  # doctest: +SKIP
+    >>> temperature_data = store.get(
+    ...     '722880', start='2017-01-01', end='2018-01-01'
+    ... )  # doctest: +SKIP
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._index = None
+        self._index_version = None
+        self._arrays = {}
+
+    def __repr__(self):
+        return "TemperatureStore(directory='{}')".format(self.directory)
+
+    def __getstate__(self):
+        # memory maps are reopened in the process the store is unpickled in
+        return {"directory": self.directory}
+
+    def __setstate__(self, state):
+        self.__init__(state["directory"])
+
+    def __contains__(self, station):
+        return str(station) in self._stations()
+
+    def __len__(self):
+        return len(self._stations())
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def _stations(self):
+        # reload the index only if it has been replaced since it was read
+        try:
+            stat = os.stat(self._index_path)
+        except OSError:
+            return {}
+        version = (stat.st_ino, stat.st_mtime_ns)
+        if version != self._index_version:
+            with open(self._index_path) as f:
+                self._index = json.load(f)
+            self._index_version = version
+            # release arrays of stations replaced or removed by any process
+            # so that their files can be deleted
+            files = set(entry["file"] for entry in self._index.values())
+            for filename in list(self._arrays):
+                if filename not in files:
+                    del self._arrays[filename]
+        return self._index
+
+    def _write_index(self, index):
+        # write to a temporary file and move it into place so that concurrent
+        # readers never see a partial index.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(index, f, sort_keys=True)
+            os.replace(tmp_path, self._index_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        self._remove_unused_files(index)
+
+    def _remove_unused_files(self, index):
+        # Delete arrays which are no longer in the index. A file still open in
+        # another process can't be deleted on some systems; it is retried on
+        # the next write.
+        files = set(entry["file"] for entry in index.values())
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".npy") and filename not in files:
+                self._arrays.pop(filename, None)
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except OSError:  # pragma: no cover
+                    pass
+
+    def _values(self, filename):
+        values = self._arrays.get(filename)
+        if values is None:
+            values = np.load(os.path.join(self.directory, filename), mmap_mode="r")
+            self._arrays[filename] = values
+        return values
+
+    def stations(self):
+        """Return the ids of all stations in the store."""
+        return sorted(self._stations())
+
+    def time_range(self, station):
+        """Return the start of the first hour and the end of the last hour
+        stored for a station.
+
+        Parameters
+        ----------
+        station : :any:`str`
+            Station id.
+
+        Returns
+        -------
+        start, end : :any:`tuple` of :any:`pandas.Timestamp`
+            UTC timestamps such that ``store.get(station, start, end)``
+            returns all stored hours.
+        """
+        entry = self._stations()[str(station)]
+        return (
+            pd.Timestamp(entry["start"] * _HOUR_NS, tz="UTC"),
+            pd.Timestamp((entry["start"] + entry["length"]) * _HOUR_NS, tz="UTC"),
+        )
+
+    def add(self, station, temperature_data, dtype="float64"):
+        """Add hourly temperature data for a station, replacing any data
+        already stored for it.
+
+        Parameters
+        ----------
+        station : :any:`str`
+            Station id.
+        temperature_data : :any:`pandas.Series`
+            Temperature data with a timezone-aware :any:`pandas.DatetimeIndex`,
+            e.g., as returned by :any:`eemeter.temperature_data_from_csv`.
+            Values are averaged onto an hourly UTC grid.
+        dtype : :any:`str` or :any:`numpy.dtype`, default ``'float64'``
+            Floating point dtype in which to store the values. ``'float32'``
+            halves the storage needed.
+        """
+        station = str(station)
+        if not temperature_data.index.tz:
+            raise ValueError(
+                "temperature_data.index must be timezone-aware. You can set it with"
+                " temperature_data.tz_localize(...)."
+            )
+        hourly = temperature_data.tz_convert("UTC").resample("H").mean()
+        if hourly.empty:
+            raise ValueError("No temperature data for station {}.".format(station))
+
+        filename = "{}.npy".format(uuid.uuid4().hex)
+        np.save(os.path.join(self.directory, filename), hourly.to_numpy(dtype=dtype))
+        index = dict(self._stations())
+        index[station] = {
+            "file": filename,
+            "start": hourly.index[0].value // _HOUR_NS,
+            "length": len(hourly),
+        }
+        self._write_index(index)
+
+    def remove(self, station):
+        """Remove the data for a station. Returns True if data was removed."""
+        index = dict(self._stations())
+        entry = index.pop(str(station), None)
+        if entry is None:
+            return False
+        self._write_index(index)
+        return True
+
+    def get(self, station, start=None, end=None, tz=None):
+        """Return the hourly temperature data of a station for a time range.
+
+        Parameters
+        ----------
+        station : :any:`str`
+            Station id.
+        start : :any:`datetime.datetime`, optional
+            If given, only return hours at or after this time. Naive datetimes
+            are interpreted as UTC.
+        end : :any:`datetime.datetime`, optional
+            If given, only return hours before this time. Naive datetimes are
+            interpreted as UTC.
+        tz : :any:`str`, optional
+            E.g., ``'US/Pacific'``. If given, convert the index to this
+            timezone. Defaults to UTC.
+
+        Returns
+        -------
+        temperature_data : :any:`pandas.Series`
+            Series named by the station id with an hourly (``'H'``)
+            :any:`pandas.DatetimeIndex`. Values are a read-only view of the
+            memory-mapped array; use ``.copy()`` to modify them. Hours outside
+            of the stored time range are not included.
+
+        Raises
+        ------
+        KeyError
+            If there is no data for the station.
+        """
+        station = str(station)
+        try:
+            return self._get(station, start, end, tz)
+        except (IOError, OSError):
+            # the station was replaced or removed by another process after
+            # the index was read, so reload the index and retry once
+            self._index_version = None
+            return self._get(station, start, end, tz)
+
+    def _get(self, station, start, end, tz):
+        entry = self._stations()[station]
+        first, length = entry["start"], entry["length"]
+
+        i = 0 if start is None else _utc_hour_ceil(start) - first
+        j = length if end is None else _utc_hour_ceil(end) - first
+        i = min(max(i, 0), length)
+        j = min(max(j, i), length)
+
+        index = pd.date_range(
+            start=pd.Timestamp((first + i) * _HOUR_NS, tz="UTC"),
+            periods=j - i,
+            freq="H",
+            name="dt",
+        )
+        if tz is not None:
+            index = index.tz_convert(tz)
+        values = self._values(entry["file"])[i:j]
+        return pd.Series(values, index=index, name=station, copy=False)
@@ -19,9 +19,9 @@
 """
 import numpy as np
 import pandas as pd
-from scipy.stats import t
 
 
+from .profiling import profiled
 from .warnings import EEMeterWarning
 
 __all__ = ("ModelMetrics",)
@@ -162,6 +162,14 @@ class ModelMetricsFromJson(object):
         self.approx_factor_auto_corr_correction = approx_factor_auto_corr_correction
         self.fsu_base_term = fsu_base_term
 
+    def json(self):
+        """Return a JSON-serializable representation of this result.
+
+        The output of this function can be converted to a serialized string
+        with :any:`json.dumps`.
+        """
+        return ModelMetrics.json(self)
+
 
 class ModelMetrics(object):
     """Contains measures of model fit and summary statistics on the input series.
@@ -259,6 +267,7 @@ class ModelMetrics(object):
 
     """
 
+    @profiled
     def __init__(
         self,
         observed_input,
@@ -371,6 +380,8 @@ class ModelMetrics(object):
             self.degrees_of_freedom = None
             self.t_stat = None
         else:
+            from scipy.stats import t
+
             self.degrees_of_freedom = round(self.n_prime - self.num_parameters)
             self.t_stat = t.ppf(
                 self.single_tailed_confidence_level, self.degrees_of_freedom
@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+"""
+import functools
+import threading
+import time
+
+
+__all__ = ("Profiler", "profile_stage", "profiled")
+
+
+# Profilers currently recording. Instrumented functions only check whether
+# this list is empty, so instrumentation costs one function call and one
+# list lookup when profiling is off.
+_active_profilers = []
+
+# Per-thread stack of [stage name, time spent in child stages] for the stages
+# currently running, used to compute own time and to avoid counting the
+# inclusive time of recursive stages twice.
+_local = threading.local()
+
+
+def _stage_stack():
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+def _traced_memory():
+    import tracemalloc
+
+    if not tracemalloc.is_tracing():
+        return None
+    return tracemalloc.get_traced_memory()[0]
+
+
+class Profiler(object):
+    """Records wall time, call counts and, optionally, allocated memory for
+    each instrumented stage of eemeter (design matrix builders, model fits,
+    metrics, predictions, savings and serialization) while active.
+
+    Stages are recorded only while a profiler is active, i.e., inside a
+    ``with Profiler() ...`` block or between :any:`start` and :any:`stop`.
+    Stages run in other threads while the profiler is active are recorded
+    too. For each stage the profiler records:
+
+    - ``calls``: number of calls.
+    - ``total_time``: wall time in seconds including nested stages. Recursive
+      calls are only counted once.
+    - ``own_time``: wall time in seconds excluding nested stages.
+    - ``allocated_bytes``: net change in memory traced by :any:`tracemalloc`
+      during the stage, including nested stages. Only recorded if
+      ``trace_memory=True``. Tracing memory slows down all Python code
+      considerably.
+
+    Parameters
+    ----------
+    trace_memory : :any:`bool`, default False
+        If True, start :any:`tracemalloc` (if not already started) while
+        active and record memory allocated by each stage.
+
+    Examples
+    --------
+
+    >>> with Profiler() as profiler:  # doctest: +SKIP
+    ...     model_results = fit_caltrack_usage_per_day_model(data)
+    >>> print(profiler.summary())  # doctest: +SKIP
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+
+    def __repr__(self):
+        return "Profiler(trace_memory={}, stages={})".format(
+            self.trace_memory, len(self.stages)
+        )
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def active(self):
+        """True if the profiler is recording."""
+        return any(profiler is self for profiler in _active_profilers)
+
+    def start(self):
+        """Start recording stages."""
+        if self.active:
+            return
+        if self.trace_memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+        _active_profilers.append(self)
+
+    def stop(self):
+        """Stop recording stages."""
+        if not self.active:
+            return
+        _active_profilers[:] = [
+            profiler for profiler in _active_profilers if profiler is not self
+        ]
+        if self._started_tracemalloc:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self):
+        """Remove all recorded stages."""
+        with self._lock:
+            self.stages = {}
+
+    def _record(self, name, total_time, own_time, outermost, allocated_bytes):
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = {
+                    "calls": 0,
+                    "total_time": 0.0,
+                    "own_time": 0.0,
+                }
+                if self.trace_memory:
+                    stage["allocated_bytes"] = 0
+            stage["calls"] += 1
+            stage["own_time"] += own_time
+            if outermost:
+                stage["total_time"] += total_time
+                if allocated_bytes is not None and "allocated_bytes" in stage:
+                    stage["allocated_bytes"] += allocated_bytes
+
+    def update(self, other):
+        """Add the stages recorded by another profiler, e.g., one that ran
+        in another process, to this one.
+
+        Parameters
+        ----------
+        other : :any:`eemeter.Profiler` or :any:`dict`
+            A profiler or the output of its :any:`json` method.
+        """
+        if isinstance(other, Profiler):
+            other = other.json()
+        with self._lock:
+            for name, other_stage in other["stages"].items():
+                stage = self.stages.setdefault(name, {})
+                for key, value in other_stage.items():
+                    stage[key] = stage.get(key, 0) + value
+
+    def json(self):
+        """Return a JSON-serializable representation of the recorded stages."""
+        with self._lock:
+            return {
+                "trace_memory": self.trace_memory,
+                "stages": {name: dict(stage) for name, stage in self.stages.items()},
+            }
+
+    @classmethod
+    def from_json(cls, data):
+        """Load the output of :any:`json` into an inactive profiler.
+
+        Parameters
+        ----------
+        data : :any:`dict`
+            Output of :any:`json`.
+
+        Returns
+        -------
+        profiler : :any:`eemeter.Profiler`
+            Profiler containing the recorded stages.
+        """
+        profiler = cls(trace_memory=data.get("trace_memory", False))
+        profiler.update(data)
+        return profiler
+
+    def summary(self, sort_by="own_time"):
+        """Return a flat profile of the recorded stages as a table, with one
+        line per stage.
+
+        Parameters
+        ----------
+        sort_by : :any:`str`, default ``'own_time'``
+            Stage field to sort by, in decreasing order. One of ``'calls'``,
+            ``'total_time'``, ``'own_time'`` or ``'allocated_bytes'``.
+
+        Returns
+        -------
+        summary : :any:`str`
+            The table.
+        """
+        stages = self.json()["stages"]
+        trace_memory = any("allocated_bytes" in stage for stage in stages.values())
+        columns = ["calls", "total_time", "own_time"]
+        if trace_memory:
+            columns.append("allocated_bytes")
+        if sort_by not in columns:
+            raise ValueError(
+                "sort_by must be one of {}, got {}.".format(columns, sort_by)
+            )
+
+        width = max([len("stage")] + [len(name) for name in stages])
+        row = "{:<" + str(width) + "}" + " {:>15}" * len(columns)
+        lines = [row.format("stage", *columns)]
+        for name in sorted(
+            stages, key=lambda name: (-stages[name].get(sort_by, 0), name)
+        ):
+            stage = stages[name]
+            values = [
+                "{}".format(stage["calls"]),
+                "{:.6f}".format(stage["total_time"]),
+                "{:.6f}".format(stage["own_time"]),
+            ]
+            if trace_memory:
+                values.append("{}".format(stage.get("allocated_bytes", 0)))
+            lines.append(row.format(name, *values))
+        return "\n".join(lines)
+
+
+class profile_stage(object):
+    """Context manager that records the enclosed block as a stage in all
+    active profilers. Does almost nothing if no :any:`eemeter.Profiler` is
+    active.
+
+    Parameters
+    ----------
+    name : :any:`str`
+        Name of the stage.
+
+    Examples
+    --------
+
+    >>> with profile_stage('load_data'):  # doctest: +SKIP
+    ...     meter_data = meter_data_from_csv(path)
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._profilers = None
+
+    def __enter__(self):
+        if not _active_profilers:
+            self._profilers = None
+            return self
+        self._profilers = list(_active_profilers)
+        stack = _stage_stack()
+        self._outermost = all(frame[0] != self.name for frame in stack)
+        self._frame = [self.name, 0.0]
+        stack.append(self._frame)
+        if any(profiler.trace_memory for profiler in self._profilers):
+            self._memory = _traced_memory()
+        else:
+            self._memory = None
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._profilers is None:
+            return
+        total_time = time.perf_counter() - self._start
+        allocated_bytes = None
+        if self._memory is not None:
+            memory = _traced_memory()
+            if memory is not None:
+                allocated_bytes = memory - self._memory
+        stack = _stage_stack()
+        stack.pop()
+        if stack:
+            stack[-1][1] += total_time
+        own_time = total_time - self._frame[1]
+        for profiler in self._profilers:
+            profiler._record(
+                self.name, total_time, own_time, self._outermost, allocated_bytes
+            )
+        self._profilers = None
+
+
+def profiled(func=None, name=None):
+    """Decorator that records each call of a function as a stage in all
+    active profilers. Does almost nothing if no :any:`eemeter.Profiler` is
+    active.
+
+    Parameters
+    ----------
+    func : :any:`callable`
+        The function to instrument.
+    name : :any:`str`, optional
+        Name of the stage. Defaults to the qualified name of the function,
+        e.g., ``'ModelMetrics.__init__'``.
+
+    Examples
+    --------
+
+    >>> @profiled  # doctest: +SKIP
+    ... def clean_data(data):
+    ...     ...
+    >>> @profiled(name='load')  # doctest: +SKIP
+    ... def load_data(path):
+    ...     ...
+    """
+    if func is None:
+        return functools.partial(profiled, name=name)
+    stage_name = func.__qualname__ if name is None else name
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _active_profilers:
+            return func(*args, **kwargs)
+        with profile_stage(stage_name):
+            return func(*args, **kwargs)
+
+    return wrapper
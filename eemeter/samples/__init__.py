@@ -18,3 +18,4 @@
 
 """
 from .load import *
+from .synthetic import *
@@ -17,21 +17,125 @@
    limitations under the License.
 
 """
+import copy
+import hashlib
+from io import BytesIO
 import json
-from pkg_resources import resource_stream
+import os
+import tempfile
 
 from dateutil.parser import parse as parse_date
+import numpy as np
+import pandas as pd
 import pytz
 
+from ..__version__ import __version__
 from ..io import meter_data_from_csv, temperature_data_from_csv
 
 __all__ = ("samples", "load_sample")
 
 
+# parsed metadata.json and sample data, keyed by (filename, kind, freq), kept
+# for the life of the process. Copies are returned so callers can modify them.
+_sample_metadata = None
+_sample_data = {}
+
+
 def _load_sample_metadata():
-    with resource_stream("eemeter.samples", "metadata.json") as f:
-        metadata = json.loads(f.read().decode("utf-8"))
-    return metadata
+    global _sample_metadata
+    if _sample_metadata is None:
+        from pkg_resources import resource_string
+
+        data = resource_string("eemeter.samples", "metadata.json")
+        _sample_metadata = json.loads(data.decode("utf-8"))
+    return copy.deepcopy(_sample_metadata)
+
+
+def _parse_sample_data(data, filename, kind, freq):
+    f = BytesIO(data)
+    gzipped = filename.endswith(".gz")
+    if kind == "temperature":
+        return temperature_data_from_csv(f, gzipped=gzipped, freq=freq)
+    return meter_data_from_csv(f, gzipped=gzipped, freq=freq)
+
+
+def _read_cached_sample_data(path):
+    # Load data written by _write_cached_sample_data, or None if the entry
+    # is missing or unreadable.
+    try:
+        with np.load(path) as npz:
+            arrays = {key: npz[key] for key in npz.files}
+    except (IOError, OSError, ValueError, KeyError):
+        return None
+    freq = str(arrays["freq"]) or None
+    index = pd.DatetimeIndex(
+        pd.to_datetime(arrays["index"], utc=True),
+        freq=freq,
+        name=str(arrays["index_name"]),
+    )
+    if arrays["kind"] == "series":
+        return pd.Series(arrays["values"], index=index, name=str(arrays["name"]))
+    return pd.DataFrame({str(arrays["name"]): arrays["values"]}, index=index)
+
+
+def _write_cached_sample_data(path, data):
+    if isinstance(data, pd.Series):
+        kind, name, values = "series", data.name, data.to_numpy()
+    else:
+        (name,) = data.columns
+        kind, values = "frame", data[name].to_numpy()
+    arrays = {
+        "kind": np.array(kind),
+        "name": np.array(name),
+        "values": values,
+        "index": data.index.tz_convert("UTC").asi8,
+        "index_name": np.array(data.index.name),
+        "freq": np.array(data.index.freqstr or ""),
+    }
+    # write to a temporary file and move it into place so that concurrent
+    # readers never see a partial entry.
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def _load_sample_data(filename, kind, freq=None, cache_dir=None):
+    # Load a bundled sample file as meter or temperature data, as with
+    # meter_data_from_csv or temperature_data_from_csv. Parsed data are kept
+    # in memory and, if cache_dir is given, in npz files keyed by the eemeter
+    # version, the arguments and the file contents, so CSV parsing is skipped
+    # on later loads in this or other processes.
+    key = (filename, kind, freq)
+    data = _sample_data.get(key)
+    if data is None:
+        from pkg_resources import resource_string
+
+        raw_data = resource_string("eemeter.samples", filename)
+        path = None
+        if cache_dir is not None:
+            hasher = hashlib.sha256()
+            for value in [__version__, filename, kind, str(freq)]:
+                hasher.update(value.encode("utf-8") + b"\0")
+            hasher.update(raw_data)
+            path = os.path.join(cache_dir, "{}.npz".format(hasher.hexdigest()))
+            data = _read_cached_sample_data(path)
+        if data is None:
+            data = _parse_sample_data(raw_data, filename, kind, freq)
+            if path is not None:
+                _write_cached_sample_data(path, data)
+        _sample_data[key] = data
+    # also copy the index, whose freq and name can be set in place
+    copied = data.copy()
+    copied.index = data.index.copy(deep=True)
+    return copied
 
 
 def samples():
@@ -46,15 +150,22 @@ def samples():
     return list(sorted(sample_metadata.keys()))
 
 
-def load_sample(sample):
+def load_sample(sample, cache_dir=None):
     """Load meter data, temperature data, and metadata for associated with a
     particular sample identifier. Note: samples are simulated, not real, data.
 
+    Sample data are parsed once per process and copies are returned, so
+    repeated loads are fast and returned data can be modified freely.
+
     Parameters
     ----------
     sample : :any:`str`
         Identifier of sample. Complete list can be obtained with
         :any:`eemeter.samples`.
+    cache_dir : :any:`str`, optional
+        If given, parsed sample data are also stored in this directory as
+        ``.npz`` files, so later loads in other processes skip CSV parsing.
+        Created if it does not exist.
 
     Returns
     -------
@@ -77,13 +188,12 @@ def load_sample(sample):
     if freq not in ("hourly", "daily"):
         freq = None
 
-    meter_data_filename = metadata["meter_data_filename"]
-    with resource_stream("eemeter.samples", meter_data_filename) as f:
-        meter_data = meter_data_from_csv(f, gzipped=True, freq=freq)
-
-    temperature_filename = metadata["temperature_filename"]
-    with resource_stream("eemeter.samples", temperature_filename) as f:
-        temperature_data = temperature_data_from_csv(f, gzipped=True, freq="hourly")
+    meter_data = _load_sample_data(
+        metadata["meter_data_filename"], "meter", freq, cache_dir=cache_dir
+    )
+    temperature_data = _load_sample_data(
+        metadata["temperature_filename"], "temperature", "hourly", cache_dir=cache_dir
+    )
 
     metadata["blackout_start_date"] = pytz.UTC.localize(
         parse_date(metadata["blackout_start_date"])
@@ -0,0 +1,451 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from ..io import temperature_data_from_csv
+
+__all__ = (
+    "iterate_synthetic_meters",
+    "synthetic_meter_data",
+    "synthetic_temperature_data",
+)
+
+
+# first hour of the bundled il-tempF.csv.gz temperature data (local midnight)
+_SAMPLE_START = pd.Timestamp("2015-11-22T06:00:00Z")
+
+# the bundled temperature data is repeated with this period, which keeps
+# weekdays and, approximately, seasons aligned
+_SAMPLE_PERIOD_HOURS = int(timedelta(weeks=104) / timedelta(hours=1))
+
+_INTERVALS = ("hourly", "daily", "billing_monthly", "billing_bimonthly")
+
+# inclusive ranges of billing period lengths, in days
+_BILLING_PERIOD_DAYS = {"billing_monthly": (27, 33), "billing_bimonthly": (56, 65)}
+
+# default ranges of per-meter model parameters for iterate_synthetic_meters
+_DEFAULT_PARAMETER_RANGES = {
+    "base_load": (10.0, 50.0),
+    "heating_slope": (0.0, 3.0),
+    "heating_balance_point": (55.0, 65.0),
+    "cooling_slope": (0.0, 3.0),
+    "cooling_balance_point": (65.0, 75.0),
+    "noise": 0.1,
+    "gap_fraction": 0.0,
+    "gap_length": 1,
+    "estimated_fraction": 0.0,
+}
+
+
+def _sample_temperature_values():
+    from pkg_resources import resource_stream
+
+    with resource_stream("eemeter.samples", "il-tempF.csv.gz") as f:
+        temperature_data = temperature_data_from_csv(f, gzipped=True, freq="hourly")
+    return temperature_data[_SAMPLE_START:].to_numpy()[:_SAMPLE_PERIOD_HOURS]
+
+
+def _model_temperature_values(
+    index, random_state, mean, annual_amplitude, daily_amplitude, noise
+):
+    from scipy.signal import lfilter
+
+    # coldest in mid January and at 09:00 UTC, warmest in mid July and at
+    # 21:00 UTC (mid-afternoon in US Central time)
+    day_of_year = (index.dayofyear - 15 + index.hour / 24.0).to_numpy()
+    hour = index.hour.to_numpy()
+    seasonal = -annual_amplitude * np.cos(2 * np.pi * day_of_year / 365.25)
+    diurnal = -daily_amplitude * np.cos(2 * np.pi * (hour - 9) / 24.0)
+
+    # AR(1) weather noise with a standard deviation of `noise` and hourly
+    # autocorrelation of 0.95, after a week of burn-in
+    burn_in, phi = 24 * 7, 0.95
+    innovations = random_state.standard_normal(len(index) + burn_in)
+    weather = lfilter([noise * np.sqrt(1 - phi ** 2)], [1, -phi], innovations)
+    return mean + seasonal + diurnal + weather[burn_in:]
+
+
+def synthetic_temperature_data(
+    start=None,
+    end=None,
+    source="sample",
+    seed=0,
+    mean=52.0,
+    annual_amplitude=25.0,
+    daily_amplitude=8.0,
+    noise=5.0,
+):
+    """Generate hourly temperature data in degrees Fahrenheit.
+
+    With ``source='sample'``, the bundled hourly temperature data used by
+    :any:`eemeter.load_sample` is repeated every 104 weeks to cover the
+    requested range. With ``source='model'``, temperatures follow annual and
+    daily cycles plus autocorrelated noise, drawn deterministically from
+    ``seed``.
+
+    Parameters
+    ----------
+    start : :any:`datetime.datetime` or :any:`str`, optional
+        Start of the data. Rounded up to the hour and assumed to be UTC if
+        naive. Defaults to the start of the bundled temperature data,
+        2015-11-22T00:00:00-06:00.
+    end : :any:`datetime.datetime` or :any:`str`, optional
+        End of the data (exclusive). Defaults to 104 weeks after ``start``.
+    source : :any:`str`, default ``'sample'``
+        Either ``'sample'`` or ``'model'``.
+    seed : :any:`int`, default ``0``
+        Random seed for ``source='model'``.
+    mean : :any:`float`, default ``52.0``
+        Mean temperature for ``source='model'``.
+    annual_amplitude : :any:`float`, default ``25.0``
+        Amplitude of the seasonal cycle for ``source='model'``.
+    daily_amplitude : :any:`float`, default ``8.0``
+        Amplitude of the daily cycle for ``source='model'``.
+    noise : :any:`float`, default ``5.0``
+        Standard deviation of the weather noise for ``source='model'``.
+
+    Returns
+    -------
+    temperature_data : :any:`pandas.Series`
+        Hourly temperature data with a UTC :any:`pandas.DatetimeIndex`, in
+        the format returned by :any:`eemeter.temperature_data_from_csv`.
+    """
+    start = _SAMPLE_START if start is None else pd.Timestamp(start)
+    if start.tz is None:
+        start = start.tz_localize("UTC")
+    start = start.tz_convert("UTC").ceil("H")
+    end = start + timedelta(weeks=104) if end is None else pd.Timestamp(end)
+    if end.tz is None:
+        end = end.tz_localize("UTC")
+
+    periods = int(np.ceil((end - start) / timedelta(hours=1)))
+    index = pd.date_range(start, periods=max(periods, 0), freq="H", name="dt")
+
+    if source == "sample":
+        values = _sample_temperature_values()
+        hours = (index.asi8 - _SAMPLE_START.value) // (3600 * 10 ** 9)
+        values = values[np.mod(hours, _SAMPLE_PERIOD_HOURS)]
+    elif source == "model":
+        values = _model_temperature_values(
+            index,
+            np.random.RandomState(seed),
+            mean,
+            annual_amplitude,
+            daily_amplitude,
+            noise,
+        )
+    else:
+        raise ValueError(
+            "source not recognized: {!r}. Use 'sample' or 'model'.".format(source)
+        )
+
+    return pd.Series(values, index=index, name="tempF")
+
+
+def _period_starts(n_days, interval, random_state):
+    # period start offsets, in days, including the end of the last full
+    # period
+    if interval == "daily":
+        return np.arange(n_days + 1)
+    low, high = _BILLING_PERIOD_DAYS[interval]
+    lengths = random_state.randint(low, high + 1, size=n_days // low + 1)
+    starts = np.concatenate([[0], np.cumsum(lengths)])
+    return starts[starts <= n_days]
+
+
+def _apply_gaps(values, gap_fraction, gap_length, random_state):
+    gap_length = max(int(round(gap_length)), 1)
+    n_gaps = int(round(gap_fraction * len(values) / gap_length))
+    if n_gaps == 0 or len(values) == 0:
+        return values
+    starts = random_state.randint(0, max(len(values) - gap_length + 1, 1), n_gaps)
+    missing = (starts[:, None] + np.arange(gap_length)).ravel()
+    values[missing[missing < len(values)]] = np.nan
+    return values
+
+
+def _apply_estimated_reads(values, estimated_fraction, random_state):
+    # an estimated read misallocates usage between its period and the next
+    # one, which is trued up, so that total usage is preserved
+    estimated = np.zeros(len(values), dtype=bool)
+    candidates = np.flatnonzero(np.isfinite(values[:-1]) & np.isfinite(values[1:]))
+    n_estimated = int(round(estimated_fraction * len(values)))
+    if n_estimated == 0 or len(candidates) == 0:
+        return values, estimated
+    chosen = random_state.choice(
+        candidates, min(n_estimated, len(candidates)), replace=False
+    )
+    for i in np.sort(chosen):
+        if i > 0 and estimated[i - 1]:
+            continue  # the previous estimate is trued up in this period
+        total = values[i] + values[i + 1]
+        values[i] = min(values[i] * random_state.lognormal(0, 0.25), total)
+        values[i + 1] = total - values[i]
+        estimated[i] = True
+    return values, estimated
+
+
+def _synthetic_meter_data(
+    index,
+    temperature,
+    interval,
+    random_state,
+    base_load,
+    heating_slope,
+    heating_balance_point,
+    cooling_slope,
+    cooling_balance_point,
+    noise,
+    gap_fraction,
+    gap_length,
+    estimated_fraction,
+):
+    # hourly usage, with loads given per day and degree days accumulated
+    # hourly
+    usage = (
+        base_load
+        + heating_slope * np.maximum(heating_balance_point - temperature, 0)
+        + cooling_slope * np.maximum(temperature - cooling_balance_point, 0)
+    ) / 24.0
+
+    if interval == "hourly":
+        period_index = index
+        values = usage
+    else:
+        starts = _period_starts(len(index) // 24, interval, random_state)
+        if len(starts) < 2:
+            raise ValueError(
+                "Temperature data must cover at least one full {} period.".format(
+                    interval
+                )
+            )
+        cumulative = np.concatenate([[0.0], np.cumsum(usage)])
+        values = np.diff(cumulative[starts * 24])
+        if interval == "daily":
+            period_index = pd.date_range(index[0], periods=len(starts), freq="D")
+        else:
+            period_index = index[0] + pd.to_timedelta(starts, unit="D")
+
+    values = values * random_state.lognormal(0, noise, len(values))
+    values = _apply_gaps(values, gap_fraction, gap_length, random_state)
+    columns = {"value": values}
+    if estimated_fraction > 0:
+        values, estimated = _apply_estimated_reads(
+            values, estimated_fraction, random_state
+        )
+        columns = {"value": values, "estimated": estimated}
+
+    if interval != "hourly":
+        # a final NaN marks the end of the last period, as in the sample files
+        columns = {
+            column: np.append(column_values, np.nan if column == "value" else False)
+            for column, column_values in columns.items()
+        }
+
+    meter_data = pd.DataFrame(columns, index=period_index)
+    meter_data.index.name = "start"
+    return meter_data
+
+
+def _hourly_temperature(temperature_data):
+    # hourly temperatures, with gaps interpolated since buildings use energy
+    # whether or not the weather station reports
+    if temperature_data.index.freq != "H":
+        temperature_data = temperature_data.resample("H").mean()
+    temperature = temperature_data.interpolate(limit_direction="both")
+    return temperature_data.index, temperature.to_numpy(dtype=np.float64)
+
+
+def _check_interval(interval):
+    if interval not in _INTERVALS:
+        raise ValueError(
+            "interval not recognized: {!r}. Use one of {}.".format(
+                interval, ", ".join(_INTERVALS)
+            )
+        )
+
+
+def synthetic_meter_data(
+    temperature_data,
+    interval="daily",
+    base_load=20.0,
+    heating_slope=1.0,
+    heating_balance_point=60.0,
+    cooling_slope=1.0,
+    cooling_balance_point=70.0,
+    noise=0.1,
+    gap_fraction=0.0,
+    gap_length=1,
+    estimated_fraction=0.0,
+    seed=0,
+):
+    """Generate meter data for a building whose usage follows the CalTRACK
+    model, driven by hourly temperature data.
+
+    Hourly usage is ``(base_load + heating_slope * max(heating_balance_point
+    - T, 0) + cooling_slope * max(T - cooling_balance_point, 0)) / 24`` for
+    hourly temperature ``T``, summed over each period and multiplied by
+    lognormal noise. Results are deterministic given ``seed``.
+
+    Parameters
+    ----------
+    temperature_data : :any:`pandas.Series`
+        Hourly temperature data, e.g., from
+        :any:`eemeter.synthetic_temperature_data`. Missing temperatures are
+        interpolated.
+    interval : :any:`str`, default ``'daily'``
+        One of ``'hourly'``, ``'daily'``, ``'billing_monthly'`` (27 to 33 day
+        periods) or ``'billing_bimonthly'`` (56 to 65 day periods). Periods
+        start on whole days from the start of ``temperature_data``.
+    base_load : :any:`float`, default ``20.0``
+        Usage per day independent of temperature.
+    heating_slope : :any:`float`, default ``1.0``
+        Usage per heating degree day.
+    heating_balance_point : :any:`float`, default ``60.0``
+        Heating balance point, in the units of ``temperature_data``.
+    cooling_slope : :any:`float`, default ``1.0``
+        Usage per cooling degree day.
+    cooling_balance_point : :any:`float`, default ``70.0``
+        Cooling balance point, in the units of ``temperature_data``.
+    noise : :any:`float`, default ``0.1``
+        Standard deviation of the log of the multiplicative noise applied to
+        each period.
+    gap_fraction : :any:`float`, default ``0.0``
+        Approximate fraction of periods with missing (``NaN``) values.
+    gap_length : :any:`int`, default ``1``
+        Number of consecutive periods in each gap.
+    estimated_fraction : :any:`float`, default ``0.0``
+        Approximate fraction of periods with estimated reads. Estimated reads
+        misallocate usage between their period and the next one, preserving
+        the total, and are flagged in an ``'estimated'`` column, which is only
+        included if this is greater than zero.
+    seed : :any:`int` or sequence of :any:`int`, default ``0``
+        Random seed, passed to :any:`numpy.random.RandomState`.
+
+    Returns
+    -------
+    meter_data : :any:`pandas.DataFrame`
+        Meter data with a ``'value'`` column and a UTC
+        :any:`pandas.DatetimeIndex` of period starts, in the format returned
+        by :any:`eemeter.meter_data_from_csv`. Except for hourly data, a final
+        ``NaN`` value marks the end of the last period.
+    """
+    _check_interval(interval)
+    index, temperature = _hourly_temperature(temperature_data)
+    return _synthetic_meter_data(
+        index,
+        temperature,
+        interval,
+        np.random.RandomState(seed),
+        base_load=base_load,
+        heating_slope=heating_slope,
+        heating_balance_point=heating_balance_point,
+        cooling_slope=cooling_slope,
+        cooling_balance_point=cooling_balance_point,
+        noise=noise,
+        gap_fraction=gap_fraction,
+        gap_length=gap_length,
+        estimated_fraction=estimated_fraction,
+    )
+
+
+def iterate_synthetic_meters(
+    n_meters,
+    temperature_data=None,
+    interval="daily",
+    seed=0,
+    meter_id_format="synthetic-{}",
+    with_metadata=False,
+    **parameters
+):
+    """Generate meter data for many buildings with randomly drawn model
+    parameters, one meter at a time.
+
+    Each meter's parameters and data are drawn from a random state seeded
+    with ``[seed, i]`` for the ``i``-th meter, so results are deterministic
+    given ``seed`` and the data for a meter does not depend on ``n_meters``.
+    Since meters are generated lazily, any number of meters can be streamed
+    to :any:`eemeter.meter_data_to_long_csv` or
+    :any:`eemeter.meter_data_to_long_parquet`.
+
+    Parameters
+    ----------
+    n_meters : :any:`int`
+        Number of meters.
+    temperature_data : :any:`pandas.Series`, optional
+        Hourly temperature data shared by all meters. Defaults to
+        :any:`eemeter.synthetic_temperature_data` with its defaults, i.e., the
+        bundled temperature data.
+    interval : :any:`str`, default ``'daily'``
+        See :any:`eemeter.synthetic_meter_data`.
+    seed : :any:`int`, default ``0``
+        Random seed.
+    meter_id_format : :any:`str`, default ``'synthetic-{}'``
+        Format of meter ids, given the meter number.
+    with_metadata : :any:`bool`, default ``False``
+        If True, also yield a dict of each meter's parameters.
+    **parameters
+        Keyword arguments of :any:`eemeter.synthetic_meter_data`. Each value
+        is either fixed or a ``(low, high)`` tuple from which a value is drawn
+        uniformly for each meter. Defaults are ``base_load=(10.0, 50.0)``,
+        ``heating_slope=(0.0, 3.0)``, ``heating_balance_point=(55.0, 65.0)``,
+        ``cooling_slope=(0.0, 3.0)`` and ``cooling_balance_point=(65.0, 75.0)``,
+        and the defaults of :any:`eemeter.synthetic_meter_data` otherwise.
+
+    Yields
+    ------
+    meter_id, meter_data : :any:`tuple` of (:any:`str`, :any:`pandas.DataFrame`)
+        The meter id and its meter data, in the format returned by
+        :any:`eemeter.synthetic_meter_data`. If ``with_metadata`` is True, a
+        dict with the meter id, interval, seed and model parameters is also
+        yielded as a third item.
+    """
+    _check_interval(interval)
+    if temperature_data is None:
+        temperature_data = synthetic_temperature_data()
+    index, temperature = _hourly_temperature(temperature_data)
+
+    parameter_ranges = dict(_DEFAULT_PARAMETER_RANGES)
+    parameter_ranges.update(parameters)
+    names = sorted(parameter_ranges)
+
+    for i in range(n_meters):
+        random_state = np.random.RandomState([seed, i])
+        meter_parameters = {}
+        for name in names:
+            value = parameter_ranges[name]
+            if isinstance(value, tuple):
+                value = random_state.uniform(*value)
+            meter_parameters[name] = value
+
+        meter_id = meter_id_format.format(i)
+        meter_data = _synthetic_meter_data(
+            index, temperature, interval, random_state, **meter_parameters
+        )
+        if with_metadata:
+            metadata = dict(
+                meter_parameters, meter_id=meter_id, interval=interval, seed=seed
+            )
+            yield meter_id, meter_data, metadata
+        else:
+            yield meter_id, meter_data
@@ -21,7 +21,9 @@ from collections import namedtuple
 
 import numpy as np
 import pandas as pd
-from patsy import dmatrix
+
+from .profiling import profiled
+from .warnings import EEMeterWarning
 
 
 __all__ = (
@@ -65,6 +67,8 @@ class CalTRACKSegmentModel(object):
 
     def predict(self, data):
         """A function which takes input data and predicts for this segment model."""
+        from patsy import dmatrix
+
         if self.formula is None:
             var_str = ""
         else:
@@ -128,7 +132,7 @@ class CalTRACKSegmentModel(object):
             None,
             data.get("formula"),
             data.get("model_params"),
-            warnings=data.get("warnings"),
+            warnings=[EEMeterWarning.from_json(w) for w in data.get("warnings") or []],
         )
 
         return c
@@ -184,6 +188,7 @@ class SegmentedModel(object):
         self.prediction_feature_processor = prediction_feature_processor
         self.prediction_feature_processor_kwargs = prediction_feature_processor_kwargs
 
+    @profiled
     def predict(
         self, prediction_index, temperature, **kwargs
     ):  # ignore extra args with kwargs
@@ -446,6 +451,7 @@ def _segment_weights_three_month_weighted(index):
     )
 
 
+@profiled
 def segment_time_series(index, segment_type="single", drop_zero_weight_segments=False):
     """Split a time series index into segments by applying weights.
 
@@ -498,6 +504,7 @@ def segment_time_series(index, segment_type="single", drop_zero_weight_segments=
     return segment_weights
 
 
+@profiled
 def fit_model_segments(segmented_dataset_dict, fit_segment):
     """A function which fits a model to each item in a dataset.
 
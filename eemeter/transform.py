@@ -25,16 +25,22 @@ import pandas as pd
 import pytz
 
 from .exceptions import NoBaselineDataError, NoReportingDataError
+from .profiling import profiled
 from .warnings import EEMeterWarning
 
 
 __all__ = (
+    "DataWindow",
     "Term",
     "as_freq",
     "day_counts",
+    "downsample_and_clean_caltrack_daily_data",
     "get_baseline_data",
+    "get_baseline_windows",
     "get_reporting_data",
+    "get_reporting_windows",
     "get_terms",
+    "get_terms_batch",
     "remove_duplicates",
     "overwrite_partial_rows_with_nan",
     "clean_caltrack_billing_data",
@@ -221,6 +227,7 @@ def _make_baseline_warnings(
     return warnings
 
 
+@profiled
 def get_baseline_data(
     data,
     start=None,
@@ -305,8 +312,7 @@ def get_baseline_data(
     else:
         end_limit = end
 
-    # copying prevents setting on slice warnings
-    data_before_end_limit = data[:end_limit].copy()
+    data_before_end_limit = data[:end_limit]
     data_end = data_before_end_limit.index.max()
 
     if ignore_billing_period_gap_for_day_count and (
@@ -324,7 +330,7 @@ def get_baseline_data(
         try:
             loc = data_before_end_limit.index.get_loc(start_target, method="nearest")
         except (KeyError, IndexError):  # pragma: no cover
-            baseline_data = data_before_end_limit
+            baseline_data = data_before_end_limit.copy()
             start_limit = start_target
         else:
             start_limit = data_before_end_limit.index[loc]
@@ -385,6 +391,7 @@ def _make_reporting_warnings(
     return warnings
 
 
+@profiled
 def get_reporting_data(
     data,
     start=None,
@@ -461,8 +468,7 @@ def get_reporting_data(
     else:
         end_target = end
 
-    # copying prevents setting on slice warnings
-    data_after_start_limit = data[start_limit:].copy()
+    data_after_start_limit = data[start_limit:]
 
     if ignore_billing_period_gap_for_day_count:
         start_limit = data_after_start_limit.index.min()
@@ -476,7 +482,7 @@ def get_reporting_data(
         try:
             loc = data_after_start_limit.index.get_loc(end_target, method="nearest")
         except (KeyError, IndexError):  # pragma: no cover
-            reporting_data = data_after_start_limit
+            reporting_data = data_after_start_limit.copy()
             end_limit = end_target
         else:
             end_limit = data_after_start_limit.index[loc]
@@ -502,6 +508,203 @@ def get_reporting_data(
     )
 
 
+class DataWindow(object):
+    """A baseline or reporting period of a larger dataset, kept as a range of
+    row positions instead of a copy of the data.
+
+    The last row of the window marks the end of the last period and is
+    treated as missing, as in the data returned by
+    :any:`eemeter.get_baseline_data` and :any:`eemeter.get_reporting_data`.
+
+    Attributes
+    ----------
+    data : :any:`pandas.DataFrame` or :any:`pandas.Series`
+        The full dataset the window refers to. Not copied.
+    start : :any:`int`
+        Position in ``data`` of the first row of the window.
+    stop : :any:`int`
+        Position in ``data`` one past the last row of the window.
+    start_limit : :any:`datetime.datetime` or None
+        The requested start of the window, or None if unbounded.
+    end_limit : :any:`datetime.datetime` or None
+        The requested end of the window, or None if unbounded.
+    warnings : :any:`list` of :any:`eemeter.EEMeterWarning`
+        Warnings about gaps between the requested limits and the data.
+    """
+
+    def __init__(self, data, start, stop, start_limit, end_limit, warnings):
+        self.data = data
+        self.start = start
+        self.stop = stop
+        self.start_limit = start_limit
+        self.end_limit = end_limit
+        self.warnings = warnings
+
+    def __repr__(self):
+        return "DataWindow(start={}, stop={}, n_warnings={})".format(
+            self.start, self.stop, len(self.warnings)
+        )
+
+    def __len__(self):
+        return self.stop - self.start
+
+    @property
+    def index(self):
+        """The :any:`pandas.DatetimeIndex` of the window, including its last
+        row."""
+        return self.data.index[self.start : self.stop]
+
+    @property
+    def mask(self):
+        """A boolean :any:`numpy.ndarray` which is False for the last row of
+        the window and True for all other rows."""
+        mask = np.ones(len(self), dtype=bool)
+        mask[-1:] = False
+        return mask
+
+    def view(self):
+        """Return the rows of the window without copying them. The last row
+        is not set to NaN; use :any:`mask` to exclude it.
+
+        Returns
+        -------
+        data : :any:`pandas.DataFrame` or :any:`pandas.Series`
+            A positional slice of :any:`data`.
+        """
+        return self.data.iloc[self.start : self.stop]
+
+    def get_data(self):
+        """Return a copy of the rows of the window with the last row set to
+        NaN, as returned by :any:`eemeter.get_baseline_data` and
+        :any:`eemeter.get_reporting_data`.
+
+        Returns
+        -------
+        data : :any:`pandas.DataFrame` or :any:`pandas.Series`
+            Data for only the window.
+        """
+        data = self.view().copy()
+        data.iloc[-1] = np.nan
+        return data
+
+
+def _get_data_windows(data, windows, make_warnings, error):
+    # Resolve every (start, end) pair to row positions with one searchsorted
+    # per side over the index, matching the label slicing data[start:end].
+    index = data.index
+    starts = [start for start, end in windows]
+    ends = [end for start, end in windows]
+
+    def _positions(limits, side, default):
+        bounded = [limit for limit in limits if limit is not None]
+        positions = iter(index.searchsorted(bounded, side=side) if bounded else [])
+        return [default if limit is None else next(positions) for limit in limits]
+
+    start_positions = _positions(starts, "left", 0)
+    stop_positions = _positions(ends, "right", len(index))
+
+    # a window has data if any of its rows has no missing values
+    if isinstance(data, pd.Series):
+        complete_rows = data.notnull().to_numpy()
+    else:
+        complete_rows = data.notnull().to_numpy().all(axis=1)
+    n_complete_rows = np.concatenate([[0], np.cumsum(complete_rows)])
+
+    data_start = index.min()
+    data_end = index.max()
+    data_windows = []
+    for start_limit, end_limit, start, stop in zip(
+        starts, ends, start_positions, stop_positions
+    ):
+        stop = max(start, stop)
+        if n_complete_rows[stop] - n_complete_rows[start] == 0:
+            raise error()
+        warnings = make_warnings(
+            end_limit is None,
+            start_limit is None,
+            data_start,
+            data_end,
+            start_limit,
+            end_limit,
+        )
+        data_windows.append(
+            DataWindow(data, start, stop, start_limit, end_limit, warnings)
+        )
+    return data_windows
+
+
+@profiled
+def get_baseline_windows(data, windows):
+    """Filter down to many baseline periods of the same data at once.
+
+    Each window is the same as
+    ``get_baseline_data(data, start=start, end=end, max_days=None)`` for its
+    ``(start, end)`` pair, but is returned as a :any:`eemeter.DataWindow` of
+    row positions, so the data is not copied for each window. Useful for
+    rolling analyses, e.g., a 12 month baseline ending on each month.
+
+    Parameters
+    ----------
+    data : :any:`pandas.DataFrame` or :any:`pandas.Series`
+        The data to filter to baseline data. Must have a sorted
+        :any:`pandas.DatetimeIndex`.
+    windows : :any:`list` of :any:`tuple` of (:any:`datetime.datetime`, :any:`datetime.datetime`)
+        ``(start, end)`` pairs of timezone-aware datetimes giving the earliest
+        allowable start and latest allowable end date of each baseline
+        period. Either may be None to leave that side unbounded.
+
+    Returns
+    -------
+    baseline_windows : :any:`list` of :any:`eemeter.DataWindow`
+        One window per ``(start, end)`` pair, in the same order, each with
+        its associated warnings.
+
+    Raises
+    ------
+    NoBaselineDataError
+        If any window contains no data.
+    """
+    return _get_data_windows(
+        data, windows, _make_baseline_warnings, NoBaselineDataError
+    )
+
+
+@profiled
+def get_reporting_windows(data, windows):
+    """Filter down to many reporting periods of the same data at once.
+
+    Each window is the same as
+    ``get_reporting_data(data, start=start, end=end, max_days=None)`` for
+    its ``(start, end)`` pair, but is returned as a
+    :any:`eemeter.DataWindow` of row positions, so the data is not copied for
+    each window.
+
+    Parameters
+    ----------
+    data : :any:`pandas.DataFrame` or :any:`pandas.Series`
+        The data to filter to reporting data. Must have a sorted
+        :any:`pandas.DatetimeIndex`.
+    windows : :any:`list` of :any:`tuple` of (:any:`datetime.datetime`, :any:`datetime.datetime`)
+        ``(start, end)`` pairs of timezone-aware datetimes giving the earliest
+        allowable start and latest allowable end date of each reporting
+        period. Either may be None to leave that side unbounded.
+
+    Returns
+    -------
+    reporting_windows : :any:`list` of :any:`eemeter.DataWindow`
+        One window per ``(start, end)`` pair, in the same order, each with
+        its associated warnings.
+
+    Raises
+    ------
+    NoReportingDataError
+        If any window contains no data.
+    """
+    return _get_data_windows(
+        data, windows, _make_reporting_warnings, NoReportingDataError
+    )
+
+
 class Term(object):
     """
     The term object represents a subset of an index.
@@ -566,97 +769,78 @@ class Term(object):
         )
 
 
-def get_terms(index, term_lengths, term_labels=None, start=None, method="strict"):
-    """Breaks a :any:`pandas.DatetimeIndex` into consecutive terms of specified
-    lengths.
-
-    Parameters
-    ----------
-    index : :any:`pandas.DatetimeIndex`
-        The index to split into terms, generally `meter_data.index`
-        or `temperature_data.index`.
-    term_lengths : :any:`list` of :any:`int`
-        The lengths (in days) of the terms into which to split the data.
-    term_labels : :any:`list` of :any:`str`, default None
-        Labels to use for each term. List must be the same length as the
-        `term_lengths` list.
-    start : :any:`datetime.datetime`, default None
-        A timezone-aware datetime that represents the earliest allowable start
-        date for the terms. If None, use the first element of the index.
-    method: one of ['strict', 'nearest'], default 'strict'
-        The method to use to get terms.
-
-        - "strict": Ensures that the term end will come on or before the length of
-
-    Returns
-    -------
-    terms : :any:`list` of :any:`eemeter.Term`
-        A dataframe of term labels with the same :any:`pandas.DatetimeIndex`
-        given as `index`. This can be used to filter the original data into
-        terms of approximately the desired length.
-
-
-    """
-    if method == "strict":
-        get_loc_method = "pad"
-    elif method == "nearest":
-        get_loc_method = "nearest"
-    else:
+def _check_term_arguments(term_lengths, term_labels, method):
+    if method not in ("strict", "nearest"):
         raise ValueError(
             "method {} not supported - use either 'strict' or 'closest'".format(method)
         )
 
-    if not index.is_monotonic_increasing:
-        raise ValueError("get_terms requires a sorted index")
-
     if term_labels is None:
-        term_labels = [
+        return [
             "term_{:03d}".format(i + 1) for i, term_length in enumerate(term_lengths)
         ]
 
-    elif len(term_labels) != len(term_lengths):
+    if len(term_labels) != len(term_lengths):
         raise ValueError(
             "term_labels (len {}) must be the same length as term_length (len {})".format(
                 len(term_labels), len(term_lengths)
             )
         )
+    return term_labels
+
 
+def _get_terms(index, term_lengths, term_labels, start, method):
     if start is None:
         prev_start = index.min()
     else:
         prev_start = start
 
+    terms = []
+    remaining_index = index[index >= prev_start]
+    n_remaining = len(remaining_index)
+    if n_remaining <= 1:
+        return terms
+
     term_end_targets = [
-        prev_start + timedelta(days=sum(term_lengths[: i + 1]))
-        for i in range(len(term_lengths))
+        prev_start + timedelta(days=days) for days in np.cumsum(term_lengths).tolist()
     ]
 
-    terms = []
-    remaining_index = index[index >= prev_start]
+    # find every term end at once, as get_loc would with method='pad' or
+    # 'nearest' (ties go to the later point).
+    values = remaining_index.asi8
+    targets = pd.DatetimeIndex(term_end_targets).asi8
+    term_ends = np.searchsorted(values, targets, side="right") - 1
+    if method == "nearest":
+        after = np.minimum(term_ends + 1, n_remaining - 1)
+        exact = (term_ends >= 0) & (values[np.maximum(term_ends, 0)] == targets)
+        use_after = ~exact & (
+            (term_ends < 0)
+            | (values[after] - targets <= targets - values[np.maximum(term_ends, 0)])
+        )
+        term_ends = np.where(use_after, after, term_ends)
 
-    for label, target_term_length, end_target in zip(
-        term_labels, term_lengths, term_end_targets
+    term_start = 0
+    for label, target_term_length, end_target, term_end in zip(
+        term_labels, term_lengths, term_end_targets, term_ends.tolist()
     ):
-        if len(remaining_index) <= 1:
+        if n_remaining - term_start <= 1:
             break
 
-        next_index = remaining_index.get_loc(end_target, method=get_loc_method)
+        if term_end < 0:
+            raise KeyError(end_target)
+
+        # the next term can't end before this one starts
+        term_end = max(term_end, term_start)
 
         # keep one extra index point for the end NaN - this could be confusing, but
         # helps identify the full range of the last data point
-        term_index = remaining_index[: next_index + 1]
-
-        # find the next start
-        next_start = remaining_index[next_index]
-
-        # reset the remaining index
-        remaining_index = remaining_index[next_index:]
+        term_index = remaining_index[term_start : term_end + 1]
 
         # There may be a better way to tell if the term is conclusively complete,
         # but the logic here is that if there's more than one remaining point then
         # the term must be complete - since that final point was a worse candidate
         # than the one before it which was chosen.
-        complete = len(remaining_index) > 1
+        complete = n_remaining - term_end > 1
 
         terms.append(
             Term(
@@ -672,12 +856,84 @@ def get_terms(index, term_lengths, term_labels=None, start=None, method="strict"
             )
         )
 
-        # reset the previous start
-        prev_start = next_start
+        # the next term starts where this one ends
+        prev_start = remaining_index[term_end]
+        term_start = term_end
 
     return terms
 
 
+def get_terms(index, term_lengths, term_labels=None, start=None, method="strict"):
+    """Breaks a :any:`pandas.DatetimeIndex` into consecutive terms of specified
+    lengths.
+
+    Parameters
+    ----------
+    index : :any:`pandas.DatetimeIndex`
+        The index to split into terms, generally `meter_data.index`
+        or `temperature_data.index`.
+    term_lengths : :any:`list` of :any:`int`
+        The lengths (in days) of the terms into which to split the data.
+    term_labels : :any:`list` of :any:`str`, default None
+        Labels to use for each term. List must be the same length as the
+        `term_lengths` list.
+    start : :any:`datetime.datetime`, default None
+        A timezone-aware datetime that represents the earliest allowable start
+        date for the terms. If None, use the first element of the index.
+    method: one of ['strict', 'nearest'], default 'strict'
+        The method to use to get terms.
+
+        - "strict": Ensures that the term end will come on or before the length of
+
+    Returns
+    -------
+    terms : :any:`list` of :any:`eemeter.Term`
+        A dataframe of term labels with the same :any:`pandas.DatetimeIndex`
+        given as `index`. This can be used to filter the original data into
+        terms of approximately the desired length.
+
+
+    """
+    term_labels = _check_term_arguments(term_lengths, term_labels, method)
+
+    if not index.is_monotonic_increasing:
+        raise ValueError("get_terms requires a sorted index")
+
+    return _get_terms(index, term_lengths, term_labels, start, method)
+
+
+def get_terms_batch(
+    indexes, term_lengths, term_labels=None, start=None, method="strict"
+):
+    """Breaks the indexes of many meters into consecutive terms of the same
+    specified lengths.
+
+    Arguments are checked once for all indexes. See :any:`eemeter.get_terms`
+    for a description of the parameters.
+
+    Parameters
+    ----------
+    indexes : :any:`dict` of :any:`pandas.DatetimeIndex`
+        The indexes to split into terms, generally the ``meter_data.index``
+        of each meter, keyed by meter.
+
+    Returns
+    -------
+    terms : :any:`dict` of :any:`list` of :any:`eemeter.Term`
+        The terms of each index, with the same keys as ``indexes``.
+    """
+    term_labels = _check_term_arguments(term_lengths, term_labels, method)
+
+    for key, index in indexes.items():
+        if not index.is_monotonic_increasing:
+            raise ValueError("get_terms requires a sorted index: {}".format(key))
+
+    return {
+        key: _get_terms(index, term_lengths, term_labels, start, method)
+        for key, index in indexes.items()
+    }
+
+
 def clean_caltrack_billing_data(data, source_interval):
     # check for empty data
     if data["value"].dropna().empty:
@@ -760,8 +1016,67 @@ def clean_caltrack_billing_data(data, source_interval):
     return data
 
 
-def downsample_and_clean_caltrack_daily_data(data):
-    data = as_freq(data.value, "D", include_coverage=True)
+def _day_chunk_starts(index, chunk_days):
+    # local midnights which split the days spanned by index into chunks of
+    # chunk_days days, the first at the start of the first day
+    if chunk_days < 1:
+        raise ValueError("chunk_days must be at least 1. Found: {}".format(chunk_days))
+    return pd.date_range(index[0].normalize(), index[-1], freq="D")[::chunk_days]
+
+
+def _as_daily_freq_chunked(data_series, chunk_days):
+    # as_freq(data_series, "D", include_coverage=True), computed chunk by chunk
+    # so that the minute-resolution intermediates only span one chunk. Each
+    # chunk also gets the reading before it, which is spread into its first
+    # day, and the reading after it, which ends the spread of its last
+    # reading, so every day is computed from exactly the same values as in
+    # the full series.
+    series = remove_duplicates(data_series)
+    if series.empty:
+        return as_freq(series, "D", include_coverage=True)
+
+    starts = _day_chunk_starts(series.index, chunk_days)
+    positions = series.index.searchsorted(starts)
+    ends = list(starts[1:]) + [None]
+    stops = list(positions[1:]) + [len(series)]
+
+    chunks = []
+    for start, end, i, j in zip(starts, ends, positions, stops):
+        chunk = as_freq(series.iloc[max(i - 1, 0) : j + 1], "D", include_coverage=True)
+        chunk = chunk[chunk.index >= start]
+        if end is not None:
+            chunk = chunk[chunk.index < end]
+        chunks.append(chunk)
+    resampled = pd.concat(chunks).asfreq("D")
+    # as_freq may drop the index name when it pads the last day, which only
+    # the last chunk does as the full series would
+    resampled.index.name = chunks[-1].index.name
+    return resampled
+
+
+def downsample_and_clean_caltrack_daily_data(data, chunk_days=None):
+    """Downsample interval meter data to daily values according to CalTRACK:
+    days with more than 50% coverage are scaled up to full coverage and other
+    days are set to ``NaN``.
+
+    Parameters
+    ----------
+    data : :any:`pandas.DataFrame`
+        Meter data with a ``value`` column and a :any:`pandas.DatetimeIndex`.
+    chunk_days : :any:`int`, optional
+        If given, resample the data in chunks of this many days, so that peak
+        memory is proportional to the chunk size instead of the length of the
+        data. The result is the same as without chunks.
+
+    Returns
+    -------
+    data : :any:`pandas.DataFrame`
+        Daily meter data with a ``value`` column.
+    """
+    if chunk_days is None:
+        data = as_freq(data.value, "D", include_coverage=True)
+    else:
+        data = _as_daily_freq_chunked(data.value, chunk_days)
 
     # CalTRACK 2.2.2.1 - interpolate with average of non-null values
     data.value[data.coverage > 0.5] = (
@@ -772,7 +1087,26 @@ def downsample_and_clean_caltrack_daily_data(data):
     return data[data.coverage > 0.5].reindex(data.index)[["value"]]
 
 
-def clean_caltrack_billing_daily_data(data, source_interval):
+def clean_caltrack_billing_daily_data(data, source_interval, chunk_days=None):
+    """Clean billing or daily meter data, or downsample interval meter data
+    to daily values, according to CalTRACK.
+
+    Parameters
+    ----------
+    data : :any:`pandas.DataFrame`
+        Meter data with a ``value`` column and a :any:`pandas.DatetimeIndex`.
+    source_interval : :any:`str`
+        The interval of the data, e.g., ``'billing_monthly'``,
+        ``'billing_bimonthly'``, ``'daily'``, ``'hourly'`` or ``'15min'``.
+    chunk_days : :any:`int`, optional
+        If given, downsample interval data in chunks of this many days. See
+        :any:`eemeter.downsample_and_clean_caltrack_daily_data`.
+
+    Returns
+    -------
+    data : :any:`pandas.DataFrame`
+        Cleaned billing or daily meter data.
+    """
     # billing data is cleaned but not resampled
     if source_interval.startswith("billing"):
         # CalTRACK 2.2.3.4, 2.2.3.5
@@ -783,4 +1117,4 @@ def clean_caltrack_billing_daily_data(data, source_interval):
     elif source_interval == "daily":
         return data
     else:
-        return downsample_and_clean_caltrack_daily_data(data)
+        return downsample_and_clean_caltrack_daily_data(data, chunk_days=chunk_days)
@@ -30,7 +30,56 @@ from .features import (
 __all__ = ("plot_energy_signature", "plot_time_series")
 
 
-def plot_time_series(meter_data, temperature_data, **kwargs):
+def _lttb_indices(x, y, n_out):
+    # Indices of n_out points chosen with Largest-Triangle-Three-Buckets
+    # downsampling: the first and last points are kept and, in each of
+    # n_out - 2 equal buckets in between, the point forming the largest
+    # triangle with the previously kept point and the mean of the next bucket.
+    # Buckets of only NaN values keep a NaN point so gaps stay visible.
+    n = len(x)
+    if n_out < 3:
+        raise ValueError("max_points must be at least 3.")
+    if n <= n_out:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    indices = np.empty(n_out, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i < n_out - 3:
+            next_x, next_y = x[end : edges[i + 2]], y[end : edges[i + 2]]
+        else:
+            next_x, next_y = x[n - 1 :], y[n - 1 :]
+        finite = np.isfinite(next_y)
+        avg_x = next_x.mean()
+        avg_y = next_y[finite].mean() if finite.any() else y[a]
+        # after a gap, choose the point farthest from the next bucket's mean
+        y_a = y[a] if np.isfinite(y[a]) else avg_y
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y_a)
+            - (x[a] - x[start:end]) * (avg_y - y_a)
+        )
+        if np.isnan(area).all():
+            a = start
+        else:
+            a = start + np.nanargmax(area)
+        indices[i + 1] = a
+    return indices
+
+
+def _downsample_series(series, max_points):
+    if max_points is None or len(series) <= max_points:
+        return series
+    index = series.index.asi8
+    x = (index - index[0]) / 1e9
+    y = series.to_numpy(dtype=np.float64)
+    return series.iloc[_lttb_indices(x, y, max_points)]
+
+
+def plot_time_series(meter_data, temperature_data, max_points=None, **kwargs):
     """Plot meter and temperature data in dual-axes time series.
 
     Parameters
@@ -39,6 +88,12 @@ def plot_time_series(meter_data, temperature_data, **kwargs):
         A :any:`pandas.DatetimeIndex`-indexed DataFrame of meter data with the column ``value``.
     temperature_data : :any:`pandas.Series`
         A :any:`pandas.DatetimeIndex`-indexed Series of temperature data.
+    max_points : :any:`int`, optional
+        If given, plot at most this many points of each series, chosen with
+        Largest-Triangle-Three-Buckets downsampling, which keeps the peaks
+        and troughs that define the shape of the series. Multi-year hourly
+        data then render quickly and readably, e.g., with
+        ``max_points=2000``.
     **kwargs
         Arbitrary keyword arguments to pass to
         :any:`plt.subplots <matplotlib.pyplot.subplots>`
@@ -58,15 +113,17 @@ def plot_time_series(meter_data, temperature_data, **kwargs):
     default_kwargs.update(kwargs)
     fig, ax1 = plt.subplots(**default_kwargs)
 
+    meter_value = _downsample_series(meter_data.value, max_points)
     ax1.plot(
-        meter_data.index,
-        meter_data.value,
+        meter_value.index,
+        meter_value,
         color="C0",
         label="Energy Use",
         drawstyle="steps-post",
     )
     ax1.set_ylabel("Energy Use")
 
+    temperature_data = _downsample_series(temperature_data, max_points)
     ax2 = ax1.twinx()
     ax2.plot(
         temperature_data.index,
@@ -89,6 +146,8 @@ def plot_energy_signature(
     ax=None,
     title=None,
     figsize=None,
+    kind="scatter",
+    data=None,
     **kwargs
 ):
     """Plot meter and temperature data in energy signature.
@@ -97,8 +156,10 @@ def plot_energy_signature(
     ----------
     meter_data : :any:`pandas.DataFrame`
         A :any:`pandas.DatetimeIndex`-indexed DataFrame of meter data with the column ``value``.
+        Not used if ``data`` is given.
     temperature_data : :any:`pandas.Series`
         A :any:`pandas.DatetimeIndex`-indexed Series of temperature data.
+        Not used if ``data`` is given.
     temp_col : :any:`str`, default ``'temperature_mean'``
         The name of the temperature column.
     ax : :any:`matplotlib.axes.Axes`
@@ -107,9 +168,21 @@ def plot_energy_signature(
         Chart title.
     figsize : :any:`tuple`, optional
         (width, height) of chart.
+    kind : :any:`str`, default ``'scatter'``
+        One of ``'scatter'``, which draws every point, or ``'hexbin'`` or
+        ``'hist2d'``, which draw the density of points in hexagonal or
+        rectangular bins. Binned plots render in constant time for any number
+        of points, so are better suited to multi-year hourly data or to many
+        meters at once.
+    data : :any:`pandas.DataFrame`, optional
+        A precomputed design matrix with columns ``meter_value`` and
+        ``temp_col``, such as the output of
+        :any:`eemeter.create_caltrack_daily_design_matrix`, or several of them
+        concatenated. If given, temperature features are not recomputed.
     **kwargs
         Arbitrary keyword arguments to pass to
-        :any:`matplotlib.axes.Axes.scatter`.
+        :any:`matplotlib.axes.Axes.scatter`, :any:`matplotlib.axes.Axes.hexbin`
+        or :any:`matplotlib.axes.Axes.hist2d`, depending on ``kind``.
 
     Returns
     -------
@@ -121,10 +194,24 @@ def plot_energy_signature(
     except ImportError:  # pragma: no cover
         raise ImportError("matplotlib is required for plotting.")
 
+    if kind not in ("scatter", "hexbin", "hist2d"):
+        raise ValueError(
+            "kind not recognized: {!r}. Use 'scatter', 'hexbin' or"
+            " 'hist2d'.".format(kind)
+        )
+
+    if temp_col is None:
+        temp_col = "temperature_mean"
+
     # format data
-    temperature_mean = compute_temperature_features(meter_data.index, temperature_data)
-    usage_per_day = compute_usage_per_day_feature(meter_data, series_name="meter_value")
-    df = merge_features([usage_per_day, temperature_mean.temperature_mean])
+    if data is None:
+        temperature_mean = compute_temperature_features(
+            meter_data.index, temperature_data
+        )
+        usage_per_day = compute_usage_per_day_feature(
+            meter_data, series_name="meter_value"
+        )
+        data = merge_features([usage_per_day, temperature_mean.temperature_mean])
 
     if figsize is None:
         figsize = (10, 4)
@@ -132,10 +219,19 @@ def plot_energy_signature(
     if ax is None:
         fig, ax = plt.subplots(figsize=figsize)
 
-    if temp_col is None:
-        temp_col = "temperature_mean"
-
-    ax.scatter(df[temp_col], df.meter_value, **kwargs)
+    if kind == "scatter":
+        ax.scatter(data[temp_col], data.meter_value, **kwargs)
+    else:
+        data = data[[temp_col, "meter_value"]].dropna()
+        x, y = data[temp_col].to_numpy(), data.meter_value.to_numpy()
+        if kind == "hexbin":
+            default_kwargs = {"gridsize": 50, "mincnt": 1}
+            default_kwargs.update(kwargs)
+            ax.hexbin(x, y, **default_kwargs)
+        else:
+            default_kwargs = {"bins": 50, "cmin": 1}
+            default_kwargs.update(kwargs)
+            ax.hist2d(x, y, **default_kwargs)
     ax.set_xlabel("Temperature")
     ax.set_ylabel("Energy Use per Day")
 
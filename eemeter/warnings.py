@@ -53,3 +53,16 @@ class EEMeterWarning(object):
             "description": self.description,
             "data": self.data,
         }
+
+    @classmethod
+    def from_json(cls, data):
+        """Loads a JSON-serializable representation into the warning state.
+
+        The input of this function is a dict which can be the result
+        of :any:`json.loads`.
+        """
+        return cls(
+            qualified_name=data.get("qualified_name"),
+            description=data.get("description"),
+            data=data.get("data"),
+        )
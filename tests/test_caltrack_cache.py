@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+"""
+import json
+import os
+
+import pytest
+
+from eemeter.caltrack.cache import FitResultCache
+from eemeter.caltrack.design_matrices import (
+    create_caltrack_daily_design_matrix,
+    create_caltrack_hourly_preliminary_design_matrix,
+    create_caltrack_hourly_segmented_design_matrices,
+)
+from eemeter.caltrack.hourly import fit_caltrack_hourly_model
+from eemeter.caltrack.usage_per_day import (
+    CalTRACKUsagePerDayModelResults,
+    fit_caltrack_usage_per_day_model,
+)
+from eemeter.features import (
+    compute_temperature_features,
+    compute_usage_per_day_feature,
+    estimate_hour_of_week_occupancy,
+    fit_temperature_bins,
+    merge_features,
+)
+from eemeter.segmentation import segment_time_series
+from eemeter.transform import get_baseline_data
+
+
+@pytest.fixture
+def cache(tmpdir):
+    return FitResultCache(str(tmpdir.join("cache")))
+
+
+@pytest.fixture
+def design_matrix(il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    blackout_start_date = il_electricity_cdd_hdd_daily["blackout_start_date"]
+    temperature_features = compute_temperature_features(
+        meter_data.index,
+        temperature_data,
+        heating_balance_points=[55, 60],
+        cooling_balance_points=[65, 70],
+        use_mean_daily_values=True,
+    )
+    meter_data_feature = compute_usage_per_day_feature(meter_data, "meter_value")
+    data = merge_features([meter_data_feature, temperature_features])
+    baseline_data, warnings = get_baseline_data(data, end=blackout_start_date)
+    return baseline_data
+
+
+def test_fit_result_cache_repr(cache):
+    assert repr(cache).startswith("FitResultCache(directory=")
+
+
+def test_fit_result_cache_key(cache, design_matrix):
+    key = cache.key("caltrack_usage_per_day", design_matrix, {"fit_cdd": True})
+    assert key == cache.key(
+        "caltrack_usage_per_day", design_matrix.copy(), {"fit_cdd": True}
+    )
+    assert key != cache.key("caltrack_usage_per_day", design_matrix, {})
+    assert key != cache.key("caltrack_hourly", design_matrix, {"fit_cdd": True})
+
+    changed = design_matrix.copy()
+    changed.iloc[0, 0] += 1
+    assert key != cache.key("caltrack_usage_per_day", changed, {"fit_cdd": True})
+
+    renamed = design_matrix.rename(columns={"hdd_55": "hdd_56"})
+    assert key != cache.key("caltrack_usage_per_day", renamed, {"fit_cdd": True})
+
+    with pytest.raises(TypeError):
+        cache.key("caltrack_usage_per_day", design_matrix, {"fit_cdd": object()})
+
+
+def test_fit_result_cache_get_set_invalidate(cache):
+    assert cache.get("abc") is None
+    assert "abc" not in cache
+    cache.set("abc", {"a": 1})
+    assert "abc" in cache
+    assert cache.get("abc") == {"a": 1}
+    assert cache.keys() == ["abc"]
+    assert cache.size > 0
+    assert cache.invalidate("abc") is True
+    assert cache.invalidate("abc") is False
+    assert cache.get("abc") is None
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.clear()
+    assert cache.keys() == []
+
+
+def test_fit_result_cache_corrupt_entry(cache):
+    with open(os.path.join(cache.directory, "abc.json"), "w") as f:
+        f.write("{")
+    assert cache.get("abc") is None
+    assert "abc" not in cache
+
+
+def test_fit_result_cache_eviction(tmpdir):
+    cache = FitResultCache(str(tmpdir), max_size=250)
+    for key in ["a", "b", "c"]:
+        cache.set(key, "x" * 100)
+        os.utime(os.path.join(cache.directory, key + ".json"), (0, 0))
+    assert sorted(cache.keys()) == ["b", "c"]
+
+    # reading an entry marks it as recently used
+    cache.get("b")
+    cache.set("d", "x" * 100)
+    assert sorted(cache.keys()) == ["b", "d"]
+    assert cache.size <= 250
+
+
+def test_fit_result_cache_usage_per_day(cache, design_matrix):
+    model_results = cache.fit_caltrack_usage_per_day_model(design_matrix)
+    assert len(cache.keys()) == 1
+
+    cached_results = cache.fit_caltrack_usage_per_day_model(design_matrix)
+    assert isinstance(cached_results, CalTRACKUsagePerDayModelResults)
+    assert json.dumps(cached_results.json(with_candidates=True)) == json.dumps(
+        model_results.json(with_candidates=True)
+    )
+    assert len(cache.keys()) == 1
+
+    billing_results = cache.fit_caltrack_usage_per_day_model(
+        design_matrix, use_billing_presets=True, weights_col="n_days_kept"
+    )
+    assert billing_results.interval == "billing"
+    assert len(cache.keys()) == 2
+
+    expected = fit_caltrack_usage_per_day_model(design_matrix)
+    assert cached_results.json() == expected.json()
+
+
+def test_fit_result_cache_usage_per_day_lazy(cache, il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    blackout_start_date = il_electricity_cdd_hdd_daily["blackout_start_date"]
+    baseline_meter_data, warnings = get_baseline_data(
+        meter_data, end=blackout_start_date, max_days=365
+    )
+    data = create_caltrack_daily_design_matrix(
+        baseline_meter_data, temperature_data, lazy=True
+    )
+    scaled_data = create_caltrack_daily_design_matrix(
+        baseline_meter_data * 3 + 10, temperature_data, lazy=True
+    )
+    assert len(data) == len(scaled_data)
+    assert cache.key("caltrack_usage_per_day", data) != cache.key(
+        "caltrack_usage_per_day", scaled_data
+    )
+
+    model_results = cache.fit_caltrack_usage_per_day_model(data, fit_cdd_hdd=False)
+    scaled_results = cache.fit_caltrack_usage_per_day_model(
+        scaled_data, fit_cdd_hdd=False
+    )
+    assert len(cache.keys()) == 2
+    expected = fit_caltrack_usage_per_day_model(scaled_data, fit_cdd_hdd=False)
+    assert scaled_results.json() == expected.json()
+    assert scaled_results.json() != model_results.json()
+
+    # accessing degree day columns doesn't change the key
+    key = cache.key("caltrack_usage_per_day", data)
+    data.to_frame()
+    assert cache.key("caltrack_usage_per_day", data) == key
+
+
+def test_fit_result_cache_hourly(cache, il_electricity_cdd_hdd_hourly):
+    meter_data = il_electricity_cdd_hdd_hourly["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_hourly["temperature_data"]
+    blackout_start_date = il_electricity_cdd_hdd_hourly["blackout_start_date"]
+    baseline_meter_data, warnings = get_baseline_data(
+        meter_data, end=blackout_start_date, max_days=365
+    )
+    preliminary_design_matrix = create_caltrack_hourly_preliminary_design_matrix(
+        baseline_meter_data, temperature_data
+    )
+    segmentation = segment_time_series(
+        preliminary_design_matrix.index, "three_month_weighted"
+    )
+    occupancy_lookup = estimate_hour_of_week_occupancy(
+        preliminary_design_matrix, segmentation=segmentation
+    )
+    occupied_temperature_bins, unoccupied_temperature_bins = fit_temperature_bins(
+        preliminary_design_matrix,
+        segmentation=segmentation,
+        occupancy_lookup=occupancy_lookup,
+    )
+    segmented_design_matrices = create_caltrack_hourly_segmented_design_matrices(
+        preliminary_design_matrix,
+        segmentation,
+        occupancy_lookup,
+        occupied_temperature_bins,
+        unoccupied_temperature_bins,
+    )
+    args = (
+        segmented_design_matrices,
+        occupancy_lookup,
+        occupied_temperature_bins,
+        unoccupied_temperature_bins,
+    )
+
+    model_results = cache.fit_caltrack_hourly_model(*args)
+    cached_results = cache.fit_caltrack_hourly_model(*args)
+    assert len(cache.keys()) == 1
+    assert json.dumps(cached_results.json()) == json.dumps(model_results.json())
+    assert json.dumps(cached_results.json()) == json.dumps(
+        fit_caltrack_hourly_model(*args).json()
+    )
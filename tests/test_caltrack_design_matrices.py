@@ -17,9 +17,12 @@
    limitations under the License.
 
 """
+import numpy as np
+import pandas as pd
 import pytest
 
 from eemeter.caltrack.design_matrices import (
+    CalTRACKUsagePerDayDesignMatrix,
     create_caltrack_hourly_preliminary_design_matrix,
     create_caltrack_hourly_segmented_design_matrices,
     create_caltrack_daily_design_matrix,
@@ -420,3 +423,90 @@ def test_create_caltrack_billing_design_matrix_partial_empty_temp(
         meter_data[:10], temperature_data
     )
     assert "n_days_kept" in design_matrix.columns
+
+
+def test_create_caltrack_daily_design_matrix_chunked(il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    design_matrix = create_caltrack_daily_design_matrix(
+        meter_data[:100], temperature_data
+    )
+    chunked_design_matrix = create_caltrack_daily_design_matrix(
+        meter_data[:100], temperature_data, chunk_days=30
+    )
+    pd.testing.assert_frame_equal(chunked_design_matrix, design_matrix)
+
+
+def test_create_caltrack_daily_design_matrix_lazy(il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    design_matrix = create_caltrack_daily_design_matrix(
+        meter_data[:100], temperature_data
+    )
+    lazy_design_matrix = create_caltrack_daily_design_matrix(
+        meter_data[:100], temperature_data, lazy=True
+    )
+    assert isinstance(lazy_design_matrix, CalTRACKUsagePerDayDesignMatrix)
+    assert lazy_design_matrix.shape == (100, 128)
+    assert list(lazy_design_matrix.columns) == list(design_matrix.columns)
+    assert "hdd_60" in lazy_design_matrix
+    assert "hdd_29" not in lazy_design_matrix
+    assert len(lazy_design_matrix._degree_days) == 0
+    pd.testing.assert_series_equal(
+        lazy_design_matrix["cdd_65"], design_matrix["cdd_65"], check_index=False
+    )
+    assert len(lazy_design_matrix._degree_days) == 1
+    pd.testing.assert_frame_equal(
+        lazy_design_matrix.to_frame(), design_matrix, check_dtype=False
+    )
+
+
+def test_create_caltrack_billing_design_matrix_lazy(
+    il_electricity_cdd_hdd_billing_monthly
+):
+    meter_data = il_electricity_cdd_hdd_billing_monthly["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_billing_monthly["temperature_data"]
+    design_matrix = create_caltrack_billing_design_matrix(
+        meter_data[:10], temperature_data
+    )
+    lazy_design_matrix = create_caltrack_billing_design_matrix(
+        meter_data[:10], temperature_data, lazy=True
+    )
+    pd.testing.assert_frame_equal(
+        lazy_design_matrix.to_frame(), design_matrix, check_dtype=False
+    )
+    data = lazy_design_matrix.to_frame(
+        heating_balance_points=[60], cooling_balance_points=[70]
+    )
+    assert list(data.columns) == [
+        "meter_value",
+        "temperature_not_null",
+        "temperature_null",
+        "temperature_mean",
+        "n_days_kept",
+        "n_days_dropped",
+        "cdd_70",
+        "hdd_60",
+    ]
+
+
+def test_create_caltrack_billing_design_matrix_lazy_empty_temp(
+    il_electricity_cdd_hdd_billing_monthly
+):
+    meter_data = il_electricity_cdd_hdd_billing_monthly["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_billing_monthly["temperature_data"][:0]
+    lazy_design_matrix = create_caltrack_billing_design_matrix(
+        meter_data[:10], temperature_data, lazy=True
+    )
+    assert "n_days_kept" in lazy_design_matrix.columns
+    assert np.isnan(lazy_design_matrix["hdd_60"]).all()
+
+
+def test_caltrack_usage_per_day_design_matrix_bad_column(il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    lazy_design_matrix = create_caltrack_daily_design_matrix(
+        meter_data[:10], temperature_data, lazy=True
+    )
+    with pytest.raises(KeyError):
+        lazy_design_matrix["weight"]
@@ -22,7 +22,12 @@ import numpy as np
 import pandas as pd
 import pytest
 
+from eemeter.caltrack.design_matrices import (
+    create_caltrack_hourly_preliminary_design_matrix,
+    create_caltrack_hourly_segmented_design_matrices,
+)
 from eemeter.caltrack.hourly import (
+    CalTRACKHourlyModel,
     caltrack_hourly_fit_feature_processor,
     caltrack_hourly_prediction_feature_processor,
     fit_caltrack_hourly_model_segment,
@@ -32,8 +37,12 @@ from eemeter.features import (
     compute_time_features,
     compute_temperature_features,
     compute_usage_per_day_feature,
+    estimate_hour_of_week_occupancy,
+    fit_temperature_bins,
     merge_features,
 )
+from eemeter.segmentation import segment_time_series
+from eemeter.transform import get_baseline_data
 
 
 @pytest.fixture
@@ -130,6 +139,34 @@ def test_caltrack_hourly_prediction_feature_processor(
     assert round(result.sum().sum(), 2) == 4956.0
 
 
+def test_caltrack_hourly_feature_processors_float32(
+    segmented_data,
+    occupancy_lookup,
+    occupied_temperature_bins,
+    unoccupied_temperature_bins,
+):
+    for feature_processor in [
+        caltrack_hourly_fit_feature_processor,
+        caltrack_hourly_prediction_feature_processor,
+    ]:
+        args = (
+            "dec-jan-feb-weighted",
+            segmented_data,
+            occupancy_lookup,
+            occupied_temperature_bins,
+            unoccupied_temperature_bins,
+        )
+        expected = feature_processor(*args)
+        result = feature_processor(*args, dtype="float32")
+        assert list(result.columns) == list(expected.columns)
+        assert result.hour_of_week.equals(expected.hour_of_week)
+        float_columns = [c for c in result.columns if c != "hour_of_week"]
+        assert (result[float_columns].dtypes == "float32").all()
+        assert np.allclose(
+            result[float_columns], expected[float_columns], rtol=1e-7, atol=1e-5
+        )
+
+
 @pytest.fixture
 def segmented_design_matrices(
     segmented_data,
@@ -474,3 +511,80 @@ def test_fit_caltrack_hourly_model_segment_single_mode(
     assert segment_model.warnings is not None
     prediction = segment_model.predict(segment_data)
     assert round(prediction.sum(), 2) == 960.0
+
+
+def _fit_caltrack_hourly_model_sample(meter_data, temperature_data, dtype):
+    preliminary_design_matrix = create_caltrack_hourly_preliminary_design_matrix(
+        meter_data, temperature_data, dtype=dtype
+    )
+    segmentation = segment_time_series(
+        preliminary_design_matrix.index, "three_month_weighted"
+    )
+    occupancy_lookup = estimate_hour_of_week_occupancy(
+        preliminary_design_matrix, segmentation=segmentation
+    )
+    occupied_temperature_bins, unoccupied_temperature_bins = fit_temperature_bins(
+        preliminary_design_matrix,
+        segmentation=segmentation,
+        occupancy_lookup=occupancy_lookup,
+    )
+    segmented_design_matrices = create_caltrack_hourly_segmented_design_matrices(
+        preliminary_design_matrix,
+        segmentation,
+        occupancy_lookup,
+        occupied_temperature_bins,
+        unoccupied_temperature_bins,
+        dtype=dtype,
+    )
+    return segmented_design_matrices, fit_caltrack_hourly_model(
+        segmented_design_matrices,
+        occupancy_lookup,
+        occupied_temperature_bins,
+        unoccupied_temperature_bins,
+        dtype=dtype,
+    )
+
+
+def test_fit_caltrack_hourly_model_float32(il_electricity_cdd_hdd_hourly):
+    meter_data = il_electricity_cdd_hdd_hourly["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_hourly["temperature_data"]
+    blackout_start_date = il_electricity_cdd_hdd_hourly["blackout_start_date"]
+    baseline_meter_data, warnings = get_baseline_data(
+        meter_data, end=blackout_start_date, max_days=365
+    )
+    expected_design_matrices, expected = _fit_caltrack_hourly_model_sample(
+        baseline_meter_data, temperature_data, None
+    )
+    design_matrices, model_results = _fit_caltrack_hourly_model_sample(
+        baseline_meter_data, temperature_data, "float32"
+    )
+
+    for segment_name, design_matrix in design_matrices.items():
+        expected_design_matrix = expected_design_matrices[segment_name]
+        assert design_matrix.memory_usage(index=False).sum() < (
+            0.6 * expected_design_matrix.memory_usage(index=False).sum()
+        )
+        assert design_matrix.meter_value.dtype == np.float32
+
+    # parameters are fit in float64 from features rounded to float32
+    assert model_results.model.dtype == "float32"
+    for segment_model, expected_segment_model in zip(
+        model_results.model.segment_models, expected.model.segment_models
+    ):
+        params = pd.Series(segment_model.model_params)
+        expected_params = pd.Series(expected_segment_model.model_params)
+        assert params.dtype == np.float64
+        assert np.allclose(params, expected_params, rtol=1e-5, atol=1e-5)
+
+    prediction_index = temperature_data.index[: 24 * 30]
+    prediction = model_results.predict(
+        prediction_index, temperature_data[prediction_index]
+    ).result.predicted_usage
+    expected_prediction = expected.predict(
+        prediction_index, temperature_data[prediction_index]
+    ).result.predicted_usage
+    assert prediction.dtype == np.float64
+    assert np.allclose(prediction, expected_prediction, rtol=1e-5, atol=1e-5)
+
+    model = CalTRACKHourlyModel.from_json(model_results.model.json())
+    assert model.dtype == "float32"
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+"""
+import json
+
+import pytest
+
+from eemeter.caltrack.design_matrices import (
+    create_caltrack_billing_design_matrix,
+    create_caltrack_daily_design_matrix,
+)
+from eemeter.caltrack.incremental import CalTRACKUsagePerDayFitState
+from eemeter.caltrack.usage_per_day import fit_caltrack_usage_per_day_model
+from eemeter.transform import get_baseline_data
+
+
+@pytest.fixture
+def daily_design_matrix(il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    blackout_start_date = il_electricity_cdd_hdd_daily["blackout_start_date"]
+    baseline_meter_data, warnings = get_baseline_data(
+        meter_data, end=blackout_start_date, max_days=365
+    )
+    return create_caltrack_daily_design_matrix(baseline_meter_data, temperature_data)
+
+
+@pytest.fixture
+def billing_design_matrix(il_electricity_cdd_hdd_billing_monthly):
+    meter_data = il_electricity_cdd_hdd_billing_monthly["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_billing_monthly["temperature_data"]
+    blackout_start_date = il_electricity_cdd_hdd_billing_monthly["blackout_start_date"]
+    baseline_meter_data, warnings = get_baseline_data(
+        meter_data, end=blackout_start_date, max_days=365
+    )
+    return create_caltrack_billing_design_matrix(baseline_meter_data, temperature_data)
+
+
+def _assert_results_match(results, expected):
+    assert results.status == expected.status
+    assert results.interval == expected.interval
+    assert results.settings == expected.settings
+    assert results.model.model_type == expected.model.model_type
+    assert results.r_squared_adj == pytest.approx(expected.r_squared_adj)
+    for key, value in expected.model.model_params.items():
+        assert results.model.model_params[key] == pytest.approx(value)
+
+    assert len(results.candidates) == len(expected.candidates)
+    for candidate, expected_candidate in zip(results.candidates, expected.candidates):
+        assert candidate.formula == expected_candidate.formula
+        assert candidate.status == expected_candidate.status
+        assert [w.qualified_name for w in candidate.warnings] == [
+            w.qualified_name for w in expected_candidate.warnings
+        ]
+        if expected_candidate.r_squared_adj is not None:
+            assert candidate.r_squared_adj == pytest.approx(
+                expected_candidate.r_squared_adj
+            )
+
+
+def test_fit_state_daily_matches_full_fit(daily_design_matrix):
+    fit_state = CalTRACKUsagePerDayFitState.from_design_matrix(daily_design_matrix)
+    assert fit_state.n_periods == daily_design_matrix.dropna().shape[0]
+    assert str(fit_state).startswith("CalTRACKUsagePerDayFitState")
+
+    _assert_results_match(
+        fit_state.fit(), fit_caltrack_usage_per_day_model(daily_design_matrix)
+    )
+
+
+def test_fit_state_billing_matches_full_fit(billing_design_matrix):
+    fit_state = CalTRACKUsagePerDayFitState.from_design_matrix(
+        billing_design_matrix, weights_col="n_days_kept"
+    )
+    _assert_results_match(
+        fit_state.fit(use_billing_presets=True),
+        fit_caltrack_usage_per_day_model(
+            billing_design_matrix, use_billing_presets=True, weights_col="n_days_kept"
+        ),
+    )
+
+
+def test_fit_state_p_value_disqualification(daily_design_matrix):
+    data = daily_design_matrix[["meter_value", "cdd_65", "cdd_70", "hdd_50", "hdd_60"]]
+    fit_state = CalTRACKUsagePerDayFitState.from_design_matrix(data)
+    kwargs = {"beta_cdd_maximum_p_value": 1e-50, "beta_hdd_maximum_p_value": 1e-50}
+    _assert_results_match(
+        fit_state.fit(**kwargs), fit_caltrack_usage_per_day_model(data, **kwargs)
+    )
+
+
+def test_fit_state_add_and_remove_periods(daily_design_matrix):
+    data = daily_design_matrix[["meter_value", "cdd_65", "cdd_70", "hdd_50", "hdd_60"]]
+    fit_state = CalTRACKUsagePerDayFitState.from_design_matrix(data.iloc[:200])
+
+    # slide the window forward by 100 periods
+    fit_state.add_periods(data.iloc[200:300])
+    fit_state.remove_periods(data.iloc[:100])
+
+    assert fit_state.n_periods == data.iloc[100:300].dropna().shape[0]
+    assert fit_state.periods.equals(data.iloc[100:300].dropna().index)
+    _assert_results_match(
+        fit_state.fit(), fit_caltrack_usage_per_day_model(data.iloc[100:300])
+    )
+
+
+def test_fit_state_add_duplicate_periods(daily_design_matrix):
+    fit_state = CalTRACKUsagePerDayFitState.from_design_matrix(
+        daily_design_matrix.iloc[:10]
+    )
+    with pytest.raises(ValueError):
+        fit_state.add_periods(daily_design_matrix.iloc[5:15])
+
+
+def test_fit_state_remove_missing_periods(daily_design_matrix):
+    fit_state = CalTRACKUsagePerDayFitState.from_design_matrix(
+        daily_design_matrix.iloc[:10]
+    )
+    with pytest.raises(ValueError):
+        fit_state.remove_periods(daily_design_matrix.iloc[5:15])
+
+
+def test_fit_state_no_data():
+    fit_state = CalTRACKUsagePerDayFitState([65], [60])
+    results = fit_state.fit()
+    assert results.status == "NO DATA"
+    assert results.warnings[0].qualified_name == (
+        "eemeter.caltrack_usage_per_day.no_data"
+    )
+
+
+def test_fit_state_billing_presets_require_weights(billing_design_matrix):
+    fit_state = CalTRACKUsagePerDayFitState.from_design_matrix(billing_design_matrix)
+    with pytest.raises(ValueError):
+        fit_state.fit(use_billing_presets=True)
+
+
+def test_fit_state_json(daily_design_matrix):
+    fit_state = CalTRACKUsagePerDayFitState.from_design_matrix(daily_design_matrix)
+    loaded = CalTRACKUsagePerDayFitState.from_json(
+        json.loads(json.dumps(fit_state.json()))
+    )
+    assert loaded.cooling_balance_points == fit_state.cooling_balance_points
+    assert loaded.heating_balance_points == fit_state.heating_balance_points
+    assert loaded.periods.equals(fit_state.periods)
+    assert loaded.fit().json(with_candidates=True) == fit_state.fit().json(
+        with_candidates=True
+    )
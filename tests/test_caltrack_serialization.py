@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+"""
+import json
+
+import numpy as np
+import pytest
+
+from eemeter.caltrack.design_matrices import (
+    create_caltrack_daily_design_matrix,
+    create_caltrack_hourly_preliminary_design_matrix,
+    create_caltrack_hourly_segmented_design_matrices,
+)
+from eemeter.caltrack.hourly import (
+    CalTRACKHourlyModelResults,
+    fit_caltrack_hourly_model,
+)
+from eemeter.caltrack.serialization import (
+    model_results_from_npz,
+    model_results_to_npz,
+)
+from eemeter.caltrack.usage_per_day import (
+    CalTRACKUsagePerDayModelResults,
+    fit_caltrack_usage_per_day_model,
+)
+from eemeter.features import estimate_hour_of_week_occupancy, fit_temperature_bins
+from eemeter.segmentation import segment_time_series
+from eemeter.transform import get_baseline_data
+
+
+@pytest.fixture
+def usage_per_day_model_results(il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    blackout_start_date = il_electricity_cdd_hdd_daily["blackout_start_date"]
+    baseline_meter_data, warnings = get_baseline_data(
+        meter_data, end=blackout_start_date, max_days=365
+    )
+    design_matrix = create_caltrack_daily_design_matrix(
+        baseline_meter_data, temperature_data
+    )
+    return fit_caltrack_usage_per_day_model(design_matrix)
+
+
+@pytest.fixture
+def hourly_model_results(il_electricity_cdd_hdd_hourly):
+    meter_data = il_electricity_cdd_hdd_hourly["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_hourly["temperature_data"]
+    blackout_start_date = il_electricity_cdd_hdd_hourly["blackout_start_date"]
+    baseline_meter_data, warnings = get_baseline_data(
+        meter_data, end=blackout_start_date, max_days=365
+    )
+    preliminary_design_matrix = create_caltrack_hourly_preliminary_design_matrix(
+        baseline_meter_data, temperature_data
+    )
+    segmentation = segment_time_series(
+        preliminary_design_matrix.index, "three_month_weighted"
+    )
+    occupancy_lookup = estimate_hour_of_week_occupancy(
+        preliminary_design_matrix, segmentation=segmentation
+    )
+    occupied_temperature_bins, unoccupied_temperature_bins = fit_temperature_bins(
+        preliminary_design_matrix,
+        segmentation=segmentation,
+        occupancy_lookup=occupancy_lookup,
+    )
+    segmented_design_matrices = create_caltrack_hourly_segmented_design_matrices(
+        preliminary_design_matrix,
+        segmentation,
+        occupancy_lookup,
+        occupied_temperature_bins,
+        unoccupied_temperature_bins,
+    )
+    return fit_caltrack_hourly_model(
+        segmented_design_matrices,
+        occupancy_lookup,
+        occupied_temperature_bins,
+        unoccupied_temperature_bins,
+    )
+
+
+@pytest.mark.parametrize("with_candidates", [False, True])
+def test_model_results_npz_usage_per_day(
+    tmpdir, usage_per_day_model_results, with_candidates
+):
+    path = str(tmpdir.join("model.npz"))
+    model_results_to_npz(
+        usage_per_day_model_results, path, with_candidates=with_candidates
+    )
+    loaded = model_results_from_npz(path)
+    assert isinstance(loaded, CalTRACKUsagePerDayModelResults)
+    assert json.dumps(loaded.json(with_candidates=with_candidates)) == json.dumps(
+        usage_per_day_model_results.json(with_candidates=with_candidates)
+    )
+    # balance points stay ints
+    assert loaded.model.model_params["cooling_balance_point"] == 68
+    assert isinstance(loaded.model.model_params["cooling_balance_point"], int)
+
+
+def test_model_results_npz_usage_per_day_none_params(tmpdir):
+    model_results = CalTRACKUsagePerDayModelResults.from_json(
+        {
+            "status": "SUCCESS",
+            "method_name": "caltrack_usage_per_day",
+            "model": {
+                "model_type": "intercept_only",
+                "formula": "meter_value ~ 1",
+                "status": "QUALIFIED",
+                "model_params": {"intercept": None, "flag": True, "name": "x"},
+                "r_squared_adj": 0,
+                "warnings": [],
+            },
+        }
+    )
+    path = str(tmpdir.join("model.npz"))
+    model_results_to_npz(model_results, path)
+    loaded = model_results_from_npz(path)
+    assert loaded.model.model_params == {"intercept": None, "flag": True, "name": "x"}
+
+
+def test_model_results_npz_hourly(tmpdir, hourly_model_results):
+    path = str(tmpdir.join("model.npz"))
+    model_results_to_npz(hourly_model_results, path)
+    loaded = model_results_from_npz(path)
+    assert isinstance(loaded, CalTRACKHourlyModelResults)
+    assert json.dumps(loaded.json()) == json.dumps(hourly_model_results.json())
+
+    with np.load(path) as npz:
+        assert npz["param_values"].dtype == np.float64
+        assert npz["occupancy_lookup_values"].shape == (168, 12)
+
+    json_loaded = CalTRACKHourlyModelResults.from_json(
+        json.loads(json.dumps(hourly_model_results.json()))
+    )
+    assert (
+        loaded.model.occupancy_lookup.index.dtype
+        == json_loaded.model.occupancy_lookup.index.dtype
+    )
+
+
+def test_model_results_npz_hourly_no_model(tmpdir):
+    model_results = CalTRACKHourlyModelResults("NO MODEL", "caltrack_hourly")
+    path = str(tmpdir.join("model.npz"))
+    model_results_to_npz(model_results, path)
+    loaded = model_results_from_npz(path)
+    assert loaded.model is None
+    assert loaded.json() == model_results.json()
+
+
+def test_model_results_npz_bad_type(tmpdir):
+    with pytest.raises(ValueError):
+        model_results_to_npz(object(), str(tmpdir.join("model.npz")))
@@ -23,6 +23,7 @@ import numpy as np
 import pandas as pd
 import pytest
 
+from eemeter.caltrack.design_matrices import create_caltrack_daily_design_matrix
 from eemeter.caltrack.usage_per_day import (
     CalTRACKUsagePerDayCandidateModel,
     CalTRACKUsagePerDayModelResults,
@@ -31,6 +32,7 @@ from eemeter.caltrack.usage_per_day import (
     fit_caltrack_usage_per_day_model,
     caltrack_usage_per_day_predict,
     caltrack_sufficiency_criteria,
+    caltrack_sufficiency_criteria_batch,
     get_intercept_only_candidate_models,
     get_too_few_non_zero_degree_day_warning,
     get_total_degree_day_too_low_warning,
@@ -39,6 +41,7 @@ from eemeter.caltrack.usage_per_day import (
     get_cdd_only_candidate_models,
     get_hdd_only_candidate_models,
     get_cdd_hdd_candidate_models,
+    get_single_cdd_hdd_candidate_model,
     select_best_candidate,
 )
 from eemeter.exceptions import MissingModelParameterError, UnrecognizedModelTypeError
@@ -814,6 +817,40 @@ def test_caltrack_predict_design_matrix_no_days_fails(
         )
 
 
+def test_caltrack_predict_design_matrix_disaggregated_nan_rows(
+    cdd_hdd_h54_c67_billing_monthly_avgs
+):
+    data = cdd_hdd_h54_c67_billing_monthly_avgs.copy()
+    data.iloc[3, data.columns.get_loc("temperature_mean")] = np.nan
+    model_params = {
+        "intercept": 13.420093629452852,
+        "beta_cdd": 2.257868665412409,
+        "beta_hdd": 1.0479347638717025,
+        "cooling_balance_point": 67,
+        "heating_balance_point": 54,
+    }
+    prediction = _caltrack_predict_design_matrix(
+        "cdd_hdd", model_params, data, input_averages=True, output_averages=False
+    )
+    disaggregated = _caltrack_predict_design_matrix(
+        "cdd_hdd",
+        model_params,
+        data,
+        disaggregated=True,
+        input_averages=True,
+        output_averages=False,
+    )
+    assert list(disaggregated.columns) == ["base_load", "heating_load", "cooling_load"]
+    assert disaggregated.index.equals(data.index)
+    assert disaggregated.iloc[3].isnull().all()
+    assert pd.isnull(prediction.iloc[3])
+    assert prediction.equals(
+        disaggregated.base_load
+        + disaggregated.heating_load
+        + disaggregated.cooling_load
+    )
+
+
 def test_get_too_few_non_zero_degree_day_warning_ok():
     warnings = get_too_few_non_zero_degree_day_warning(
         model_type="model_type",
@@ -1401,6 +1438,48 @@ def test_get_cdd_hdd_candidate_models_error():
     assert warning.data["traceback"] is not None
 
 
+def test_get_cdd_hdd_candidate_models_matches_single_candidates():
+    data = pd.DataFrame(
+        {
+            "meter_value": [6, 1, 1, 6, 3],
+            "cdd_60": [6, 0.5, 0.5, 0, 2],
+            "cdd_65": [5, 0, 0.1, 0, 1],
+            "hdd_60": [0, 0, 0, 4, 0],
+            "hdd_65": [0, 0.1, 0.1, 5, 0],
+        }
+    )
+    candidate_models = get_cdd_hdd_candidate_models(
+        data, 2, 2, 2, 2, 0.1, 0.1, None, max_workers=2
+    )
+    expected = [
+        get_single_cdd_hdd_candidate_model(data, 2, 2, 2, 2, 0.1, 0.1, None, c, h)
+        for c, h in [(60, 60), (65, 60), (65, 65)]
+    ]
+    assert [m.formula for m in candidate_models] == [m.formula for m in expected]
+    assert [m.status for m in candidate_models] == [m.status for m in expected]
+    assert [m.status for m in candidate_models].count("NOT ATTEMPTED") == 2
+    assert [m.json() for m in candidate_models] == [m.json() for m in expected]
+
+
+def test_get_cdd_hdd_candidate_models_balance_points():
+    data = pd.DataFrame(
+        {
+            "meter_value": [6, 1, 1, 6, 3],
+            "cdd_60": [6, 0.5, 0.5, 0, 2],
+            "cdd_65": [5, 0, 0.1, 0, 1],
+            "hdd_60": [0, 0, 0.1, 4, 0],
+            "hdd_65": [0, 0.1, 0.1, 5, 0],
+        }
+    )
+    candidate_models = get_cdd_hdd_candidate_models(
+        data, 1, 1, 1, 1, 0.1, 0.1, None, balance_points=[(65, 65), (65, 60)]
+    )
+    assert [m.formula for m in candidate_models] == [
+        "meter_value ~ cdd_65 + hdd_65",
+        "meter_value ~ cdd_65 + hdd_60",
+    ]
+
+
 @pytest.fixture
 def candidate_model_qualified_high_r2():
     return CalTRACKUsagePerDayCandidateModel(
@@ -1561,6 +1640,133 @@ def test_fit_caltrack_usage_per_day_model_cdd_hdd_use_billing_presets_no_weights
     assert "weights_col" in str(exc_info.value)
 
 
+def test_fit_caltrack_usage_per_day_model_max_workers(il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    blackout_start_date = il_electricity_cdd_hdd_daily["blackout_start_date"]
+    temperature_features = compute_temperature_features(
+        meter_data.index,
+        temperature_data,
+        heating_balance_points=range(55, 66),
+        cooling_balance_points=range(60, 71),
+        use_mean_daily_values=True,
+    )
+    meter_data_feature = compute_usage_per_day_feature(meter_data, "meter_value")
+    data = merge_features([meter_data_feature, temperature_features])
+    baseline_data, warnings = get_baseline_data(data, end=blackout_start_date)
+
+    serial_results = fit_caltrack_usage_per_day_model(baseline_data)
+    threaded_results = fit_caltrack_usage_per_day_model(baseline_data, max_workers=4)
+    assert threaded_results.json(with_candidates=True) == serial_results.json(
+        with_candidates=True
+    )
+
+
+@pytest.fixture
+def cdd_hdd_full_grid(il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    blackout_start_date = il_electricity_cdd_hdd_daily["blackout_start_date"]
+    temperature_features = compute_temperature_features(
+        meter_data.index,
+        temperature_data,
+        heating_balance_points=range(40, 81),
+        cooling_balance_points=range(50, 91),
+        use_mean_daily_values=True,
+    )
+    meter_data_feature = compute_usage_per_day_feature(meter_data, "meter_value")
+    data = merge_features([meter_data_feature, temperature_features])
+    baseline_data, warnings = get_baseline_data(data, end=blackout_start_date)
+    return baseline_data
+
+
+def test_fit_caltrack_usage_per_day_model_coarse_to_fine(cdd_hdd_full_grid):
+    exhaustive = fit_caltrack_usage_per_day_model(cdd_hdd_full_grid)
+    model_results = fit_caltrack_usage_per_day_model(
+        cdd_hdd_full_grid, balance_point_search="coarse_to_fine"
+    )
+    assert len(model_results.candidates) < len(exhaustive.candidates) / 4
+    assert model_results.model.model_type == exhaustive.model.model_type
+    assert model_results.model.model_params == exhaustive.model.model_params
+    assert model_results.settings["balance_point_search"] == "coarse_to_fine"
+    assert model_results.settings["coarse_balance_point_step"] == 3
+    assert "balance_point_search" not in exhaustive.settings
+
+    # evaluated candidates are reported in exhaustive search order
+    exhaustive_formulas = [c.formula for c in exhaustive.candidates]
+    formulas = [c.formula for c in model_results.candidates]
+    assert len(set(formulas)) == len(formulas)
+    assert formulas == [f for f in exhaustive_formulas if f in set(formulas)]
+    # the coarse grid keeps both ends of each axis
+    assert "meter_value ~ hdd_40" in formulas
+    assert "meter_value ~ hdd_80" in formulas
+    assert "meter_value ~ hdd_78" not in formulas
+
+
+def test_fit_caltrack_usage_per_day_model_coarse_to_fine_step_one(cdd_hdd_full_grid):
+    exhaustive = fit_caltrack_usage_per_day_model(cdd_hdd_full_grid, fit_cdd_hdd=False)
+    model_results = fit_caltrack_usage_per_day_model(
+        cdd_hdd_full_grid,
+        fit_cdd_hdd=False,
+        balance_point_search="coarse_to_fine",
+        coarse_balance_point_step=1,
+    )
+    assert [c.json() for c in model_results.candidates] == [
+        c.json() for c in exhaustive.candidates
+    ]
+
+
+def test_fit_caltrack_usage_per_day_model_lazy_design_matrix(
+    il_electricity_cdd_hdd_daily
+):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"][:365]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    data = create_caltrack_daily_design_matrix(meter_data, temperature_data)
+    lazy_data = create_caltrack_daily_design_matrix(
+        meter_data, temperature_data, lazy=True
+    )
+    model_results = fit_caltrack_usage_per_day_model(
+        data, balance_point_search="coarse_to_fine"
+    )
+    lazy_model_results = fit_caltrack_usage_per_day_model(
+        lazy_data, balance_point_search="coarse_to_fine"
+    )
+    # only the searched balance points are computed
+    assert 0 < len(lazy_data._degree_days) < 122
+    assert lazy_model_results.model.formula == model_results.model.formula
+    assert [c.formula for c in lazy_model_results.candidates] == [
+        c.formula for c in model_results.candidates
+    ]
+    for name, value in model_results.model.model_params.items():
+        assert lazy_model_results.model.model_params[name] == pytest.approx(value)
+    assert lazy_model_results.totals_metrics.r_squared == pytest.approx(
+        model_results.totals_metrics.r_squared
+    )
+
+    model = lazy_model_results.model
+    prediction = _caltrack_predict_design_matrix(
+        model.model_type, model.model_params, lazy_data, disaggregated=True
+    )
+    expected = _caltrack_predict_design_matrix(
+        model.model_type, model.model_params, data, disaggregated=True
+    )
+    assert prediction.isnull().sum().sum() == expected.isnull().sum().sum()
+    assert prediction.sum().sum() == pytest.approx(expected.sum().sum())
+
+
+def test_fit_caltrack_usage_per_day_model_bad_balance_point_search(cdd_hdd_h60_c65):
+    with pytest.raises(ValueError) as exc_info:
+        fit_caltrack_usage_per_day_model(cdd_hdd_h60_c65, balance_point_search="x")
+    assert "balance_point_search" in str(exc_info.value)
+    with pytest.raises(ValueError) as exc_info:
+        fit_caltrack_usage_per_day_model(
+            cdd_hdd_h60_c65,
+            balance_point_search="coarse_to_fine",
+            coarse_balance_point_step=0,
+        )
+    assert "coarse_balance_point_step" in str(exc_info.value)
+
+
 # When model is intercept-only, num_parameters should = 0 with cvrmse = cvrmse_adj
 def test_fit_caltrack_usage_per_day_model_num_parameters_equals_zero():
     data = pd.DataFrame(
@@ -1992,6 +2198,78 @@ def test_caltrack_sufficiency_criteria_handle_single_input():
     assert len(data_sufficiency.warnings) == 3
 
 
+@pytest.fixture
+def long_data_quality():
+    index = pd.date_range(start="2016-01-02", periods=5, freq="D", tz="UTC")
+    return pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "meter_id": "extreme",
+                    "meter_value": [1, 1, 99999, 1, np.nan],
+                    "temperature_not_null": np.ones(5),
+                    "temperature_null": np.zeros(5),
+                },
+                index=index,
+            ),
+            pd.DataFrame(
+                {
+                    "meter_id": "negative",
+                    "meter_value": [-1, 1, np.nan],
+                    "temperature_not_null": [1, 1, 1],
+                    "temperature_null": [0, 0, 1],
+                },
+                index=index[:3],
+            ),
+            pd.DataFrame(
+                {
+                    "meter_id": "no_data",
+                    "meter_value": [np.nan, np.nan],
+                    "temperature_not_null": [1, 5],
+                    "temperature_null": [0, 5],
+                },
+                index=index[:2],
+            ),
+        ]
+    ).sample(frac=1, random_state=0)
+
+
+def test_caltrack_sufficiency_criteria_batch(long_data_quality):
+    requested_start = {"extreme": pd.Timestamp("2016-01-02").tz_localize("UTC")}
+    requested_end = pd.Timestamp("2016-01-06").tz_localize("UTC")
+    data_sufficiencies = caltrack_sufficiency_criteria_batch(
+        long_data_quality, requested_start, requested_end, num_days=4
+    )
+    assert sorted(data_sufficiencies) == ["extreme", "negative", "no_data"]
+    for meter_id, data_quality in long_data_quality.groupby("meter_id"):
+        data_sufficiency = caltrack_sufficiency_criteria(
+            data_quality.drop(columns=["meter_id"]).sort_index(),
+            requested_start.get(meter_id),
+            requested_end,
+            num_days=4,
+        )
+        assert data_sufficiencies[meter_id].json() == data_sufficiency.json()
+
+    assert data_sufficiencies["extreme"].status == "PASS"
+    assert data_sufficiencies["negative"].status == "FAIL"
+    assert data_sufficiencies["no_data"].status == "NO DATA"
+
+
+def test_caltrack_sufficiency_criteria_batch_as_frame(long_data_quality):
+    summary = caltrack_sufficiency_criteria_batch(
+        long_data_quality, None, None, num_days=4, as_frame=True
+    )
+    assert summary.index.name == "meter_id"
+    assert summary.loc["extreme", "status"] == "PASS"
+    assert summary.loc["extreme", "n_extreme_values"] == 1
+    assert summary.loc["negative", "warnings"] == [
+        "eemeter.caltrack_sufficiency_criteria.negative_meter_values",
+        "eemeter.caltrack_sufficiency_criteria.incorrect_number_of_total_days",
+    ]
+    assert summary.loc["negative", "n_negative_meter_values"] == 1
+    assert summary.loc["no_data", "status"] == "NO DATA"
+
+
 def test_caltrack_usage_per_day_predict_empty(prediction_index, temperature_data):
     prediction = caltrack_usage_per_day_predict(
         "intercept_only",
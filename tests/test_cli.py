@@ -17,11 +17,17 @@
    limitations under the License.
 
 """
+import json
+import multiprocessing
+import os
+
 from click.testing import CliRunner
 from pkg_resources import resource_filename
+import pytest
 from tempfile import NamedTemporaryFile
 
-from eemeter.cli import cli, caltrack
+import eemeter.cli
+from eemeter.cli import _fit_batch_item, batch, cli, caltrack
 
 
 def test_eemeter_cli():
@@ -102,3 +108,318 @@ def test_eemeter_caltrack_sample_output_file():
     assert "Output written:" in result.output
 
     assert output_file.read().endswith(b"}")
+
+
+def _write_manifest(tmpdir, rows):
+    meter_file = resource_filename("eemeter.samples", "il-gas-hdd-only-daily.csv.gz")
+    temperature_file = resource_filename("eemeter.samples", "il-tempF.csv.gz")
+    manifest = tmpdir.join("manifest.csv")
+    lines = ["id,meter_file,temperature_file,fit_cdd"] + [
+        "{},{},{},{}".format(
+            row_id, meter_file if meter else "missing.csv", temperature_file, fit_cdd
+        )
+        for row_id, meter, fit_cdd in rows
+    ]
+    manifest.write("\n".join(lines) + "\n")
+    return str(manifest)
+
+
+def _read_output(output_file):
+    with open(output_file) as f:
+        return {row["id"]: row for row in map(json.loads, f)}
+
+
+def test_eemeter_batch_manifest(tmpdir):
+    runner = CliRunner()
+    manifest = _write_manifest(tmpdir, [("a", True, ""), ("b", True, "false")])
+    output_file = str(tmpdir.join("results.jsonl"))
+
+    result = runner.invoke(
+        batch, ["--manifest", manifest, "--output-file", output_file]
+    )
+
+    assert result.exit_code == 0
+    assert "Fit 2 meters (0 errors, 0 already complete, 0 retried" in result.output
+    rows = _read_output(output_file)
+    assert sorted(rows) == ["a", "b"]
+    assert rows["a"]["model_results"]["settings"]["fit_cdd"] is True
+    assert rows["b"]["model_results"]["settings"]["fit_cdd"] is False
+
+
+def test_eemeter_batch_resume(tmpdir):
+    runner = CliRunner()
+    manifest = _write_manifest(
+        tmpdir, [("a", True, ""), ("b", True, ""), ("c", False, "")]
+    )
+    output_file = tmpdir.join("results.jsonl")
+    # an interrupted run left one complete line, one error and a partial line
+    output_file.write(
+        '{"id": "a", "model_results": null}\n'
+        '{"id": "b", "error": "OSError: share unavailable"}\n'
+        '{"id": "c", "mod'
+    )
+
+    result = runner.invoke(
+        batch, ["--manifest", manifest, "--output-file", str(output_file)]
+    )
+
+    assert result.exit_code == 0
+    assert (
+        "Fit 2 meters (1 errors, 1 already complete, 1 retried after errors)"
+        in result.output
+    )
+    assert len(output_file.readlines()) == 3
+    rows = _read_output(str(output_file))
+    assert rows["a"]["model_results"] is None
+    assert rows["b"]["model_results"]["status"] == "SUCCESS"
+    assert rows["c"]["error"].startswith("FileNotFoundError")
+
+
+def _fit_batch_item_or_exit(item, settings):
+    # simulate a worker process dying on meter "b"
+    if item["id"] == "b":
+        os._exit(1)
+    return _fit_batch_item(item, settings)
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="patched function is only used by forked workers",
+)
+def test_eemeter_batch_broken_worker(tmpdir, monkeypatch):
+    monkeypatch.setattr(eemeter.cli, "_fit_batch_item", _fit_batch_item_or_exit)
+    runner = CliRunner()
+    manifest = _write_manifest(tmpdir, [("a", True, ""), ("b", True, "")])
+    output_file = str(tmpdir.join("results.jsonl"))
+
+    result = runner.invoke(
+        batch,
+        ["--manifest", manifest, "--output-file", output_file, "--workers", "2"],
+    )
+
+    assert result.exit_code == 0
+    rows = _read_output(output_file)
+    assert sorted(rows) == ["a", "b"]
+    assert rows["b"]["error"].startswith("BrokenProcessPool")
+
+
+def test_eemeter_batch_meter_glob_workers(tmpdir):
+    runner = CliRunner()
+    meter_glob = resource_filename("eemeter.samples", "il-*-daily.csv.gz")
+    temperature_file = resource_filename("eemeter.samples", "il-tempF.csv.gz")
+    output_file = str(tmpdir.join("results.jsonl"))
+
+    result = runner.invoke(
+        batch,
+        [
+            "--meter-glob",
+            meter_glob,
+            "--temperature-file",
+            temperature_file,
+            "--output-file",
+            output_file,
+            "--workers",
+            "2",
+            "--no-resume",
+        ],
+    )
+
+    assert result.exit_code == 0
+    rows = _read_output(output_file)
+    assert len(rows) > 1
+    assert all("error" not in row for row in rows.values())
+    assert all(row["model_results"]["status"] for row in rows.values())
+
+
+def test_eemeter_batch_bad_arguments(tmpdir):
+    runner = CliRunner()
+    output_file = str(tmpdir.join("results.jsonl"))
+
+    result = runner.invoke(batch, ["--output-file", output_file])
+    assert result.exit_code == 1
+    assert "exactly one of --manifest or --meter-glob" in result.output
+
+    result = runner.invoke(
+        batch, ["--meter-glob", "*.csv", "--output-file", output_file]
+    )
+    assert result.exit_code == 1
+    assert "--meter-glob requires --temperature-file" in result.output
+
+
+def _invoke_json(command, args):
+    runner = CliRunner()
+    result = runner.invoke(command, args)
+    assert result.exit_code == 0, result.output
+    return json.loads(result.output[result.output.index("{") :])
+
+
+def test_eemeter_caltrack_baseline_and_balance_points():
+    model_results = _invoke_json(
+        caltrack,
+        [
+            "--sample=il-electricity-cdd-hdd-daily",
+            "--baseline-end=2016-12-26",
+            "--heating-balance-points=55,60",
+            "--cooling-balance-points=65-70",
+            "--show-candidates",
+        ],
+    )
+
+    assert model_results["status"] == "SUCCESS"
+    assert model_results["model"]["model_type"] == "cdd_hdd"
+    heating_balance_points = set()
+    cooling_balance_points = set()
+    for candidate in model_results["candidates"]:
+        model_params = candidate["model_params"]
+        if "heating_balance_point" in model_params:
+            heating_balance_points.add(model_params["heating_balance_point"])
+        if "cooling_balance_point" in model_params:
+            cooling_balance_points.add(model_params["cooling_balance_point"])
+    assert heating_balance_points == {55, 60}
+    assert cooling_balance_points == set(range(65, 71))
+
+
+def test_eemeter_caltrack_baseline_start():
+    model_results = _invoke_json(caltrack, ["--sample=il-electricity-cdd-hdd-daily"])
+    assert model_results["totals_metrics"]["observed_length"] == 809
+
+    model_results = _invoke_json(
+        caltrack,
+        ["--sample=il-electricity-cdd-hdd-daily", "--baseline-start=2016-01-01"],
+    )
+    assert model_results["status"] == "SUCCESS"
+    assert model_results["totals_metrics"]["observed_length"] == 769
+
+    model_results = _invoke_json(
+        caltrack,
+        [
+            "--sample=il-electricity-cdd-hdd-daily",
+            "--baseline-start=2016-01-01",
+            "--baseline-end=2016-07-01",
+        ],
+    )
+    assert model_results["status"] == "SUCCESS"
+    assert model_results["totals_metrics"]["observed_length"] == 181
+
+
+def test_eemeter_batch_manifest_baseline_start(tmpdir):
+    meter_file = resource_filename("eemeter.samples", "il-gas-hdd-only-daily.csv.gz")
+    temperature_file = resource_filename("eemeter.samples", "il-tempF.csv.gz")
+    manifest = tmpdir.join("manifest.csv")
+    manifest.write(
+        "id,meter_file,temperature_file,baseline_start,baseline_end\n"
+        "a,{0},{1},,\n"
+        "b,{0},{1},2016-01-01,\n"
+        "c,{0},{1},2016-01-01,2016-07-01\n".format(meter_file, temperature_file)
+    )
+    output_file = str(tmpdir.join("results.jsonl"))
+
+    runner = CliRunner()
+    result = runner.invoke(
+        batch, ["--manifest", str(manifest), "--output-file", output_file]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Fit 3 meters (0 errors" in result.output
+    rows = _read_output(output_file)
+    observed_lengths = {
+        row_id: row["model_results"]["totals_metrics"]["observed_length"]
+        for row_id, row in rows.items()
+    }
+    assert observed_lengths["c"] == 181
+    assert observed_lengths["c"] < observed_lengths["b"] < observed_lengths["a"]
+
+
+def test_eemeter_caltrack_bad_balance_points():
+    runner = CliRunner()
+
+    result = runner.invoke(
+        caltrack,
+        ["--sample=il-gas-hdd-only-daily", "--heating-balance-points=55-sixty"],
+    )
+
+    assert result.exit_code == 2
+    assert "Expected balance points" in result.output
+
+
+def test_eemeter_caltrack_billing_sufficiency():
+    output = _invoke_json(
+        caltrack,
+        [
+            "--sample=il-electricity-cdd-hdd-billing_monthly",
+            "--interval=billing",
+            "--baseline-end=2016-12-26",
+            "--sufficiency",
+        ],
+    )
+
+    assert sorted(output) == ["data_sufficiency", "model_results"]
+    assert output["data_sufficiency"]["criteria_name"] == (
+        "caltrack_sufficiency_criteria"
+    )
+    assert output["model_results"]["interval"] == "billing"
+
+
+def test_eemeter_caltrack_hourly_cache_dir(tmpdir):
+    cache_dir = str(tmpdir.join("cache"))
+    args = [
+        "--sample=il-electricity-cdd-hdd-hourly",
+        "--interval=hourly",
+        "--baseline-end=2016-12-26",
+        "--cache-dir={}".format(cache_dir),
+    ]
+
+    model_results = _invoke_json(caltrack, args)
+    assert model_results["status"] == "SUCCEEDED"
+    assert len(tmpdir.join("cache", "design_matrices").listdir()) == 1
+
+    assert _invoke_json(caltrack, args) == model_results
+    assert len(tmpdir.join("cache", "design_matrices").listdir()) == 1
+
+
+def test_eemeter_caltrack_profile(tmpdir):
+    runner = CliRunner()
+    profile_file = str(tmpdir.join("profile.json"))
+
+    result = runner.invoke(
+        caltrack,
+        [
+            "--sample=il-gas-hdd-only-daily",
+            "--output-file={}".format(tmpdir.join("output.json")),
+            "--profile",
+            "--profile-file={}".format(profile_file),
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "fit_caltrack_usage_per_day_model" in result.output
+    with open(profile_file) as f:
+        profile = json.load(f)
+    assert profile["stages"]["read_data"]["calls"] == 1
+    assert profile["stages"]["fit_caltrack_usage_per_day_model"]["calls"] == 1
+
+
+def test_eemeter_batch_profile(tmpdir):
+    runner = CliRunner()
+    manifest = _write_manifest(tmpdir, [("a", True, ""), ("b", True, "")])
+    output_file = str(tmpdir.join("results.jsonl"))
+    profile_file = str(tmpdir.join("profile.json"))
+
+    result = runner.invoke(
+        batch,
+        [
+            "--manifest",
+            manifest,
+            "--output-file",
+            output_file,
+            "--profile-file",
+            profile_file,
+        ],
+    )
+
+    assert result.exit_code == 0
+    rows = _read_output(output_file)
+    assert rows["a"]["profile"]["stages"]["read_data"]["calls"] == 1
+    with open(profile_file) as f:
+        profile = json.load(f)
+    assert profile["stages"]["fit_caltrack_usage_per_day_model"]["calls"] == 2
@@ -85,6 +85,94 @@ def test_compute_temperature_features_hourly_temp_mean(il_electricity_cdd_hdd_ho
     assert round(df.temperature_mean.mean()) == 62.0
 
 
+def test_compute_temperature_features_hourly_float32(il_electricity_cdd_hdd_hourly):
+    meter_data = il_electricity_cdd_hdd_hourly["meter_data"]["2016-03-01":"2016-07-01"]
+    temperature_data = il_electricity_cdd_hdd_hourly["temperature_data"][
+        "2016-03-01":"2016-07-01"
+    ]
+    kwargs = dict(
+        heating_balance_points=[60],
+        cooling_balance_points=[65],
+        degree_day_method="hourly",
+    )
+    expected = compute_temperature_features(
+        meter_data.index, temperature_data, **kwargs
+    )
+    df = compute_temperature_features(
+        meter_data.index, temperature_data, dtype="float32", **kwargs
+    )
+    assert list(df.columns) == list(expected.columns)
+    assert (df.dtypes == "float32").all()
+    assert np.allclose(df, expected, rtol=1e-7, atol=1e-5, equal_nan=True)
+
+
+def test_compute_temperature_features_daily_float32(il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    expected = compute_temperature_features(
+        meter_data.index, temperature_data, heating_balance_points=[60]
+    )
+    df = compute_temperature_features(
+        meter_data.index, temperature_data, heating_balance_points=[60], dtype="float32"
+    )
+    assert (df.dtypes == "float32").all()
+    assert np.allclose(df, expected, rtol=1e-7, atol=1e-5, equal_nan=True)
+
+
+@pytest.mark.parametrize("chunk_days", [1, 30, 1000])
+def test_compute_temperature_features_chunked(
+    il_electricity_cdd_hdd_hourly,
+    il_electricity_cdd_hdd_billing_monthly,
+    chunk_days,
+):
+    hourly_meter_data = il_electricity_cdd_hdd_hourly["meter_data"]
+    billing_meter_data = il_electricity_cdd_hdd_billing_monthly["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_hourly["temperature_data"]
+    # no temperature data for several months
+    temperature_data = temperature_data.where(
+        (temperature_data.index < "2016-02-01")
+        | (temperature_data.index >= "2016-05-01")
+    )
+    daily_meter_data_index = pd.date_range(
+        "2015-11-01", "2018-01-01", freq="D", tz="America/Chicago"
+    )
+
+    for meter_data_index, kwargs in [
+        (
+            hourly_meter_data.index,
+            dict(
+                heating_balance_points=[60],
+                cooling_balance_points=[65],
+                degree_day_method="hourly",
+                data_quality=True,
+            ),
+        ),
+        (
+            daily_meter_data_index,
+            dict(
+                heating_balance_points=[60],
+                cooling_balance_points=[65],
+                data_quality=True,
+            ),
+        ),
+        (daily_meter_data_index, dict()),
+        (
+            billing_meter_data.index,
+            dict(
+                heating_balance_points=[60],
+                degree_day_method="hourly",
+                use_mean_daily_values=False,
+                tolerance=pd.Timedelta("35D"),
+            ),
+        ),
+    ]:
+        df = compute_temperature_features(meter_data_index, temperature_data, **kwargs)
+        chunked_df = compute_temperature_features(
+            meter_data_index, temperature_data, chunk_days=chunk_days, **kwargs
+        )
+        pd.testing.assert_frame_equal(chunked_df, df)
+
+
 def test_compute_temperature_features_hourly_hourly_degree_days(
     il_electricity_cdd_hdd_hourly, snapshot
 ):
@@ -1153,6 +1241,24 @@ def test_compute_temperature_bin_features(temperature_means):
     assert bin_features.sum().sum() == 112000.0
 
 
+def test_compute_temperature_bin_features_endpoints_and_nans():
+    index = pd.date_range("2017-01-01", periods=6, freq="H", tz="UTC")
+    temps = pd.Series([10, 25, 30, 75, 80, np.nan], index=index)
+    bin_features = compute_temperature_bin_features(temps, [25, 75])
+    assert bin_features.index.equals(index)
+    assert bin_features.bin_0.tolist()[:5] == [10, 25, 25, 25, 25]
+    assert bin_features.bin_1.tolist()[:5] == [0, 0, 5, 50, 50]
+    assert bin_features.bin_2.tolist()[:5] == [0, 0, 0, 0, 5]
+    assert bin_features.iloc[5].isnull().all()
+
+
+def test_compute_temperature_bin_features_float32(temperature_means):
+    temps = temperature_means.temperature_mean
+    bin_features = compute_temperature_bin_features(temps, [25, 75], dtype="float32")
+    assert (bin_features.dtypes == "float32").all()
+    assert bin_features.sum().sum() == 112000.0
+
+
 @pytest.fixture
 def even_occupancy():
     return pd.Series([i % 2 == 0 for i in range(168)], index=pd.Categorical(range(168)))
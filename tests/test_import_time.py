@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+"""
+import subprocess
+import sys
+
+# Heavy dependencies are imported on first use. The import time itself is
+# measured by benchmarks/bench_import_time.py.
+HEAVY_MODULES = ["matplotlib", "patsy", "pkg_resources", "scipy", "statsmodels"]
+
+
+def _run_python(code, *args):
+    return subprocess.run(
+        [sys.executable] + list(args) + ["-c", code],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+
+def test_import_does_not_load_heavy_dependencies():
+    result = _run_python(
+        "import sys, eemeter; "
+        "print(' '.join(sorted(m for m in {} if m in sys.modules)))".format(
+            HEAVY_MODULES
+        )
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_heavy_dependencies_load_on_first_use():
+    result = _run_python(
+        "import sys, eemeter; "
+        "meter_data, temperature_data, metadata = eemeter.load_sample("
+        "'il-electricity-cdd-hdd-daily'); "
+        "data = eemeter.create_caltrack_daily_design_matrix("
+        "meter_data, temperature_data); "
+        "eemeter.fit_caltrack_usage_per_day_model(data); "
+        "print('statsmodels' in sys.modules)"
+    )
+    assert result.stdout.strip() == "True"
@@ -18,21 +18,44 @@
 
 """
 import gzip
+from io import StringIO
+import pickle
 from pkg_resources import resource_filename, resource_stream
 from tempfile import TemporaryFile
 
+import numpy as np
 import pandas as pd
 import pytest
 
 from eemeter import (
+    TemperatureStore,
+    iterate_meter_data_from_long_csv,
+    iterate_meter_data_from_long_parquet,
     meter_data_from_csv,
+    meter_data_from_feather,
     meter_data_from_json,
+    meter_data_from_parquet,
     meter_data_to_csv,
+    meter_data_to_feather,
+    meter_data_to_long_csv,
+    meter_data_to_long_parquet,
+    meter_data_to_parquet,
     temperature_data_from_csv,
+    temperature_data_from_feather,
     temperature_data_from_json,
+    temperature_data_from_parquet,
     temperature_data_to_csv,
+    temperature_data_to_feather,
+    temperature_data_to_parquet,
 )
 
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+requires_pyarrow = pytest.mark.skipif(pyarrow is None, reason="requires pyarrow")
+
 
 def test_meter_data_from_csv(sample_metadata):
     meter_item = sample_metadata["il-electricity-cdd-hdd-daily"]
@@ -100,6 +123,33 @@ def test_meter_data_from_csv_custom_columns(sample_metadata):
     assert meter_data.index.freq is None
 
 
+def test_meter_data_from_csv_date_format():
+    with TemporaryFile() as f:
+        f.write(b"start,value\n" b"01/02/2017 00:00,10\n" b"01/02/2017 01:00,11\n")
+        f.seek(0)
+        meter_data = meter_data_from_csv(f, date_format="%m/%d/%Y %H:%M")
+    assert meter_data.shape == (2, 1)
+    assert meter_data.index[0] == pd.Timestamp("2017-01-02T00:00:00Z")
+    assert meter_data.index.name == "start"
+    assert meter_data.index.tz.zone == "UTC"
+
+
+def test_meter_data_from_csv_mixed_offsets():
+    with TemporaryFile() as f:
+        f.write(
+            b"start,value\n"
+            b"2017-01-01T00:00:00-06:00,10\n"
+            b"2017-07-01T00:00:00-05:00,11\n"
+        )
+        f.seek(0)
+        meter_data = meter_data_from_csv(f)
+    assert list(meter_data.index) == [
+        pd.Timestamp("2017-01-01T06:00:00Z"),
+        pd.Timestamp("2017-07-01T05:00:00Z"),
+    ]
+    assert meter_data.index.tz.zone == "UTC"
+
+
 def test_meter_data_from_json_none(sample_metadata):
     data = None
     meter_data = meter_data_from_json(data)
@@ -175,6 +225,50 @@ def test_meter_data_from_json_orient_records_with_estimated_false(sample_metadat
     assert meter_data.estimated.sum() == 0
 
 
+def test_meter_data_from_json_orient_records_bad_values(sample_metadata):
+    data = [
+        {"start": "2017-01-01T00:00:00Z", "value": "11.5"},
+        {"start": "2017-01-02T00:00:00Z", "value": "bad"},
+        {"start": "2017-01-03T00:00:00Z", "value": None},
+        {"start": "2017-01-04T00:00:00Z", "value": "1_000"},
+        {"start": "2017-01-05T00:00:00Z", "value": 10},
+    ]
+    meter_data = meter_data_from_json(data, orient="records")
+    assert meter_data.value.dtype == "float64"
+    assert meter_data.value.tolist()[0] == 11.5
+    assert meter_data.value.isnull().tolist() == [False, True, True, False, False]
+    assert meter_data.value.tolist()[3:] == [1000.0, 10.0]
+
+
+def test_meter_data_from_json_orient_columns(sample_metadata):
+    data = {
+        "start": ["2017-01-01T00:00:00Z", "2017-01-02T00:00:00Z"],
+        "value": [11, "bad"],
+        "estimated": ["true", None],
+    }
+    meter_data = meter_data_from_json(data, orient="columns")
+    assert meter_data.shape == (2, 2)
+    assert meter_data.index.name == "start"
+    assert meter_data.index.tz.zone == "UTC"
+    assert meter_data.index.freq is None
+    assert meter_data.value.isnull().tolist() == [False, True]
+    assert meter_data.estimated.tolist() == [True, False]
+
+    records = [
+        {"start": start, "value": value, "estimated": estimated}
+        for start, value, estimated in zip(
+            data["start"], data["value"], data["estimated"]
+        )
+    ]
+    assert meter_data.equals(meter_data_from_json(records, orient="records"))
+
+
+def test_meter_data_from_json_orient_columns_empty(sample_metadata):
+    meter_data = meter_data_from_json({"start": [], "value": []}, orient="columns")
+    assert meter_data.shape == (0, 1)
+    assert meter_data.index.tz.zone == "UTC"
+
+
 def test_meter_data_from_json_bad_orient(sample_metadata):
     data = [["2017-01-01T00:00:00Z", 11], ["2017-01-02T00:00:00Z", 10]]
     with pytest.raises(ValueError):
@@ -248,6 +342,17 @@ def test_temperature_data_from_csv_custom_columns(sample_metadata):
     assert temperature_data.index.freq is None
 
 
+def test_temperature_data_from_csv_date_format():
+    with TemporaryFile() as f:
+        f.write(b"dt,tempF\n" b"20170102 00,40.5\n" b"20170102 01,41.0\n")
+        f.seek(0)
+        temperature_data = temperature_data_from_csv(f, date_format="%Y%m%d %H")
+    assert temperature_data.shape == (2,)
+    assert temperature_data.index[1] == pd.Timestamp("2017-01-02T01:00:00Z")
+    assert temperature_data.index.name == "dt"
+    assert temperature_data.index.tz.zone == "UTC"
+
+
 def test_temperature_data_from_json_orient_list(sample_metadata):
     data = [["2017-01-01T00:00:00Z", 11], ["2017-01-02T00:00:00Z", 10]]
     temperature_data = temperature_data_from_json(data, orient="list")
@@ -268,3 +373,396 @@ def test_temperature_data_to_csv(sample_metadata):
         temperature_data_to_csv(series, f)
         f.seek(0)
         assert f.read() == ("dt,temperature\n" "2017-01-01 00:00:00+00:00,10\n")
+
+
+@pytest.fixture
+def hourly_meter_data(il_electricity_cdd_hdd_hourly):
+    meter_data = il_electricity_cdd_hdd_hourly["meter_data"].copy()
+    meter_data["estimated"] = meter_data.index.hour == 0
+    return meter_data
+
+
+@requires_pyarrow
+@pytest.mark.parametrize(
+    "to_file, from_file",
+    [
+        (meter_data_to_parquet, meter_data_from_parquet),
+        (meter_data_to_feather, meter_data_from_feather),
+    ],
+)
+def test_meter_data_columnar_roundtrip(tmpdir, hourly_meter_data, to_file, from_file):
+    path = str(tmpdir.join("meter_data"))
+    to_file(hourly_meter_data, path)
+
+    meter_data = from_file(path)
+    assert list(meter_data.columns) == ["value"]
+    assert meter_data.index.name == "start"
+    assert meter_data.index.tz.zone == "UTC"
+    pd.testing.assert_series_equal(
+        meter_data.value, hourly_meter_data.value, check_freq=False
+    )
+
+    meter_data = from_file(path, estimated_col="estimated", tz="US/Pacific")
+    assert list(meter_data.columns) == ["value", "estimated"]
+    assert meter_data.index.tz.zone == "US/Pacific"
+    assert meter_data.estimated.sum() == hourly_meter_data.estimated.sum()
+
+    meter_data = from_file(path, freq="daily")
+    assert meter_data.index.freq == "D"
+
+
+@requires_pyarrow
+@pytest.mark.parametrize(
+    "to_file, from_file",
+    [
+        (meter_data_to_parquet, meter_data_from_parquet),
+        (meter_data_to_feather, meter_data_from_feather),
+    ],
+)
+def test_meter_data_columnar_time_range(tmpdir, hourly_meter_data, to_file, from_file):
+    path = str(tmpdir.join("meter_data"))
+    if to_file is meter_data_to_parquet:
+        to_file(hourly_meter_data, path, row_group_size=100)
+    else:
+        to_file(hourly_meter_data, path)
+
+    start = pd.Timestamp("2016-01-01", tz="US/Pacific")
+    meter_data = from_file(path, start=start, end="2016-02-01")
+    assert meter_data.index.min() == start
+    assert meter_data.index.max() == pd.Timestamp("2016-01-31T23:00:00Z")
+    expected = hourly_meter_data.value[
+        start.tz_convert("UTC") : pd.Timestamp("2016-01-31T23:00:00Z")
+    ]
+    pd.testing.assert_series_equal(meter_data.value, expected, check_freq=False)
+
+    meter_data = from_file(path, end="2000-01-01")
+    assert meter_data.shape == (0, 1)
+
+
+@requires_pyarrow
+@pytest.mark.parametrize("tz", [None, "US/Central"])
+@pytest.mark.parametrize(
+    "to_file, from_file",
+    [
+        (meter_data_to_parquet, meter_data_from_parquet),
+        (meter_data_to_feather, meter_data_from_feather),
+    ],
+)
+def test_meter_data_columnar_time_range_column_tz(
+    tmpdir, hourly_meter_data, to_file, from_file, tz
+):
+    path = str(tmpdir.join("meter_data"))
+    if tz is None:
+        data = hourly_meter_data.tz_localize(None)
+    else:
+        data = hourly_meter_data.tz_convert(tz)
+    to_file(data, path)
+
+    meter_data = from_file(path, start="2016-01-01", end="2016-01-02")
+    assert meter_data.index.tz.zone == "UTC"
+    expected = hourly_meter_data.value[
+        pd.Timestamp("2016-01-01T00:00:00Z") : pd.Timestamp("2016-01-01T23:00:00Z")
+    ]
+    assert len(expected) == 24
+    pd.testing.assert_series_equal(meter_data.value, expected, check_freq=False)
+
+
+@requires_pyarrow
+@pytest.mark.parametrize(
+    "to_file, from_file",
+    [
+        (temperature_data_to_parquet, temperature_data_from_parquet),
+        (temperature_data_to_feather, temperature_data_from_feather),
+    ],
+)
+def test_temperature_data_columnar_roundtrip(
+    tmpdir, il_electricity_cdd_hdd_hourly, to_file, from_file
+):
+    temperature_data = il_electricity_cdd_hdd_hourly["temperature_data"]
+    path = str(tmpdir.join("temperature_data"))
+    to_file(temperature_data, path)
+
+    loaded = from_file(path)
+    assert loaded.index.tz.zone == "UTC"
+    pd.testing.assert_series_equal(loaded, temperature_data, check_freq=False)
+
+    loaded = from_file(path, start="2016-01-01", end="2016-01-02")
+    assert loaded.shape == (24,)
+
+    series = pd.Series(10.0, index=pd.to_datetime(["2017-01-01T00:00:00Z"], utc=True))
+    to_file(series, path)
+    loaded = from_file(path, temp_col="temperature")
+    assert loaded.name == "temperature"
+    assert loaded.index.name == "dt"
+
+
+@pytest.fixture
+def long_meter_data_csv():
+    return (
+        "meter_id,start,value,estimated\n"
+        "b,2017-01-02T00:00:00+00:00,2.0,false\n"
+        "b,2017-01-01T00:00:00+00:00,1.0,true\n"
+        "a,2017-01-01T00:00:00+00:00,3.0,false\n"
+        "a,2017-01-02T00:00:00+00:00,,\n"
+        "a,2017-01-03T00:00:00+00:00,5.0,false\n"
+        "c,2017-01-01T00:00:00+00:00,6.0,false\n"
+    )
+
+
+def test_iterate_meter_data_from_long_csv(long_meter_data_csv):
+    meters = list(iterate_meter_data_from_long_csv(StringIO(long_meter_data_csv)))
+    assert [meter_id for meter_id, meter_data in meters] == ["a", "b", "c"]
+    meter_id, meter_data = meters[0]
+    assert list(meter_data.columns) == ["value"]
+    assert meter_data.index.name == "start"
+    assert meter_data.index.tz.zone == "UTC"
+    assert meter_data.value.tolist()[0] == 3.0
+    assert pd.isnull(meter_data.value.iloc[1])
+    meter_id, meter_data = meters[1]
+    assert meter_data.index.is_monotonic_increasing
+    assert meter_data.value.tolist() == [1.0, 2.0]
+
+
+def test_iterate_meter_data_from_long_csv_estimated_tz(long_meter_data_csv):
+    meters = dict(
+        iterate_meter_data_from_long_csv(
+            StringIO(long_meter_data_csv), estimated_col="estimated", tz="US/Pacific"
+        )
+    )
+    assert list(meters["a"].columns) == ["value", "estimated"]
+    assert meters["a"].estimated.tolist() == [False, False, False]
+    assert meters["b"].estimated.tolist() == [True, False]
+    assert meters["b"].index.tz.zone == "US/Pacific"
+
+
+def test_iterate_meter_data_from_long_csv_chunked(long_meter_data_csv):
+    meters = list(
+        iterate_meter_data_from_long_csv(StringIO(long_meter_data_csv), chunksize=2)
+    )
+    # streamed meters come in file order
+    assert [meter_id for meter_id, meter_data in meters] == ["b", "a", "c"]
+    expected = dict(iterate_meter_data_from_long_csv(StringIO(long_meter_data_csv)))
+    for meter_id, meter_data in meters:
+        pd.testing.assert_frame_equal(meter_data, expected[meter_id])
+
+
+def test_iterate_meter_data_from_long_csv_chunked_not_contiguous():
+    data = (
+        "meter_id,start,value\n"
+        "a,2017-01-01T00:00:00+00:00,1.0\n"
+        "b,2017-01-01T00:00:00+00:00,2.0\n"
+        "a,2017-01-02T00:00:00+00:00,3.0\n"
+    )
+    meters = iterate_meter_data_from_long_csv(StringIO(data), chunksize=1)
+    with pytest.raises(ValueError) as exc_info:
+        list(meters)
+    assert "not contiguous" in str(exc_info.value)
+
+    meters = dict(iterate_meter_data_from_long_csv(StringIO(data)))
+    assert meters["a"].value.tolist() == [1.0, 3.0]
+
+
+@pytest.mark.parametrize("chunksize", [None, 1])
+def test_iterate_meter_data_from_long_csv_missing_meter_id(chunksize):
+    data = (
+        "id,start,value\n"
+        "a,2017-01-01T00:00:00+00:00,1.0\n"
+        ",2017-01-02T00:00:00+00:00,2.0\n"
+    )
+    meters = iterate_meter_data_from_long_csv(
+        StringIO(data), meter_id_col="id", chunksize=chunksize
+    )
+    with pytest.raises(ValueError) as exc_info:
+        list(meters)
+    assert "missing 'id'" in str(exc_info.value)
+
+
+@requires_pyarrow
+def test_iterate_meter_data_from_long_parquet(tmpdir, long_meter_data_csv):
+    path = str(tmpdir.join("long.parquet"))
+    df = pd.read_csv(StringIO(long_meter_data_csv))
+    df["start"] = pd.to_datetime(df.start, utc=True)
+    df.to_parquet(path, index=False)
+
+    expected = dict(iterate_meter_data_from_long_csv(StringIO(long_meter_data_csv)))
+    meters = list(iterate_meter_data_from_long_parquet(path))
+    assert [meter_id for meter_id, meter_data in meters] == ["a", "b", "c"]
+    for meter_id, meter_data in meters:
+        pd.testing.assert_frame_equal(meter_data, expected[meter_id])
+
+    meters = list(iterate_meter_data_from_long_parquet(path, batch_size=2))
+    assert [meter_id for meter_id, meter_data in meters] == ["b", "a", "c"]
+    for meter_id, meter_data in meters:
+        pd.testing.assert_frame_equal(meter_data, expected[meter_id])
+
+
+def test_temperature_store(tmpdir, il_electricity_cdd_hdd_hourly):
+    temperature_data = il_electricity_cdd_hdd_hourly["temperature_data"]
+    store = TemperatureStore(str(tmpdir.join("temperature")))
+    assert str(store).startswith("TemperatureStore(directory=")
+    assert len(store) == 0
+    assert "722880" not in store
+
+    store.add("722880", temperature_data)
+    store.add(725300, temperature_data[:24], dtype="float32")
+    assert store.stations() == ["722880", "725300"]
+    assert "725300" in store
+
+    loaded = store.get("722880")
+    assert loaded.name == "722880"
+    assert loaded.index.freq == "H"
+    assert loaded.index.tz.zone == "UTC"
+    pd.testing.assert_series_equal(
+        loaded, temperature_data.rename("722880"), check_freq=False
+    )
+    assert store.time_range("722880") == (
+        temperature_data.index[0],
+        temperature_data.index[-1] + pd.Timedelta("1H"),
+    )
+    assert store.get("725300").dtype == "float32"
+
+    # zero-copy, read-only view of the memory-mapped values
+    loaded = store.get("722880", start="2016-01-01", end="2016-01-02")
+    assert loaded.shape == (24,)
+    assert loaded.index[0] == pd.Timestamp("2016-01-01", tz="UTC")
+    assert not loaded.values.flags.writeable
+    assert not loaded.values.flags.owndata
+
+    # start rounds up to the next hour, end is exclusive
+    loaded = store.get(
+        "722880",
+        start=pd.Timestamp("2015-12-31T18:30:00", tz="US/Central"),
+        end="2016-01-01T02:00:00",
+        tz="US/Central",
+    )
+    assert loaded.shape == (1,)
+    assert loaded.index[0] == pd.Timestamp("2015-12-31T19:00:00", tz="US/Central")
+
+    assert store.get("722880", start="2000-01-01", end="2001-01-01").shape == (0,)
+    assert store.get("722880", start="2016-01-02", end="2016-01-01").shape == (0,)
+
+    with pytest.raises(KeyError):
+        store.get("000000")
+
+
+def test_temperature_store_replace_and_remove(tmpdir, il_electricity_cdd_hdd_hourly):
+    temperature_data = il_electricity_cdd_hdd_hourly["temperature_data"]
+    directory = str(tmpdir.join("temperature"))
+    store = TemperatureStore(directory)
+    other_store = TemperatureStore(directory)
+    store.add("722880", temperature_data)
+    assert other_store.get("722880").shape == temperature_data.shape
+
+    store.add("722880", temperature_data[:48])
+    assert other_store.get("722880").shape == (48,)
+    assert len(tmpdir.join("temperature").listdir()) == 2
+
+    assert other_store.remove("722880")
+    assert not store.remove("722880")
+    assert "722880" not in store
+    assert tmpdir.join("temperature").listdir() == [
+        tmpdir.join("temperature", "index.json")
+    ]
+
+
+def test_temperature_store_concurrent_replace(tmpdir, il_electricity_cdd_hdd_hourly):
+    temperature_data = il_electricity_cdd_hdd_hourly["temperature_data"]
+    directory = str(tmpdir.join("temperature"))
+    store = TemperatureStore(directory)
+    reader = TemperatureStore(directory)
+    store.add("722880", temperature_data)
+    old = reader.get("722880")
+    stale_index = reader._stations()
+
+    # the reader read the index just before another process replaced it
+    store.add("722880", temperature_data[:48])
+    reader._stations()
+    reader._index = stale_index
+    reader._arrays.clear()
+    assert reader.get("722880").shape == (48,)
+    assert len(reader._arrays) == 1
+
+    # data returned before the station was replaced is still readable
+    assert old.shape == temperature_data.shape
+    assert old.iloc[:10].tolist() == temperature_data.iloc[:10].tolist()
+
+    store.remove("722880")
+    assert len(reader) == 0
+    assert reader._arrays == {}
+    with pytest.raises(KeyError):
+        reader.get("722880")
+
+
+def test_temperature_store_pickle(tmpdir, il_electricity_cdd_hdd_hourly):
+    temperature_data = il_electricity_cdd_hdd_hourly["temperature_data"]
+    store = TemperatureStore(str(tmpdir.join("temperature")))
+    store.add("722880", temperature_data)
+    store.get("722880")
+
+    unpickled = pickle.loads(pickle.dumps(store))
+    assert unpickled.directory == store.directory
+    pd.testing.assert_series_equal(unpickled.get("722880"), store.get("722880"))
+
+
+def test_temperature_store_bad_data(tmpdir):
+    store = TemperatureStore(str(tmpdir.join("temperature")))
+    index = pd.date_range("2017-01-01", periods=3, freq="H")
+    with pytest.raises(ValueError) as exc_info:
+        store.add("722880", pd.Series([1.0, 2.0, 3.0], index=index))
+    assert "timezone-aware" in str(exc_info.value)
+
+    with pytest.raises(ValueError) as exc_info:
+        store.add("722880", pd.Series([], index=index[:0].tz_localize("UTC")))
+    assert "No temperature data" in str(exc_info.value)
+
+
+def _long_meters():
+    index = pd.DatetimeIndex(
+        ["2017-01-01", "2017-01-02", "2017-01-03"], tz="UTC", name="start"
+    )
+    return [
+        ("a", pd.DataFrame({"value": [1.0, np.nan, 3.0]}, index=index)),
+        (
+            "b",
+            pd.DataFrame(
+                {"value": [4.0, 5.0], "estimated": [True, False]}, index=index[:2]
+            ),
+        ),
+    ]
+
+
+def test_meter_data_to_long_csv():
+    f = StringIO()
+    meter_data_to_long_csv(iter(_long_meters()), f, estimated_col="estimated")
+    f.seek(0)
+    meters = list(iterate_meter_data_from_long_csv(f, estimated_col="estimated"))
+    assert [meter_id for meter_id, meter_data in meters] == ["a", "b"]
+    assert meters[0][1].estimated.tolist() == [False, False, False]
+    pd.testing.assert_frame_equal(meters[1][1], _long_meters()[1][1])
+
+    f = StringIO()
+    meter_data_to_long_csv(_long_meters(), f)
+    assert f.getvalue().splitlines()[:2] == [
+        "meter_id,start,value",
+        "a,2017-01-01 00:00:00+00:00,1.0",
+    ]
+    f.seek(0)
+    meters = dict(iterate_meter_data_from_long_csv(f, chunksize=2))
+    pd.testing.assert_frame_equal(meters["a"], _long_meters()[0][1])
+
+
+@requires_pyarrow
+def test_meter_data_to_long_parquet(tmpdir):
+    path = str(tmpdir.join("long.parquet"))
+    meter_data_to_long_parquet(iter(_long_meters()), path, estimated_col="estimated")
+    meters = list(
+        iterate_meter_data_from_long_parquet(
+            path, estimated_col="estimated", batch_size=2
+        )
+    )
+    assert [meter_id for meter_id, meter_data in meters] == ["a", "b"]
+    assert meters[0][1].estimated.tolist() == [False, False, False]
+    pd.testing.assert_frame_equal(meters[1][1], _long_meters()[1][1])
+
+    meter_data_to_long_parquet([], path)
+    assert list(iterate_meter_data_from_long_parquet(path)) == []
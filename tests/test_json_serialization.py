@@ -59,6 +59,7 @@ def test_json_daily():
     json_str = json.dumps(baseline_model.json())
 
     m = eemeter.CalTRACKUsagePerDayModelResults.from_json(json.loads(json_str))
+    assert json.dumps(m.json()) == json_str
 
     # compute metered savings from the loaded model
     metered_savings_dataframe, error_bands = eemeter.metered_savings(
@@ -143,6 +144,7 @@ def test_json_hourly():
     json_str = json.dumps(baseline_model.json())
 
     m = eemeter.CalTRACKHourlyModelResults.from_json(json.loads(json_str))
+    assert json.dumps(m.json()) == json_str
 
     # compute metered savings from the loaded model
     metered_savings_dataframe, error_bands = eemeter.metered_savings(
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+   Copyright 2014-2019 OpenEEmeter contributors
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from eemeter.caltrack.design_matrices import create_caltrack_daily_design_matrix
+from eemeter.caltrack.usage_per_day import (
+    caltrack_sufficiency_criteria,
+    caltrack_sufficiency_criteria_batch,
+    fit_caltrack_usage_per_day_model,
+)
+from eemeter.profiling import Profiler, profile_stage, profiled
+from eemeter.transform import get_baseline_data
+
+
+@profiled
+def _outer(n):
+    return _inner(n) + 1
+
+
+@profiled(name="inner")
+def _inner(n):
+    if n > 0:
+        return _inner(n - 1)
+    return 0
+
+
+def test_profiled_inactive():
+    assert _outer(2) == 1
+    assert _outer.__name__ == "_outer"
+
+    profiler = Profiler()
+    assert _outer(2) == 1
+    assert profiler.stages == {}
+    assert repr(profiler) == "Profiler(trace_memory=False, stages=0)"
+
+
+def test_profiler_nested_and_recursive_stages():
+    with Profiler() as profiler:
+        assert profiler.active
+        assert _outer(2) == 1
+        with profile_stage("block"):
+            _inner(0)
+    assert not profiler.active
+
+    stages = profiler.stages
+    assert stages["_outer"]["calls"] == 1
+    assert stages["inner"]["calls"] == 4
+    assert stages["block"]["calls"] == 1
+    # recursive calls are counted in total time once
+    assert stages["inner"]["total_time"] <= stages["_outer"]["total_time"]
+    assert stages["_outer"]["own_time"] <= stages["_outer"]["total_time"]
+    assert "allocated_bytes" not in stages["inner"]
+
+    # not recorded after stopping
+    _outer(0)
+    assert profiler.stages["_outer"]["calls"] == 1
+
+
+def test_profiler_exception():
+    @profiled(name="fail")
+    def fail():
+        raise ValueError("failed")
+
+    with Profiler() as profiler:
+        with pytest.raises(ValueError):
+            fail()
+        _outer(0)
+    assert profiler.stages["fail"]["calls"] == 1
+    assert profiler.stages["_outer"]["own_time"] >= 0
+
+
+def test_profiler_threads():
+    with Profiler() as profiler:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(_outer, range(8)))
+    assert profiler.stages["_outer"]["calls"] == 8
+
+
+def test_profiler_trace_memory():
+    with Profiler(trace_memory=True) as profiler:
+        with profile_stage("allocate"):
+            data = [0] * 100000
+    assert profiler.stages["allocate"]["allocated_bytes"] > 700000
+    assert "allocated_bytes" in profiler.summary()
+    assert len(data) == 100000
+
+
+def test_profiler_json_update_summary():
+    with Profiler() as profiler:
+        _outer(1)
+
+    data = json.loads(json.dumps(profiler.json()))
+    assert data["trace_memory"] is False
+    assert sorted(data["stages"]) == ["_outer", "inner"]
+
+    merged = Profiler.from_json(data)
+    merged.update(profiler)
+    assert merged.stages["inner"]["calls"] == 4
+    assert merged.stages["_outer"]["total_time"] == pytest.approx(
+        2 * profiler.stages["_outer"]["total_time"]
+    )
+
+    summary = merged.summary(sort_by="calls").split("\n")
+    assert summary[0].split() == ["stage", "calls", "total_time", "own_time"]
+    assert summary[1].split()[:2] == ["inner", "4"]
+    with pytest.raises(ValueError):
+        merged.summary(sort_by="allocated_bytes")
+
+    profiler.reset()
+    assert profiler.stages == {}
+
+
+def test_profiler_caltrack_stages(il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    blackout_start_date = il_electricity_cdd_hdd_daily["blackout_start_date"]
+
+    with Profiler() as profiler:
+        baseline_meter_data, warnings = get_baseline_data(
+            meter_data, end=blackout_start_date, max_days=365
+        )
+        data = create_caltrack_daily_design_matrix(
+            baseline_meter_data, temperature_data
+        )
+        caltrack_sufficiency_criteria(data, None, None)
+        caltrack_sufficiency_criteria_batch(data.assign(meter_id="a"), None, None)
+        model_results = fit_caltrack_usage_per_day_model(data)
+        model_results.predict(data.index, temperature_data)
+        model_results.json()
+
+    stages = profiler.stages
+    for name in [
+        "caltrack_sufficiency_criteria",
+        "caltrack_sufficiency_criteria_batch",
+        "get_baseline_data",
+        "create_caltrack_daily_design_matrix",
+        "compute_temperature_features",
+        "fit_caltrack_usage_per_day_model",
+        "get_cdd_hdd_candidate_models",
+        "ModelMetrics.__init__",
+        "CalTRACKUsagePerDayModelResults.predict",
+        "caltrack_usage_per_day_predict",
+        "CalTRACKUsagePerDayModelResults.json",
+    ]:
+        assert stages[name]["calls"] >= 1, name
+    fit = stages["fit_caltrack_usage_per_day_model"]
+    assert fit["own_time"] < fit["total_time"]
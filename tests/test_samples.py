@@ -19,10 +19,20 @@
 """
 import datetime
 
+import pandas as pd
 import pytest
 import pytz
 
-from eemeter import samples, load_sample
+from eemeter import (
+    create_caltrack_daily_design_matrix,
+    fit_caltrack_usage_per_day_model,
+    iterate_synthetic_meters,
+    load_sample,
+    samples,
+    synthetic_meter_data,
+    synthetic_temperature_data,
+)
+from eemeter.samples import load
 
 
 def test_samples():
@@ -105,3 +115,220 @@ def test_load_sample_billing_monthly():
 def test_load_sample_unknown():
     with pytest.raises(ValueError):
         load_sample("unknown")
+
+
+def test_load_sample_returns_copies():
+    meter_data, temperature_data, metadata = load_sample("il-gas-hdd-only-daily")
+    meter_data.value[:] = -1.0
+    temperature_data[:] = -1.0
+    temperature_data.index.freq = None
+    meter_data.index.name = "changed"
+    metadata["freq"] = "changed"
+    del metadata["unit"]
+
+    meter_data, temperature_data, metadata = load_sample("il-gas-hdd-only-daily")
+    assert not (meter_data.value == -1.0).any()
+    assert not (temperature_data == -1.0).any()
+    assert temperature_data.index.freq == "H"
+    assert meter_data.index.name == "start"
+    assert metadata["freq"] == "daily"
+    assert metadata["unit"] == "therm"
+
+
+def test_load_sample_cache_dir(tmpdir, monkeypatch):
+    expected = load_sample("il-electricity-cdd-hdd-billing_monthly")
+
+    cache_dir = str(tmpdir.join("samples"))
+    monkeypatch.setattr(load, "_sample_data", {})
+    cached = load_sample("il-electricity-cdd-hdd-billing_monthly", cache_dir=cache_dir)
+    assert len(tmpdir.join("samples").listdir()) == 2
+
+    # parsed data are read back from the cache directory in a new process
+    monkeypatch.setattr(load, "_sample_data", {})
+    monkeypatch.setattr(load, "_parse_sample_data", None)
+    for loaded in [
+        cached,
+        load_sample("il-electricity-cdd-hdd-billing_monthly", cache_dir=cache_dir),
+    ]:
+        pd.testing.assert_frame_equal(loaded[0], expected[0])
+        assert loaded[0].index.freq == expected[0].index.freq
+        pd.testing.assert_series_equal(loaded[1], expected[1])
+        assert loaded[1].index.freq == expected[1].index.freq
+        assert loaded[2] == expected[2]
+
+
+def test_load_sample_cache_dir_corrupt_entry(tmpdir, monkeypatch):
+    cache_dir = str(tmpdir.join("samples"))
+    monkeypatch.setattr(load, "_sample_data", {})
+    expected = load_sample("il-gas-hdd-only-hourly", cache_dir=cache_dir)
+    for path in tmpdir.join("samples").listdir():
+        path.write("corrupt")
+
+    monkeypatch.setattr(load, "_sample_data", {})
+    meter_data, temperature_data, metadata = load_sample(
+        "il-gas-hdd-only-hourly", cache_dir=cache_dir
+    )
+    pd.testing.assert_frame_equal(meter_data, expected[0])
+    pd.testing.assert_series_equal(temperature_data, expected[1])
+
+
+def test_synthetic_temperature_data_sample():
+    temperature_data = synthetic_temperature_data()
+    meter_data, sample_temperature_data, metadata = load_sample(
+        "il-electricity-cdd-hdd-hourly"
+    )
+    assert temperature_data.index.freq == "H"
+    assert temperature_data.index.tz.zone == "UTC"
+    assert len(temperature_data) == 104 * 7 * 24
+    expected = sample_temperature_data[temperature_data.index[0] :]
+    assert temperature_data.iloc[:100].tolist() == expected.iloc[:100].tolist()
+
+    # repeated every 104 weeks
+    later = synthetic_temperature_data(
+        start=temperature_data.index[0] + datetime.timedelta(weeks=104),
+        end=temperature_data.index[100] + datetime.timedelta(weeks=104),
+    )
+    assert later.tolist() == temperature_data.iloc[:100].tolist()
+
+
+def test_synthetic_temperature_data_model():
+    temperature_data = synthetic_temperature_data(
+        "2017-01-01", "2018-01-01", source="model", seed=1
+    )
+    assert len(temperature_data) == 365 * 24
+    assert temperature_data.notnull().all()
+    assert temperature_data["2017-07"].mean() > temperature_data["2017-01"].mean()
+    same = synthetic_temperature_data(
+        "2017-01-01", "2018-01-01", source="model", seed=1
+    )
+    assert temperature_data.equals(same)
+    other = synthetic_temperature_data(
+        "2017-01-01", "2018-01-01", source="model", seed=2
+    )
+    assert not temperature_data.equals(other)
+
+    with pytest.raises(ValueError):
+        synthetic_temperature_data(source="unknown")
+
+
+@pytest.mark.parametrize(
+    "interval, n_periods",
+    [
+        ("hourly", 104 * 7 * 24),
+        ("daily", 104 * 7 + 1),
+        ("billing_monthly", None),
+        ("billing_bimonthly", None),
+    ],
+)
+def test_synthetic_meter_data(interval, n_periods):
+    temperature_data = synthetic_temperature_data()
+    meter_data = synthetic_meter_data(temperature_data, interval=interval, seed=1)
+    assert list(meter_data.columns) == ["value"]
+    assert meter_data.index.name == "start"
+    assert meter_data.index[0] == temperature_data.index[0]
+    if n_periods is not None:
+        assert len(meter_data) == n_periods
+    if interval == "hourly":
+        assert meter_data.value.notnull().all()
+    else:
+        assert meter_data.index[-1] <= temperature_data.index[-1] + datetime.timedelta(
+            hours=1
+        )
+        assert meter_data.value.iloc[:-1].notnull().all()
+        assert pd.isnull(meter_data.value.iloc[-1])
+        days = meter_data.index.to_series().diff().dt.days.iloc[1:]
+        if interval == "billing_monthly":
+            assert days.between(27, 33).all()
+        elif interval == "billing_bimonthly":
+            assert days.between(56, 65).all()
+
+    same = synthetic_meter_data(temperature_data, interval=interval, seed=1)
+    pd.testing.assert_frame_equal(meter_data, same)
+
+
+def test_synthetic_meter_data_caltrack_model():
+    temperature_data = synthetic_temperature_data()
+    meter_data = synthetic_meter_data(
+        temperature_data,
+        base_load=20.0,
+        heating_slope=1.0,
+        heating_balance_point=60.0,
+        cooling_slope=0.0,
+        noise=0.0,
+    )
+    data = create_caltrack_daily_design_matrix(meter_data, temperature_data)
+    model_fit = fit_caltrack_usage_per_day_model(data)
+    assert model_fit.model.model_type == "hdd_only"
+    params = model_fit.model.model_params
+    assert params["intercept"] == pytest.approx(20.0, rel=0.1)
+    assert params["beta_hdd"] == pytest.approx(1.0, rel=0.1)
+    assert params["heating_balance_point"] == pytest.approx(60.0, abs=3)
+
+
+def test_synthetic_meter_data_gaps_estimated():
+    temperature_data = synthetic_temperature_data()
+    meter_data = synthetic_meter_data(
+        temperature_data, noise=0.0, gap_fraction=0.1, gap_length=3, seed=2
+    )
+    assert 0.05 < meter_data.value.isnull().mean() < 0.15
+
+    meter_data = synthetic_meter_data(
+        temperature_data, noise=0.0, estimated_fraction=0.1, seed=2
+    )
+    expected = synthetic_meter_data(temperature_data, noise=0.0, seed=2)
+    assert list(meter_data.columns) == ["value", "estimated"]
+    assert meter_data.estimated.dtype == bool
+    assert 0.05 < meter_data.estimated.mean() < 0.15
+    # estimated reads move usage between periods but preserve the total
+    assert meter_data.value.sum() == pytest.approx(expected.value.sum())
+    estimated = meter_data.estimated.to_numpy()
+    assert (meter_data.value[estimated] != expected.value[estimated]).all()
+    assert (meter_data.value.dropna() >= 0).all()
+
+    with pytest.raises(ValueError):
+        synthetic_meter_data(temperature_data, interval="unknown")
+    with pytest.raises(ValueError):
+        synthetic_meter_data(temperature_data.iloc[: 24 * 10], "billing_monthly")
+
+
+def test_iterate_synthetic_meters():
+    temperature_data = synthetic_temperature_data(
+        "2017-01-01", "2018-01-01", source="model"
+    )
+    meters = list(
+        iterate_synthetic_meters(
+            3,
+            temperature_data,
+            interval="billing_monthly",
+            seed=5,
+            heating_slope=0.0,
+            base_load=(10.0, 20.0),
+            with_metadata=True,
+        )
+    )
+    assert [meter_id for meter_id, meter_data, metadata in meters] == [
+        "synthetic-0",
+        "synthetic-1",
+        "synthetic-2",
+    ]
+    meter_id, meter_data, metadata = meters[1]
+    assert metadata["meter_id"] == "synthetic-1"
+    assert metadata["interval"] == "billing_monthly"
+    assert metadata["seed"] == 5
+    assert metadata["heating_slope"] == 0.0
+    assert 10.0 <= metadata["base_load"] <= 20.0
+    assert 65.0 <= metadata["cooling_balance_point"] <= 75.0
+
+    # a meter's data does not depend on the number of meters
+    meters_again = iterate_synthetic_meters(
+        2,
+        temperature_data,
+        interval="billing_monthly",
+        seed=5,
+        heating_slope=0.0,
+        base_load=(10.0, 20.0),
+    )
+    (meter_id, same), = list(meters_again)[1:]
+    assert meter_id == "synthetic-1"
+    pd.testing.assert_frame_equal(meter_data, same)
+    assert not meter_data.equals(meters[0][1])
@@ -32,8 +32,11 @@ from eemeter.transform import (
     clean_caltrack_billing_daily_data,
     day_counts,
     get_baseline_data,
+    get_baseline_windows,
     get_reporting_data,
+    get_reporting_windows,
     get_terms,
+    get_terms_batch,
     remove_duplicates,
     NoBaselineDataError,
     NoReportingDataError,
@@ -574,6 +577,71 @@ def test_get_reporting_data_with_overshoot_and_ignored_gap(
     assert len(warnings) == 0
 
 
+def test_get_baseline_windows(il_electricity_cdd_hdd_hourly):
+    meter_data = il_electricity_cdd_hdd_hourly["meter_data"]
+    ends = pd.date_range("2016-12-01", periods=6, freq="MS", tz="UTC")
+    windows = [(end - timedelta(days=365), end) for end in ends] + [(None, None)]
+    baseline_windows = get_baseline_windows(meter_data, windows)
+    assert len(baseline_windows) == 7
+    for (start, end), window in zip(windows, baseline_windows):
+        baseline_data, warnings = get_baseline_data(
+            meter_data, start=start, end=end, max_days=None
+        )
+        assert window.data is meter_data
+        assert window.warnings == []
+        assert (window.index == baseline_data.index).all()
+        pd.testing.assert_frame_equal(window.get_data(), baseline_data)
+
+    window = baseline_windows[0]
+    assert window.start_limit == windows[0][0]
+    assert window.end_limit == windows[0][1]
+    assert len(window) == 8761
+    assert window.mask.sum() == 8760
+    assert not window.mask[-1]
+    assert not window.view().value.isnull().iloc[-1]
+    assert repr(window) == "DataWindow(start=234, stop=8995, n_warnings=0)"
+
+
+def test_get_baseline_windows_gaps(il_electricity_cdd_hdd_hourly):
+    meter_data = il_electricity_cdd_hdd_hourly["meter_data"]
+    start = meter_data.index.min() - timedelta(days=1)
+    end = meter_data.index.max() + timedelta(days=1)
+    window, = get_baseline_windows(meter_data, [(start, end)])
+    assert len(window) == 19417
+    assert [warning.qualified_name for warning in window.warnings] == [
+        "eemeter.get_baseline_data.gap_at_baseline_end",
+        "eemeter.get_baseline_data.gap_at_baseline_start",
+    ]
+
+
+def test_get_baseline_windows_empty(il_electricity_cdd_hdd_hourly):
+    meter_data = il_electricity_cdd_hdd_hourly["meter_data"]
+    end = pd.Timestamp("2000").tz_localize("UTC")
+    with pytest.raises(NoBaselineDataError):
+        get_baseline_windows(meter_data, [(None, None), (None, end)])
+
+
+def test_get_reporting_windows(il_electricity_cdd_hdd_billing_monthly):
+    meter_data = il_electricity_cdd_hdd_billing_monthly["meter_data"].value
+    starts = pd.date_range("2016-01-01", periods=4, freq="3MS", tz="UTC")
+    windows = [(start, start + timedelta(days=365)) for start in starts]
+    reporting_windows = get_reporting_windows(meter_data, windows + [(None, None)])
+    for (start, end), window in zip(windows, reporting_windows):
+        reporting_data, warnings = get_reporting_data(
+            meter_data, start=start, end=end, max_days=None
+        )
+        assert window.warnings == []
+        pd.testing.assert_series_equal(window.get_data(), reporting_data)
+    assert len(reporting_windows[-1]) == len(meter_data)
+
+
+def test_get_reporting_windows_empty(il_electricity_cdd_hdd_hourly):
+    meter_data = il_electricity_cdd_hdd_hourly["meter_data"]
+    start = pd.Timestamp("2030").tz_localize("UTC")
+    with pytest.raises(NoReportingDataError):
+        get_reporting_windows(meter_data, [(start, None)])
+
+
 def test_get_terms_unrecognized_method(il_electricity_cdd_hdd_billing_monthly):
     meter_data = il_electricity_cdd_hdd_billing_monthly["meter_data"]
 
@@ -737,6 +805,45 @@ def test_get_terms_nearest(il_electricity_cdd_hdd_billing_monthly):
     assert year2.complete  # has remaining index
 
 
+def test_get_terms_monthly(il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+
+    terms = get_terms(meter_data.index, term_lengths=np.full(40, 30), method="nearest")
+    assert len(terms) == 27
+    assert all(t.actual_term_length_days == 30 for t in terms[:-1])
+    assert all(a.index[-1] == b.index[0] for a, b in zip(terms, terms[1:]))
+    assert terms[-1].index[-1] == meter_data.index[-1]
+    assert not terms[-1].complete
+
+
+def test_get_terms_batch(
+    il_electricity_cdd_hdd_billing_monthly, il_electricity_cdd_hdd_daily
+):
+    indexes = {
+        "billing": il_electricity_cdd_hdd_billing_monthly["meter_data"].index,
+        "daily": il_electricity_cdd_hdd_daily["meter_data"].index,
+        "empty": il_electricity_cdd_hdd_daily["meter_data"].index[:0],
+    }
+    batch_terms = get_terms_batch(
+        indexes, term_lengths=[365, 365], term_labels=["year1", "year2"]
+    )
+    assert list(batch_terms) == ["billing", "daily", "empty"]
+    for key, index in indexes.items():
+        terms = get_terms(
+            index, term_lengths=[365, 365], term_labels=["year1", "year2"]
+        )
+        assert [repr(t) for t in batch_terms[key]] == [repr(t) for t in terms]
+    assert batch_terms["empty"] == []
+
+
+def test_get_terms_batch_unsorted_index(il_electricity_cdd_hdd_billing_monthly):
+    meter_data = il_electricity_cdd_hdd_billing_monthly["meter_data"]
+
+    with pytest.raises(ValueError) as exc_info:
+        get_terms_batch({"a": meter_data.index[::-1]}, term_lengths=[60])
+    assert "a" in str(exc_info.value)
+
+
 def test_term_repr(il_electricity_cdd_hdd_billing_monthly):
     meter_data = il_electricity_cdd_hdd_billing_monthly["meter_data"]
 
@@ -828,6 +935,55 @@ def test_clean_caltrack_daily_data_hourly(il_electricity_cdd_hdd_hourly):
     assert cleaned_data.shape == (811, 1)
 
 
+@pytest.mark.parametrize("chunk_days", [1, 7, 30, 1000])
+def test_clean_caltrack_daily_data_hourly_chunked(
+    il_electricity_cdd_hdd_hourly, chunk_days
+):
+    meter_data = il_electricity_cdd_hdd_hourly["meter_data"]
+    meter_data = meter_data.tz_convert("America/Chicago")
+    # gaps of a few hours and of several days
+    meter_data = meter_data.drop(meter_data.index[100:105])
+    meter_data = meter_data.drop(meter_data.index[1000:1500])
+    cleaned_data = downsample_and_clean_caltrack_daily_data(meter_data)
+    chunked_data = downsample_and_clean_caltrack_daily_data(
+        meter_data, chunk_days=chunk_days
+    )
+    pd.testing.assert_frame_equal(chunked_data, cleaned_data)
+    assert chunked_data.index.freq == "D"
+
+    chunked_data = clean_caltrack_billing_daily_data(
+        meter_data, "hourly", chunk_days=chunk_days
+    )
+    pd.testing.assert_frame_equal(chunked_data, cleaned_data)
+
+
+def test_clean_caltrack_daily_data_irregular_chunked():
+    index = pd.DatetimeIndex(
+        [
+            "2017-01-01T00:00:00",
+            "2017-01-01T13:00:00",
+            "2017-01-02T23:50:00",
+            "2017-01-03T00:20:00",
+            "2017-01-03T00:20:00",
+            "2017-01-05T12:00:00",
+            "2017-01-05T23:00:00",
+        ],
+        tz="UTC",
+    )
+    meter_data = pd.DataFrame(
+        {"value": [1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0]}, index=index
+    )
+    cleaned_data = downsample_and_clean_caltrack_daily_data(meter_data)
+    for chunk_days in [1, 2, 3]:
+        pd.testing.assert_frame_equal(
+            downsample_and_clean_caltrack_daily_data(meter_data, chunk_days=chunk_days),
+            cleaned_data,
+        )
+
+    with pytest.raises(ValueError):
+        downsample_and_clean_caltrack_daily_data(meter_data, chunk_days=0)
+
+
 def test_clean_caltrack_daily_data_hourly_local_tz(il_electricity_cdd_hdd_hourly):
     meter_data = il_electricity_cdd_hdd_hourly["meter_data"]
     meter_data = meter_data.tz_convert("America/Chicago")
@@ -18,6 +18,7 @@
 
 """
 import matplotlib
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -27,7 +28,12 @@ from eemeter.caltrack.usage_per_day import (
     CalTRACKUsagePerDayCandidateModel,
     CalTRACKUsagePerDayModelResults,
 )
-from eemeter.visualization import plot_energy_signature, plot_time_series
+from eemeter.caltrack.design_matrices import create_caltrack_daily_design_matrix
+from eemeter.visualization import (
+    _lttb_indices,
+    plot_energy_signature,
+    plot_time_series,
+)
 
 
 def test_plot_time_series(il_electricity_cdd_hdd_daily):
@@ -49,6 +55,64 @@ def test_plot_energy_signature(il_electricity_cdd_hdd_daily):
     assert ax.get_title() == "title"
 
 
+def test_lttb_indices():
+    x = np.arange(10.0)
+    y = np.array([0.0, 5.0, 0.0, 0.0, -3.0, 0.0, 0.0, 1.0, 0.0, 0.0])
+    # keeps the endpoints and the peak and trough
+    assert _lttb_indices(x, y, 5).tolist() == [0, 1, 4, 7, 9]
+    assert _lttb_indices(x, y, 20).tolist() == list(range(10))
+
+    y[1:4] = np.nan
+    indices = _lttb_indices(x, y, 5)
+    assert np.isnan(y[indices[1]])  # the gap is kept
+    assert indices[2] == 4
+
+    with pytest.raises(ValueError):
+        _lttb_indices(x, y, 2)
+
+
+def test_plot_time_series_max_points(il_electricity_cdd_hdd_hourly):
+    meter_data = il_electricity_cdd_hdd_hourly["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_hourly["temperature_data"]
+    ax_m, ax_t = plot_time_series(meter_data, temperature_data, max_points=500)
+    m_data = ax_m.lines[0].get_xydata()
+    t_data = ax_t.lines[0].get_xydata()
+    assert m_data.shape == (500, 2)
+    assert t_data.shape == (500, 2)
+    # extremes are kept much better than by taking every n-th point
+    full_range = temperature_data.max() - temperature_data.min()
+    t_range = np.nanmax(t_data[:, 1]) - np.nanmin(t_data[:, 1])
+    strided = temperature_data.iloc[:: len(temperature_data) // 500]
+    assert t_range > 0.95 * full_range
+    assert t_range > strided.max() - strided.min()
+
+
+def test_plot_energy_signature_binned(il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    ax = plot_energy_signature(meter_data, temperature_data, kind="hexbin")
+    counts = ax.collections[0].get_array()
+    assert counts.sum() == meter_data.value.notnull().sum()
+
+    ax = plot_energy_signature(meter_data, temperature_data, kind="hist2d", bins=10)
+    counts = ax.collections[0].get_array()
+    assert np.nansum(counts) == meter_data.value.notnull().sum()
+
+    with pytest.raises(ValueError):
+        plot_energy_signature(meter_data, temperature_data, kind="unknown")
+
+
+def test_plot_energy_signature_design_matrix(il_electricity_cdd_hdd_daily):
+    meter_data = il_electricity_cdd_hdd_daily["meter_data"]
+    temperature_data = il_electricity_cdd_hdd_daily["temperature_data"]
+    data = create_caltrack_daily_design_matrix(meter_data, temperature_data)
+    ax = plot_energy_signature(None, None, data=data)
+    expected = plot_energy_signature(meter_data, temperature_data)
+    np.testing.assert_array_equal(
+        ax.collections[0].get_offsets(), expected.collections[0].get_offsets()
+    )
+
+
 def test_plot_caltrack_candidate_qualified():
     candidate_model = CalTRACKUsagePerDayCandidateModel(
         model_type="intercept_only",